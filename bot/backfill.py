@@ -0,0 +1,127 @@
+"""起動時のチャンネルバッファ埋め戻し（Discord のメッセージ履歴から）
+
+直近に発言のあった発言可能チャンネルの履歴を並行して取得し、短期記憶バッファに
+直接追加する。要約・反省会・プロファイル記録などのトリガーは通さない。
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import discord
+from discord.ext import commands
+
+import config
+from log_utils.logger import logger
+from memory.short_term import ChannelMessage, get_channel_buffer
+from utils.channel_config import ChannelConfigManager
+
+# 429 を受けたときの再試行回数
+_MAX_RATE_LIMIT_RETRIES = 3
+
+
+def _select_channels(
+    bot: commands.Bot, config_manager: ChannelConfigManager, since: datetime
+) -> list[discord.TextChannel]:
+    """埋め戻し対象のチャンネルを最終発言の新しい順に選ぶ
+
+    発言可能で、since 以降に発言があり、まだバッファを持たないチャンネルが対象。
+    """
+    buffer = get_channel_buffer()
+    candidates: list[tuple[datetime, discord.TextChannel]] = []
+    for guild in bot.guilds:
+        try:
+            channel_config = config_manager.get_config(guild.id)
+        except Exception as e:
+            logger.warning(f"埋め戻し対象の判定に失敗: ギルドID={guild.id}: {str(e)}")
+            continue
+        for channel in guild.text_channels:
+            if channel.last_message_id is None or buffer.has_channel(channel.id):
+                continue
+            last_message_at = discord.utils.snowflake_time(channel.last_message_id)
+            if last_message_at <= since or not channel_config.can_bot_speak(channel.id):
+                continue
+            candidates.append((last_message_at, channel))
+    candidates.sort(key=lambda item: item[0], reverse=True)
+    return [channel for _, channel in candidates[: config.CHANNEL_BUFFER_BACKFILL_MAX_CHANNELS]]
+
+
+async def _fetch_history(
+    channel: discord.TextChannel, since: datetime, limit: int
+) -> list[discord.Message]:
+    """since 以降の直近 limit 件を古い順で返す（429 は retry_after だけ待って再試行）"""
+    for attempt in range(_MAX_RATE_LIMIT_RETRIES + 1):
+        try:
+            messages = [m async for m in channel.history(limit=limit, after=since, oldest_first=False)]
+            messages.reverse()
+            return messages
+        except discord.HTTPException as e:
+            if e.status != 429 or attempt == _MAX_RATE_LIMIT_RETRIES:
+                raise
+            retry_after = float(getattr(e, "retry_after", 1.0) or 1.0)
+            logger.warning(
+                f"履歴取得がレート制限されました: チャンネル={channel.id}, {retry_after:.1f}秒待機"
+            )
+            await asyncio.sleep(retry_after)
+    return []
+
+
+def _to_channel_message(message: discord.Message, bot_user_id: int | None) -> ChannelMessage | None:
+    """on_message と同じ基準でバッファ用に変換する（他のボットと空メッセージは除外）"""
+    is_self = bot_user_id is not None and message.author.id == bot_user_id
+    if message.author.bot and not is_self:
+        return None
+    if not message.content and not message.attachments:
+        return None
+    return ChannelMessage(
+        message_id=message.id,
+        channel_id=message.channel.id,
+        author_id=message.author.id,
+        author_name=message.author.display_name,
+        content=message.content or "",
+        timestamp=message.created_at,
+        is_bot=is_self,
+    )
+
+
+async def backfill_channel_buffers(
+    bot: commands.Bot, config_manager: ChannelConfigManager
+) -> int:
+    """直近アクティブなチャンネルの履歴を並行取得してバッファに追加する
+
+    同時取得数は CHANNEL_BUFFER_BACKFILL_CONCURRENCY で制限する。取得に失敗した
+    チャンネル（権限なし等）はスキップする。
+
+    Returns:
+        バッファに追加したメッセージ数
+    """
+    since = datetime.now(timezone.utc) - timedelta(minutes=config.CHANNEL_BUFFER_TTL_MINUTES)
+    channels = _select_channels(bot, config_manager, since)
+    if not channels:
+        return 0
+
+    semaphore = asyncio.Semaphore(max(1, config.CHANNEL_BUFFER_BACKFILL_CONCURRENCY))
+
+    async def fetch(channel: discord.TextChannel) -> list[discord.Message]:
+        async with semaphore:
+            try:
+                return await _fetch_history(channel, since, config.CHANNEL_BUFFER_SIZE)
+            except Exception as e:
+                logger.warning(f"チャンネル履歴の取得に失敗: チャンネル={channel.id}: {str(e)}")
+                return []
+
+    results = await asyncio.gather(*(fetch(channel) for channel in channels))
+
+    buffer = get_channel_buffer()
+    bot_user_id = bot.user.id if bot.user else None
+    added = 0
+    for channel, messages in zip(channels, results):
+        # 取得中に on_message でバッファが作られたチャンネルは二重に追加しない
+        if buffer.has_channel(channel.id):
+            continue
+        for message in messages:
+            channel_message = _to_channel_message(message, bot_user_id)
+            if channel_message is not None:
+                buffer.add_message(channel_message)
+                added += 1
+    logger.info(f"チャンネルバッファを履歴から埋め戻し: {added}件, チャンネル={len(channels)}")
+    return added
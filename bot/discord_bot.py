@@ -1,3 +1,5 @@
+import asyncio
+import signal
 import sys
 
 import discord
@@ -34,6 +36,7 @@ class SpheneBot:
         intents.messages = True  # 過去メッセージへのアクセス権を追加
 
         self.bot = commands.Bot(command_prefix="!", intents=intents, max_messages=10000)
+        self._shutdown_task: asyncio.Task | None = None
 
         # コマンドとイベントのセットアップ
         self._setup()
@@ -46,12 +49,37 @@ class SpheneBot:
         # イベントのセットアップ
         setup_events(self.bot, command_group)
 
+        # discord.py は SIGTERM を扱わないため、コンテナ停止時もシャットダウン処理を通す
+        @self.bot.listen("on_connect")
+        async def install_signal_handlers() -> None:
+            self._install_signal_handlers()
+
         # クリーンアップタスクの開始を準備
         @self.bot.listen("on_ready")
         async def start_cleanup_task() -> None:
             if not self._cleanup_task.is_running():
                 self._cleanup_task.start()
                 logger.info("クリーンアップタスクを開始しました")
+            if config.LIVING_MEMORY_ENABLED and not self._flush_task.is_running():
+                self._flush_task.change_interval(
+                    seconds=config.CHANNEL_CONTEXT_FLUSH_INTERVAL_SECONDS
+                )
+                self._flush_task.start()
+                logger.info("永続化フラッシュタスクを開始しました")
+
+    @tasks.loop(seconds=60)
+    async def _flush_task(self) -> None:
+        """未保存のチャンネルコンテキストを定期的にまとめて永続化する"""
+        try:
+            from memory.channel_context import get_channel_context_store
+
+            store = get_channel_context_store()
+            if store.has_pending_writes():
+                await asyncio.to_thread(store.flush_dirty)
+        except Exception as e:
+            logger.error(
+                f"チャンネルコンテキストのフラッシュでエラー: {str(e)}", exc_info=True
+            )
 
     @tasks.loop(minutes=15)
     async def _cleanup_task(self) -> None:
@@ -67,11 +95,20 @@ class SpheneBot:
         try:
             from memory.short_term import get_channel_buffer
 
-            expired = get_channel_buffer().cleanup_expired()
+            buffer = get_channel_buffer()
+            expired = buffer.cleanup_expired()
             if expired > 0:
                 logger.info(
                     f"チャンネルバッファクリーンアップ: {expired}件削除"
                 )
+            logger.debug(f"チャンネルバッファ統計: {buffer.stats()}")
+            if config.VANGUARD_ENABLED:
+                from memory.llm_judge import get_llm_judge
+
+                logger.info(f"LLM Judge統計: {get_llm_judge().stats()}")
+            if config.CHANNEL_BUFFER_SNAPSHOT_ENABLED:
+                # 行はループ上で集め、圧縮と書き込みだけをスレッドで行う
+                await asyncio.to_thread(buffer.save_snapshot, buffer.snapshot_rows())
         except Exception as e:
             logger.error(
                 f"チャンネルバッファクリーンアップでエラー: {str(e)}",
@@ -83,8 +120,20 @@ class SpheneBot:
             try:
                 from memory.user_profile import get_user_profile_store
 
-                get_user_profile_store().persist_all()
-                logger.debug("ユーザープロファイルを永続化しました")
+                profile_store = get_user_profile_store()
+                count = await profile_store.persist_dirty_async()
+                logger.debug(f"ユーザープロファイルを永続化しました: {count}件")
+                if config.USER_PROFILE_SNAPSHOT_ENABLED:
+                    # 永続化の直後に、行はループ上で集めて圧縮と書き込みだけをスレッドで行う
+                    await asyncio.to_thread(
+                        profile_store.save_snapshot, profile_store.snapshot_rows()
+                    )
+                evicted = await asyncio.to_thread(profile_store.evict_expired)
+                if evicted:
+                    logger.debug(
+                        f"アイドルなユーザープロファイルを解放: {evicted}件, "
+                        f"stats={profile_store.stats()}"
+                    )
             except Exception as e:
                 logger.error(f"ユーザープロファイル永続化エラー: {str(e)}", exc_info=True)
 
@@ -96,12 +145,17 @@ class SpheneBot:
                 from memory.summarizer import get_summarizer
 
                 store = get_channel_context_store()
+                evicted = await asyncio.to_thread(store.evict_expired)
+                if evicted:
+                    logger.debug(f"アイドルなチャンネルコンテキストを解放: {evicted}件")
                 buffer = get_channel_buffer()
-                summarizer = get_summarizer()
-                for channel_id, ctx in store.get_all_contexts().items():
-                    if ctx.should_summarize_by_time():
-                        recent = buffer.get_recent_messages(channel_id, limit=20)
-                        summarizer.maybe_summarize(channel_id, recent)
+                due_channels = {
+                    channel_id: buffer.get_recent_messages(channel_id, limit=20)
+                    for channel_id, ctx in store.get_all_contexts().items()
+                    if ctx.should_summarize_by_time()
+                }
+                if due_channels:
+                    get_summarizer().summarize_due_channels(due_channels)
             except Exception as e:
                 logger.error(
                     f"時間ベース要約チェックでエラー: {str(e)}",
@@ -142,7 +196,67 @@ class SpheneBot:
                     f"反省会チェック/ファクトストア永続化でエラー: {str(e)}", exc_info=True
                 )
 
+    def _install_signal_handlers(self) -> None:
+        """SIGTERM で bot.close() を呼び、run() の終了処理（フラッシュ）に進めるようにする"""
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, self._request_shutdown, signal.SIGTERM)
+        except (NotImplementedError, RuntimeError) as e:
+            # Windows のイベントループなどシグナルハンドラ非対応の環境
+            logger.warning(f"SIGTERMハンドラを登録できません: {str(e)}")
+
+    def _request_shutdown(self, sig: signal.Signals) -> None:
+        """シグナル受信時にボットを閉じる（多重に受信しても1回だけ）"""
+        if self._shutdown_task is not None:
+            return
+        logger.info(f"{sig.name}を受信したためボットを停止します")
+        self._shutdown_task = asyncio.create_task(self.bot.close(), name="shutdown")
+
     def run(self) -> None:
         """ボットを起動する"""
         logger.info("Discordボットの起動を開始")
-        self.bot.run(config.DISCORD_TOKEN)
+        try:
+            self.bot.run(config.DISCORD_TOKEN)
+        finally:
+            self._flush_pending_writes()
+
+    def _flush_pending_writes(self) -> None:
+        """シャットダウン時に未保存の記憶データを永続化する"""
+        if config.CHANNEL_BUFFER_SNAPSHOT_ENABLED:
+            try:
+                from memory.short_term import get_channel_buffer
+
+                get_channel_buffer().save_snapshot()
+            except Exception as e:
+                logger.error(
+                    f"シャットダウン時のチャンネルバッファ保存でエラー: {str(e)}",
+                    exc_info=True,
+                )
+        if not config.LIVING_MEMORY_ENABLED:
+            return
+        try:
+            from memory.channel_context import get_channel_context_store
+
+            count = get_channel_context_store().flush_dirty()
+            if count > 0:
+                logger.info(f"シャットダウン時フラッシュ: チャンネルコンテキスト{count}件")
+        except Exception as e:
+            logger.error(
+                f"シャットダウン時のチャンネルコンテキストフラッシュでエラー: {str(e)}",
+                exc_info=True,
+            )
+
+        try:
+            from memory.user_profile import get_user_profile_store
+
+            profile_store = get_user_profile_store()
+            count = profile_store.persist_dirty()
+            if count > 0:
+                logger.info(f"シャットダウン時フラッシュ: ユーザープロファイル{count}件")
+            if config.USER_PROFILE_SNAPSHOT_ENABLED:
+                profile_store.save_snapshot()
+        except Exception as e:
+            logger.error(
+                f"シャットダウン時のユーザープロファイル永続化でエラー: {str(e)}",
+                exc_info=True,
+            )
@@ -1,10 +1,13 @@
 import asyncio
+import itertools
 import random
+from collections.abc import Coroutine
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from memory.fact_store import Fact
+    from memory.short_term import ChannelMessage
 
 import discord
 from discord import app_commands
@@ -84,6 +87,95 @@ async def is_bot_mentioned(
     return False, "", False
 
 
+# 実行中のバックグラウンドタスク（イベントループは弱参照しか持たないため、完了まで参照を保持する）
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _start_background_task(coro: Coroutine[Any, Any, None], name: str) -> asyncio.Task:
+    """参照を保持したままバックグラウンドタスクを開始し、失敗をログに残す"""
+    task = asyncio.create_task(coro, name=name)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    task.add_done_callback(_log_background_failure)
+    return task
+
+
+def _log_background_failure(task: asyncio.Task) -> None:
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        logger.error(
+            f"バックグラウンドタスクでエラー: {task.get_name()}: {str(exc)}", exc_info=exc
+        )
+
+
+async def _prefetch_profiles(user_ids: list[int]) -> None:
+    """ユーザープロファイルをバックグラウンドで一括プリフェッチする"""
+    try:
+        limit = config.PROFILE_PREFETCH_MAX_USERS
+        if limit <= 0 or not user_ids:
+            return
+        from memory.user_profile import get_user_profile_store
+
+        await get_user_profile_store().prefetch_async(user_ids[:limit])
+    except Exception as e:
+        logger.warning(f"プロファイルのプリフェッチに失敗: {str(e)}", exc_info=True)
+
+
+async def _backfill_channel_buffers(bot: commands.Bot) -> None:
+    """履歴からバッファを埋め戻し、追加された発言者のプロファイルを先読みする"""
+    try:
+        from bot.backfill import backfill_channel_buffers
+
+        added = await backfill_channel_buffers(bot, config_manager)
+        if added and config.LIVING_MEMORY_ENABLED:
+            from memory.short_term import get_channel_buffer
+
+            await _prefetch_profiles(get_channel_buffer().get_author_ids())
+    except Exception as e:
+        logger.warning(f"チャンネルバッファの埋め戻しに失敗: {str(e)}", exc_info=True)
+
+
+# メンバーの先読み対象を探すときに権限を確認する人数の上限（PROFILE_PREFETCH_MAX_USERS の倍数）
+_PREFETCH_MEMBER_SCAN_FACTOR = 4
+
+
+def _channel_member_ids(channel: discord.abc.Messageable, exclude: list[int], limit: int) -> list[int]:
+    """チャンネルを閲覧できるボット以外のメンバーIDを最大 limit 件返す
+
+    TextChannel.members はギルドの全メンバーの権限を計算してから返すため使わず、
+    guild.members を先頭から確認して limit 件、または limit * _PREFETCH_MEMBER_SCAN_FACTOR
+    人を確認した時点で打ち切る。
+    """
+    guild = getattr(channel, "guild", None)
+    if guild is None or limit <= 0:
+        return []
+    member_ids: list[int] = []
+    for member in itertools.islice(guild.members, limit * _PREFETCH_MEMBER_SCAN_FACTOR):
+        if member.bot or member.id in exclude:
+            continue
+        if channel.permissions_for(member).read_messages:  # type: ignore[attr-defined]
+            member_ids.append(member.id)
+            if len(member_ids) >= limit:
+                break
+    return member_ids
+
+
+async def _prefetch_channel_profiles(channel: discord.abc.Messageable) -> None:
+    """新たにアクティブになったチャンネルの発言者・メンバーのプロファイルを温める"""
+    try:
+        from memory.short_term import get_channel_buffer
+
+        limit = config.PROFILE_PREFETCH_MAX_USERS
+        user_ids = get_channel_buffer().get_author_ids(channel.id)  # type: ignore[attr-defined]
+        user_ids.extend(_channel_member_ids(channel, user_ids, limit - len(user_ids)))
+    except Exception as e:
+        logger.warning(f"プリフェッチ対象の収集に失敗: {str(e)}", exc_info=True)
+        return
+    await _prefetch_profiles(user_ids)
+
+
 async def _collect_ai_context(
     message: discord.Message,
 ) -> tuple[str, str, list[str], str, str]:
@@ -109,14 +201,15 @@ async def _collect_ai_context(
     if config.LIVING_MEMORY_ENABLED:
         from memory.channel_context import get_channel_context_store
 
-        ctx = get_channel_context_store().get_context(message.channel.id)
+        ctx = await get_channel_context_store().get_context_async(message.channel.id)
         channel_summary = ctx.format_for_injection()
         topic_keywords = ctx.topic_keywords
 
     if config.LIVING_MEMORY_ENABLED:
         from memory.user_profile import get_user_profile_store
 
-        profile = get_user_profile_store().get_profile(
+        # 応答のプロンプトに載せるため読み込みを待つ（スレッドで実行し、ループは塞がない）
+        profile = await get_user_profile_store().get_profile_async(
             message.author.id, message.author.display_name
         )
         user_profile_str = "\n\n".join(filter(None, [
@@ -193,7 +286,7 @@ async def _send_chunks(
             await message.channel.send(chunk)
 
 
-def _post_response_update(
+async def _post_response_update(
     message: discord.Message,
     answer: str,
     topic_keywords: list[str],
@@ -212,7 +305,9 @@ def _post_response_update(
     if config.LIVING_MEMORY_ENABLED and topic_keywords:
         from memory.user_profile import get_user_profile_store
 
-        get_user_profile_store().update_last_topic(message.author.id, topic_keywords)
+        await get_user_profile_store().update_last_topic_async(
+            message.author.id, topic_keywords
+        )
 
     if bot_user is not None:
         get_channel_buffer().add_message(
@@ -264,7 +359,7 @@ async def process_conversation(
     if answer:
         await _send_chunks(message, split_message(answer), is_reply=is_reply)
         bot_user = message.guild.me if message.guild else None
-        _post_response_update(message, answer, topic_keywords, bot_user)
+        await _post_response_update(message, answer, topic_keywords, bot_user)
     else:
         error_msg = "ごめん！応答の生成中にエラーが発生しちゃった...😢 もう一度試してみてね！"
         if is_reply:
@@ -277,6 +372,7 @@ async def _try_autonomous_response(
     bot: commands.Bot,
     message: discord.Message,
     images: list[str],
+    channel_msg: "ChannelMessage | None" = None,
 ) -> None:
     """自律応答の判定と実行
 
@@ -286,6 +382,7 @@ async def _try_autonomous_response(
         bot: Discordクライアント
         message: Discordメッセージオブジェクト
         images: 添付画像URLリスト
+        channel_msg: バッファに追加済みの ChannelMessage（キーワード検出結果を共有する）
     """
     from memory.judge import get_judge
     from memory.short_term import ChannelMessage, get_channel_buffer
@@ -293,15 +390,15 @@ async def _try_autonomous_response(
     buffer = get_channel_buffer()
     judge = get_judge()
 
-    # バッファからChannelMessageを作成
-    channel_msg = ChannelMessage(
-        message_id=message.id,
-        channel_id=message.channel.id,
-        author_id=message.author.id,
-        author_name=message.author.display_name,
-        content=message.content or "",
-        timestamp=message.created_at,
-    )
+    if channel_msg is None:
+        channel_msg = ChannelMessage(
+            message_id=message.id,
+            channel_id=message.channel.id,
+            author_id=message.author.id,
+            author_name=message.author.display_name,
+            content=message.content or "",
+            timestamp=message.created_at,
+        )
 
     recent_messages = buffer.get_recent_messages(message.channel.id, limit=20)
 
@@ -347,6 +444,8 @@ async def _try_autonomous_response(
                 message_content=message.content or "",
                 recent_context=context,
                 bot_name=config.BOT_NAME,
+                channel_id=message.channel.id,
+                message_id=message.id,
             )
         )
         # LLMがリアクションを追加すべきと判定し、ルールベースでは未実行の場合
@@ -377,6 +476,46 @@ async def _try_autonomous_response(
         )
 
 
+# チャンネルID → 静穏期間の経過を待っている自律応答判定タスク
+_pending_judgements: dict[int, asyncio.Task] = {}
+
+
+def _cancel_pending_judgement(channel_id: int) -> None:
+    """静穏期間を待っている判定を取り消す（判定・応答の実行中のものは取り消さない）"""
+    task = _pending_judgements.pop(channel_id, None)
+    if task is not None:
+        task.cancel()
+
+
+def _schedule_autonomous_response(
+    bot: commands.Bot,
+    message: discord.Message,
+    images: list[str],
+    channel_msg: "ChannelMessage",
+) -> None:
+    """JUDGE_DEBOUNCE_SECONDS の静穏期間後に自律応答判定を行う
+
+    期間中に同じチャンネルで次のメッセージが来たら待機中の判定を取り消し、
+    最後のメッセージについてだけ判定する（連投をまとめて1回の判定にする）。
+    """
+    channel_id = message.channel.id
+    _cancel_pending_judgement(channel_id)
+
+    async def run() -> None:
+        await asyncio.sleep(config.JUDGE_DEBOUNCE_SECONDS)
+        # ここから先は後続のメッセージで取り消されない
+        if _pending_judgements.get(channel_id) is asyncio.current_task():
+            del _pending_judgements[channel_id]
+        try:
+            await _try_autonomous_response(bot, message, images, channel_msg)
+        except Exception as e:
+            logger.error(f"自律応答判定でエラー: チャンネル={channel_id}: {str(e)}", exc_info=True)
+
+    _pending_judgements[channel_id] = asyncio.create_task(
+        run(), name=f"autonomous_judge_{channel_id}"
+    )
+
+
 async def _dispatch_response(
     bot: commands.Bot,
     message: discord.Message,
@@ -539,7 +678,7 @@ async def _process_autonomous_response(
             f"応答={truncate_text(answer)}"
         )
         get_judge().record_response(message.channel.id)
-        _post_response_update(message, answer, topic_keywords, bot.user)
+        await _post_response_update(message, answer, topic_keywords, bot.user)
     else:
         logger.debug("自律応答の生成に失敗、またはNoneが返りました")
 
@@ -595,27 +734,39 @@ async def _handle_message(bot: commands.Bot, message: discord.Message) -> None:
         from memory.short_term import ChannelMessage, get_channel_buffer
 
         buffer = get_channel_buffer()
+        is_new_channel = not buffer.has_channel(message.channel.id)
 
-        buffer.add_message(
-            ChannelMessage(
-                message_id=message.id,
-                channel_id=message.channel.id,
-                author_id=message.author.id,
-                author_name=message.author.display_name,
-                content=message.content or "",
-                timestamp=message.created_at,
-            )
+        channel_message = ChannelMessage(
+            message_id=message.id,
+            channel_id=message.channel.id,
+            author_id=message.author.id,
+            author_name=message.author.display_name,
+            content=message.content or "",
+            timestamp=message.created_at,
         )
+        buffer.add_message(channel_message)
+
+        # 新たにアクティブになったチャンネルの参加者プロファイルを先読み
+        if config.LIVING_MEMORY_ENABLED and is_new_channel:
+            _start_background_task(
+                _prefetch_channel_profiles(message.channel),
+                name=f"profile_prefetch_{message.channel.id}",
+            )
 
         # チャンネルコンテキスト: メッセージカウント + 要約トリガー
         if config.LIVING_MEMORY_ENABLED:
             from memory.channel_context import get_channel_context_store
             from memory.summarizer import get_summarizer
+            from memory.summary_policy import get_summary_policy
 
-            ctx = get_channel_context_store().get_context(message.channel.id)
+            store = get_channel_context_store()
+            ctx = await store.get_context_async(message.channel.id)
             ctx.increment_message_count()
+            store.mark_dirty(message.channel.id)
+            if config.SUMMARIZE_ADAPTIVE_ENABLED:
+                get_summary_policy().record_message(message.channel.id, guild_id)
             recent = buffer.get_recent_messages(message.channel.id, limit=20)
-            get_summarizer().maybe_summarize(message.channel.id, recent)
+            get_summarizer().maybe_summarize(message.channel.id, recent, guild_id)
 
         # ユーザープロファイル: メッセージ記録
         if config.LIVING_MEMORY_ENABLED:
@@ -649,6 +800,8 @@ async def _handle_message(bot: commands.Bot, message: discord.Message) -> None:
         # ボットが呼ばれたかどうかをチェック
         is_mentioned, question, is_reply = await is_bot_mentioned(bot, message)
         if is_mentioned:
+            # 直接応答するので、待機中の自律応答判定は不要
+            _cancel_pending_judgement(message.channel.id)
             # ユーザープロファイル: ボットメンション記録
             if config.LIVING_MEMORY_ENABLED:
                 from memory.user_profile import get_user_profile_store
@@ -665,7 +818,10 @@ async def _handle_message(bot: commands.Bot, message: discord.Message) -> None:
 
         # 自律応答: メンションされていない場合の判定
         if config.VANGUARD_ENABLED:
-            await _try_autonomous_response(bot, message, images)
+            if config.JUDGE_DEBOUNCE_SECONDS > 0:
+                _schedule_autonomous_response(bot, message, images, channel_message)
+            else:
+                await _try_autonomous_response(bot, message, images, channel_message)
 
     except Exception as e:
         logger.error(f"メッセージ処理中にエラー発生: {str(e)}", exc_info=True)
@@ -699,6 +855,39 @@ async def _handle_on_ready(
         except Exception as e:
             logger.error(f"ギルドID {guild.id} の設定初期化中にエラー: {str(e)}")
 
+    # 再起動前のバッファを復元する（TTL 内のメッセージのみ）
+    if config.CHANNEL_BUFFER_SNAPSHOT_ENABLED:
+        from memory.short_term import get_channel_buffer
+
+        try:
+            # 読み込みだけをスレッドで行い、バッファへの反映はループ上で行う
+            buffer = get_channel_buffer()
+            buffer.restore_snapshot(await asyncio.to_thread(buffer.load_snapshot_rows))
+        except Exception as e:
+            logger.error(f"チャンネルバッファの復元に失敗: {str(e)}", exc_info=True)
+
+    # スナップショットで埋まらなかったチャンネルを Discord の履歴から埋め戻す
+    if config.CHANNEL_BUFFER_BACKFILL_ENABLED:
+        _start_background_task(_backfill_channel_buffers(bot), name="channel_buffer_backfill")
+
+    # スナップショットからプロファイルを一括復元し、残りはバッファ中の発言者を先読み
+    if config.LIVING_MEMORY_ENABLED:
+        from memory.short_term import get_channel_buffer
+
+        if config.USER_PROFILE_SNAPSHOT_ENABLED:
+            from memory.user_profile import get_user_profile_store
+
+            try:
+                await asyncio.to_thread(get_user_profile_store().restore_snapshot)
+            except Exception as e:
+                logger.error(f"プロファイルスナップショットの復元に失敗: {str(e)}", exc_info=True)
+
+        author_ids = get_channel_buffer().get_author_ids()
+        if author_ids:
+            _start_background_task(
+                _prefetch_profiles(author_ids), name="profile_prefetch_on_ready"
+            )
+
 
 async def _handle_on_guild_join(guild: discord.Guild) -> None:
     """ギルド参加時の処理
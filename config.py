@@ -31,9 +31,15 @@ BOT_NAME: str = str(os.getenv("BOT_NAME", "スフェーン"))
 COMMAND_GROUP_NAME: str = str(os.getenv("COMMAND_GROUP_NAME", INSTANCE_NAME))
 SYSTEM_PROMPT_FILENAME: str = str(os.getenv("SYSTEM_PROMPT_FILENAME", "system.txt"))
 
-# ストレージタイプ（local または firestore）
+# ストレージタイプ（local / firestore / sqlite）
 STORAGE_TYPE: str = str(os.getenv("STORAGE_TYPE", "local"))
 
+# STORAGE_TYPE=sqlite 時のデータベースファイルのパス
+SQLITE_DB_PATH: str = str(os.getenv("SQLITE_DB_PATH", "storage/sphene.db"))
+
+# スナップショット（起動時の一括復元用）の保存先ディレクトリ（STORAGE_TYPE=firestore 以外）
+SNAPSHOT_DIR: str = str(os.getenv("SNAPSHOT_DIR", "storage"))
+
 # システムプロンプトのファイルパス
 SYSTEM_PROMPT_PATH: str = str(os.getenv("SYSTEM_PROMPT_PATH", "storage/system.txt"))
 
@@ -53,6 +59,7 @@ FIRESTORE_COLLECTION_USER_PROFILES: str = get_collection_name("user_profiles")
 FIRESTORE_COLLECTION_CHANNEL_CONTEXTS: str = get_collection_name("channel_contexts")
 FIRESTORE_COLLECTION_FACTS: str = get_collection_name("facts")
 FIRESTORE_COLLECTION_FACTS_ARCHIVE: str = get_collection_name("facts_archive")
+FIRESTORE_COLLECTION_SNAPSHOTS: str = get_collection_name("snapshots")
 
 # === AI会話設定 ===
 MAX_TOOL_CALL_ROUNDS: int = int(os.getenv("MAX_TOOL_CALL_ROUNDS", "5"))
@@ -62,6 +69,18 @@ MAX_TOOL_CALL_ROUNDS: int = int(os.getenv("MAX_TOOL_CALL_ROUNDS", "5"))
 # 短期記憶（チャンネルメッセージバッファ）
 CHANNEL_BUFFER_SIZE: int = int(os.getenv("CHANNEL_BUFFER_SIZE", "50"))
 CHANNEL_BUFFER_TTL_MINUTES: int = int(os.getenv("CHANNEL_BUFFER_TTL_MINUTES", "30"))
+# 全チャンネル合計のメッセージ数上限（超えると最もアイドルなチャンネルから解放、0で無制限）
+CHANNEL_BUFFER_MAX_TOTAL_MESSAGES: int = int(os.getenv("CHANNEL_BUFFER_MAX_TOTAL_MESSAGES", "10000"))
+# バッファと反省会チェックポイントのスナップショット（定期タスク・シャットダウン時に保存、起動時に復元）
+CHANNEL_BUFFER_SNAPSHOT_ENABLED: bool = (
+    os.getenv("CHANNEL_BUFFER_SNAPSHOT_ENABLED", "true").lower() == "true"
+)
+# 起動時に直近アクティブなチャンネルの履歴を Discord から取得してバッファを埋め戻す
+CHANNEL_BUFFER_BACKFILL_ENABLED: bool = (
+    os.getenv("CHANNEL_BUFFER_BACKFILL_ENABLED", "false").lower() == "true"
+)
+CHANNEL_BUFFER_BACKFILL_MAX_CHANNELS: int = int(os.getenv("CHANNEL_BUFFER_BACKFILL_MAX_CHANNELS", "50"))
+CHANNEL_BUFFER_BACKFILL_CONCURRENCY: int = int(os.getenv("CHANNEL_BUFFER_BACKFILL_CONCURRENCY", "5"))
 
 # === 機能グループフラグ ===
 # VANGUARD: 自律応答・LLM Judge・応答多様性・リアクション を一括制御
@@ -77,14 +96,52 @@ COOLDOWN_SECONDS: int = int(os.getenv("COOLDOWN_SECONDS", "120"))
 ENGAGEMENT_DURATION_SECONDS: int = int(os.getenv("ENGAGEMENT_DURATION_SECONDS", "300"))
 ENGAGEMENT_BOOST: int = int(os.getenv("ENGAGEMENT_BOOST", "40"))
 JUDGE_KEYWORDS: str = os.getenv("JUDGE_KEYWORDS", "")
+# 自律応答判定の静穏期間（秒）。連投は最後のメッセージだけを判定する（0で無効）
+JUDGE_DEBOUNCE_SECONDS: float = float(os.getenv("JUDGE_DEBOUNCE_SECONDS", "0"))
 
 # LLM Judge（二次判定）
 JUDGE_LLM_THRESHOLD_LOW: int = int(os.getenv("JUDGE_LLM_THRESHOLD_LOW", "20"))
 JUDGE_LLM_THRESHOLD_HIGH: int = int(os.getenv("JUDGE_LLM_THRESHOLD_HIGH", "60"))
+# 複数チャンネルの判定依頼を集約期間（ミリ秒）ごとに1回のLLM呼び出しにまとめる
+JUDGE_BATCH_ENABLED: bool = os.getenv("JUDGE_BATCH_ENABLED", "false").lower() == "true"
+JUDGE_BATCH_WINDOW_MS: int = int(os.getenv("JUDGE_BATCH_WINDOW_MS", "200"))
+JUDGE_BATCH_MAX_ITEMS: int = int(os.getenv("JUDGE_BATCH_MAX_ITEMS", "8"))
+# 同じチャンネルのほぼ同じ状況（挨拶の連鎖など）に対するLLM Judgeの判定を短時間使い回す
+JUDGE_CACHE_ENABLED: bool = os.getenv("JUDGE_CACHE_ENABLED", "false").lower() == "true"
+JUDGE_CACHE_TTL_SECONDS: int = int(os.getenv("JUDGE_CACHE_TTL_SECONDS", "120"))
+JUDGE_CACHE_CONTEXT_LINES: int = int(os.getenv("JUDGE_CACHE_CONTEXT_LINES", "3"))
+JUDGE_CACHE_MAX_DISTANCE: int = int(os.getenv("JUDGE_CACHE_MAX_DISTANCE", "3"))
 
 # === チャンネルコンテキスト設定 ===
 SUMMARIZE_EVERY_N_MESSAGES: int = int(os.getenv("SUMMARIZE_EVERY_N_MESSAGES", "20"))
 SUMMARIZE_EVERY_N_MINUTES: int = int(os.getenv("SUMMARIZE_EVERY_N_MINUTES", "15"))
+# 適応的要約ポリシー（メッセージレートEWMA・話題ドリフト・ギルド予算）
+SUMMARIZE_ADAPTIVE_ENABLED: bool = os.getenv("SUMMARIZE_ADAPTIVE_ENABLED", "false").lower() == "true"
+# メッセージレートEWMAの時定数（分）
+SUMMARIZE_RATE_WINDOW_MINUTES: float = float(os.getenv("SUMMARIZE_RATE_WINDOW_MINUTES", "10"))
+# このレート（件/分）で SUMMARIZE_EVERY_N_MESSAGES がそのまま閾値になる基準値
+SUMMARIZE_REFERENCE_RATE_PER_MINUTE: float = float(
+    os.getenv("SUMMARIZE_REFERENCE_RATE_PER_MINUTE", "2.0")
+)
+# 話題キーワードのドリフト率（0.0-1.0）がこの値以上なら早期に要約する
+SUMMARIZE_DRIFT_THRESHOLD: float = float(os.getenv("SUMMARIZE_DRIFT_THRESHOLD", "0.6"))
+# 同一チャンネルの要約を連続実行しない最小間隔（秒）
+SUMMARIZE_MIN_INTERVAL_SECONDS: int = int(os.getenv("SUMMARIZE_MIN_INTERVAL_SECONDS", "60"))
+# ギルドあたり1時間に実行できる要約回数（0で無制限）
+SUMMARIZE_GUILD_BUDGET_PER_HOUR: int = int(os.getenv("SUMMARIZE_GUILD_BUDGET_PER_HOUR", "30"))
+# 定期チェックで要約期限を迎えた小規模チャンネルを1回のLLM呼び出しにまとめる
+SUMMARIZE_BATCH_ENABLED: bool = os.getenv("SUMMARIZE_BATCH_ENABLED", "false").lower() == "true"
+# 1回のバッチ要約にまとめる最大チャンネル数
+SUMMARIZE_BATCH_MAX_CHANNELS: int = int(os.getenv("SUMMARIZE_BATCH_MAX_CHANNELS", "8"))
+# メッセージ数がこの値以下のチャンネルをバッチ対象とする（超える場合は個別要約）
+SUMMARIZE_BATCH_SMALL_CHANNEL_MESSAGES: int = int(
+    os.getenv("SUMMARIZE_BATCH_SMALL_CHANNEL_MESSAGES", "10")
+)
+# インメモリに保持するチャンネルコンテキストの上限数（0で無制限）とアイドルTTL（分、0で無期限）
+CHANNEL_CONTEXT_CACHE_MAX_ENTRIES: int = int(os.getenv("CHANNEL_CONTEXT_CACHE_MAX_ENTRIES", "1000"))
+CHANNEL_CONTEXT_CACHE_TTL_MINUTES: int = int(os.getenv("CHANNEL_CONTEXT_CACHE_TTL_MINUTES", "360"))
+# チャンネルコンテキストの未保存分をまとめて永続化する間隔（秒）
+CHANNEL_CONTEXT_FLUSH_INTERVAL_SECONDS: int = int(os.getenv("CHANNEL_CONTEXT_FLUSH_INTERVAL_SECONDS", "60"))
 
 # リアクション機能
 # should_react=True になる最低スコア閾値（JUDGE_SCORE_THRESHOLD より低く設定する）
@@ -99,6 +156,15 @@ FAMILIARITY_THRESHOLD_CLOSE: int = int(os.getenv("FAMILIARITY_THRESHOLD_CLOSE",
 USER_PROFILE_TAGS_LIMIT: int = int(os.getenv("USER_PROFILE_TAGS_LIMIT", "30"))
 USER_PROFILE_FACTS_LIMIT: int = int(os.getenv("USER_PROFILE_FACTS_LIMIT", "30"))
 CHANNELS_ACTIVE_LIMIT: int = int(os.getenv("CHANNELS_ACTIVE_LIMIT", "20"))
+# インメモリに保持するユーザープロファイルの上限数（0で無制限）とアイドルTTL（分、0で無期限）
+USER_PROFILE_CACHE_MAX_ENTRIES: int = int(os.getenv("USER_PROFILE_CACHE_MAX_ENTRIES", "5000"))
+USER_PROFILE_CACHE_TTL_MINUTES: int = int(os.getenv("USER_PROFILE_CACHE_TTL_MINUTES", "1440"))
+# チャンネルが新たにアクティブになった際などにプリフェッチするプロファイルの最大数（0で無効）
+PROFILE_PREFETCH_MAX_USERS: int = int(os.getenv("PROFILE_PREFETCH_MAX_USERS", "50"))
+# インメモリのプロファイルを定期的・シャットダウン時にスナップショットし、起動時に一括復元するか
+USER_PROFILE_SNAPSHOT_ENABLED: bool = (
+    os.getenv("USER_PROFILE_SNAPSHOT_ENABLED", "true").lower() == "true"
+)
 
 # === ファクトストア設定 (Phase 3A) ===
 FACT_STORE_MAX_FACTS_PER_CHANNEL: int = int(os.getenv("FACT_STORE_MAX_FACTS_PER_CHANNEL", "100"))
@@ -121,6 +187,9 @@ REFLECTION_MIN_MESSAGES: int = int(os.getenv("REFLECTION_MIN_MESSAGES", "10"))
 # バッファ量ベースの反省会トリガー閾値。
 # CHANNEL_BUFFER_SIZE 以下の値を設定すること（それを超えると絶対に発動しない）。
 REFLECTION_MAX_BUFFER_MESSAGES: int = int(os.getenv("REFLECTION_MAX_BUFFER_MESSAGES", "30"))
+# ユーザープロファイル反省会の対象とする、前回反映以降の発言の最小文字数
+# （絵文字・メンション・URL・記号を除く）。未満のユーザーはLLMに送らない
+REFLECTION_PROFILE_MIN_CHARS: int = int(os.getenv("REFLECTION_PROFILE_MIN_CHARS", "20"))
 
 # === Embedding設定 (Phase 3B) ===
 EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "text-embedding-004")
@@ -8,11 +8,20 @@ from datetime import datetime, timezone
 
 import config
 from log_utils.logger import logger
+from memory.render_cache import RenderCacheMixin
+from utils.write_behind import WriteBehindCache
 
 
 @dataclass
-class ChannelContext:
-    """チャンネルのコンテキスト情報"""
+class ChannelContext(RenderCacheMixin):
+    """チャンネルのコンテキスト情報
+
+    format_for_injection の結果はキャッシュされ、依存フィールドへの代入時のみ再生成される。
+    """
+
+    _RENDER_DEPENDENCIES = {
+        "injection": frozenset({"summary", "mood", "topic_keywords", "active_users"}),
+    }
 
     channel_id: int
     summary: str = ""
@@ -44,6 +53,13 @@ class ChannelContext:
 
     def format_for_injection(self) -> str:
         """LLM注入用のフォーマット済み文字列を返す"""
+        return self._cached_render("injection", self._render_injection)
+
+    def injection_byte_size(self) -> int:
+        """format_for_injection の結果のUTF-8バイト数を返す"""
+        return self.rendered_byte_size("injection")
+
+    def _render_injection(self) -> str:
         if not self.summary:
             return ""
         parts = [f"【チャンネルの状況】\n{self.summary}"]
@@ -88,36 +104,114 @@ class ChannelContext:
 
 
 class ChannelContextStore:
-    """チャンネルコンテキストの永続化ストア"""
-
-    def __init__(self) -> None:
-        self._contexts: dict[int, ChannelContext] = {}
+    """チャンネルコンテキストの永続化ストア
+
+    インメモリのコンテキストは件数上限・アイドルTTL付きのLRUで保持し、
+    追い出すコンテキストは永続化してから手放す。
+    更新はチャンネル単位でまとめ（write-behind）、flush_dirty で一括永続化する。
+
+    Args:
+        max_entries: インメモリに保持する最大チャンネル数（0で無制限）
+        ttl_minutes: 最終アクセスからの保持時間（分、0で無期限）
+    """
+
+    def __init__(self, max_entries: int = 0, ttl_minutes: int = 0) -> None:
+        self._contexts: WriteBehindCache[int, ChannelContext] = WriteBehindCache(
+            lambda contexts: self._write_contexts(contexts),
+            max_entries=max_entries,
+            ttl_seconds=ttl_minutes * 60,
+        )
 
     def get_all_contexts(self) -> dict[int, ChannelContext]:
         """全コンテキストのコピーを返す（スレッドセーフ）"""
-        return dict(self._contexts)
+        return dict(self._contexts.items())
 
     def get_context(self, channel_id: int) -> ChannelContext:
-        """チャンネルコンテキストを取得する（なければ新規作成）"""
-        if channel_id in self._contexts:
-            return self._contexts[channel_id]
+        """チャンネルコンテキストを取得する（なければ新規作成）
+
+        キャッシュミス時は同期I/Oが発生するため、イベントループ上では
+        get_context_async を使うこと。
+        """
+        ctx = self._contexts.get(channel_id)
+        if ctx is not None:
+            return ctx
 
         # 永続化先からの読み込みを試行
         ctx = self._load_context(channel_id)
         if ctx is None:
             ctx = ChannelContext(channel_id=channel_id)
-        self._contexts[channel_id] = ctx
+        self._contexts.add(channel_id, ctx)
         return ctx
 
+    async def get_context_async(self, channel_id: int) -> ChannelContext:
+        """チャンネルコンテキストを非同期に取得する
+
+        キャッシュヒット時は即座に返す。ミス時の読み込みはスレッドで実行し、
+        同一チャンネルへの同時要求は1回の読み込みにまとめる（single-flight）。
+        """
+        return await self._contexts.get_or_load(
+            channel_id,
+            lambda: self._load_context(channel_id),
+            lambda: ChannelContext(channel_id=channel_id),
+            name=f"load_channel_context_{channel_id}",
+        )
+
     def save_context(self, context: ChannelContext) -> None:
-        """コンテキストを永続化する"""
-        self._contexts[context.channel_id] = context
+        """コンテキストを更新し、次回フラッシュ時に永続化されるよう登録する"""
+        self._contexts.add(context.channel_id, context)
+        self.mark_dirty(context.channel_id)
+
+    def mark_dirty(self, channel_id: int) -> None:
+        """コンテキストに未保存の変更があることを記録する
+
+        同一チャンネルへの複数回の更新は1回の書き込みにまとめられる。
+        """
+        self._contexts.mark_dirty(channel_id)
+
+    def has_pending_writes(self) -> bool:
+        """未保存のコンテキストがあるかを返す"""
+        return self._contexts.has_dirty()
+
+    def flush_dirty(self) -> int:
+        """未保存のコンテキストをまとめて永続化する（定期タスク・シャットダウン用）
+
+        書き込みに失敗したコンテキストは次回のフラッシュで再試行する。
+
+        Returns:
+            永続化したコンテキスト数
+        """
+        written, failed = self._contexts.flush_dirty()
+        if written or failed:
+            logger.debug(
+                f"チャンネルコンテキストをフラッシュ: 成功={written}件, 失敗={failed}件"
+            )
+        return written
+
+    def evict_expired(self) -> int:
+        """アイドルTTLを超えたコンテキストを永続化してから削除する（定期タスク用）
+
+        Returns:
+            削除したコンテキスト数
+        """
+        return self._contexts.write_back_expired()
+
+    def stats(self) -> dict[str, int]:
+        """インメモリキャッシュの統計（エントリ数・ヒット・ミス・追い出し・未保存数）を返す"""
+        return self._contexts.stats()
+
+    def _write_contexts(self, contexts: list[ChannelContext]) -> list[int]:
+        """コンテキストをまとめて書き込み、失敗したチャンネルIDを返す"""
         storage_type = config.STORAGE_TYPE
 
         if storage_type == "local":
-            self._save_to_local(context)
+            return [
+                ctx.channel_id for ctx in contexts if not self._save_to_local(ctx)
+            ]
         elif storage_type == "firestore":
-            self._save_to_firestore(context)
+            return self._save_batch_to_firestore(contexts)
+        elif storage_type == "sqlite":
+            return self._save_batch_to_sqlite(contexts)
+        return []
 
     def _load_context(self, channel_id: int) -> ChannelContext | None:
         """永続化先からコンテキストを読み込む"""
@@ -127,6 +221,8 @@ class ChannelContextStore:
             return self._load_from_local(channel_id)
         elif storage_type == "firestore":
             return self._load_from_firestore(channel_id)
+        elif storage_type == "sqlite":
+            return self._load_from_sqlite(channel_id)
         return None
 
     def _load_from_local(self, channel_id: int) -> ChannelContext | None:
@@ -141,17 +237,19 @@ class ChannelContextStore:
             logger.error(f"チャンネルコンテキスト読み込みエラー: {e}", exc_info=True)
         return None
 
-    def _save_to_local(self, context: ChannelContext) -> None:
+    def _save_to_local(self, context: ChannelContext) -> bool:
         """ローカルファイルにアトミック書き込み"""
         from utils.file_utils import atomic_write_json
 
         file_path = f"storage/channel_context.{context.channel_id}.json"
         try:
             atomic_write_json(file_path, context.to_dict())
+            return True
         except Exception as e:
             logger.error(
                 f"チャンネルコンテキストのローカル保存エラー: {e}", exc_info=True
             )
+            return False
 
     def _load_from_firestore(self, channel_id: int) -> ChannelContext | None:
         """Firestoreからコンテキストを読み込む"""
@@ -175,19 +273,42 @@ class ChannelContextStore:
             )
         return None
 
-    def _save_to_firestore(self, context: ChannelContext) -> None:
-        """Firestoreにコンテキストを保存する"""
-        try:
-            from utils.firestore_client import get_firestore_client
+    def _save_batch_to_firestore(self, contexts: list[ChannelContext]) -> list[int]:
+        """Firestoreにバッチ書き込みし、失敗したチャンネルIDを返す"""
+        from utils.firestore_client import batch_set_documents
 
-            db = get_firestore_client()
-            db.collection(config.FIRESTORE_COLLECTION_CHANNEL_CONTEXTS).document(
-                str(context.channel_id)
-            ).set(context.to_dict())
+        failed = batch_set_documents(
+            config.FIRESTORE_COLLECTION_CHANNEL_CONTEXTS,
+            {str(ctx.channel_id): ctx.to_dict() for ctx in contexts},
+        )
+        return [int(doc_id) for doc_id in failed]
+
+    def _load_from_sqlite(self, channel_id: int) -> ChannelContext | None:
+        """SQLiteからコンテキストを読み込む"""
+        from utils.sqlite_store import COLLECTION_CHANNEL_CONTEXTS, get_sqlite_store
+
+        try:
+            data = get_sqlite_store().get(COLLECTION_CHANNEL_CONTEXTS, str(channel_id))
+            if data is not None:
+                data["channel_id"] = channel_id
+                return ChannelContext.from_dict(data)
         except Exception as e:
-            logger.error(
-                f"Firestoreへのコンテキスト保存エラー: {e}", exc_info=True
+            logger.error(f"SQLiteからのコンテキスト読み込みエラー: {e}", exc_info=True)
+        return None
+
+    def _save_batch_to_sqlite(self, contexts: list[ChannelContext]) -> list[int]:
+        """SQLiteに1トランザクションで書き込み、失敗したチャンネルIDを返す"""
+        from utils.sqlite_store import COLLECTION_CHANNEL_CONTEXTS, get_sqlite_store
+
+        try:
+            get_sqlite_store().set_many(
+                COLLECTION_CHANNEL_CONTEXTS,
+                {str(ctx.channel_id): ctx.to_dict() for ctx in contexts},
             )
+            return []
+        except Exception as e:
+            logger.error(f"SQLiteへのコンテキスト一括保存エラー: {e}", exc_info=True)
+            return [ctx.channel_id for ctx in contexts]
 
 
 # シングルトン
@@ -201,8 +322,13 @@ def get_channel_context_store() -> ChannelContextStore:
     if _store is None:
         with _store_lock:
             if _store is None:
-                _store = ChannelContextStore()
+                _store = ChannelContextStore(
+                    max_entries=config.CHANNEL_CONTEXT_CACHE_MAX_ENTRIES,
+                    ttl_minutes=config.CHANNEL_CONTEXT_CACHE_TTL_MINUTES,
+                )
                 logger.info(
-                    f"ChannelContextStore初期化: storage_type={config.STORAGE_TYPE}"
+                    f"ChannelContextStore初期化: storage_type={config.STORAGE_TYPE}, "
+                    f"max_entries={config.CHANNEL_CONTEXT_CACHE_MAX_ENTRIES}, "
+                    f"ttl={config.CHANNEL_CONTEXT_CACHE_TTL_MINUTES}分"
                 )
     return _store
@@ -252,12 +252,18 @@ class FactStore:
             self._save_to_local(channel_id, facts)
         elif storage_type == "firestore":
             self._save_to_firestore(channel_id, facts)
+        elif storage_type == "sqlite":
+            self._save_batch_to_sqlite({channel_id: facts})
 
     def persist_all(self) -> None:
         """全チャンネルを永続化する（クリーンアップタスクから呼ばれる）"""
         with self._lock:
             snapshot = {cid: list(facts) for cid, facts in self._facts.items()}
         storage_type = config.STORAGE_TYPE
+        if storage_type == "sqlite":
+            # 全チャンネルを1トランザクションで書き込む
+            self._save_batch_to_sqlite(snapshot)
+            return
         for channel_id, facts in snapshot.items():
             if storage_type == "local":
                 self._save_to_local(channel_id, facts)
@@ -287,6 +293,8 @@ class FactStore:
             facts = self._load_from_local(channel_id)
         elif storage_type == "firestore":
             facts = self._load_from_firestore(channel_id)
+        elif storage_type == "sqlite":
+            facts = self._load_from_sqlite(channel_id)
 
         with self._lock:
             # 別スレッドが先にロードを完了していた場合はスキップ
@@ -356,6 +364,36 @@ class FactStore:
             logger.error(f"ファクトのFirestore読み込みエラー: {e}", exc_info=True)
         return None
 
+    def _save_batch_to_sqlite(self, facts_by_channel: dict[int, list[Fact]]) -> None:
+        """SQLiteに複数チャンネルのファクトを1トランザクションで保存する"""
+        try:
+            from utils.sqlite_store import COLLECTION_FACTS, get_sqlite_store
+
+            get_sqlite_store().set_many(
+                COLLECTION_FACTS,
+                {
+                    str(channel_id): {
+                        "channel_id": channel_id,
+                        "facts": [f.to_dict() for f in facts],
+                    }
+                    for channel_id, facts in facts_by_channel.items()
+                },
+            )
+        except Exception as e:
+            logger.error(f"ファクトのSQLite保存エラー: {e}", exc_info=True)
+
+    def _load_from_sqlite(self, channel_id: int) -> list[Fact] | None:
+        """SQLiteからファクトを読み込む"""
+        try:
+            from utils.sqlite_store import COLLECTION_FACTS, get_sqlite_store
+
+            data = get_sqlite_store().get(COLLECTION_FACTS, str(channel_id))
+            if data is not None:
+                return [Fact.from_dict(item) for item in data.get("facts", [])]
+        except Exception as e:
+            logger.error(f"ファクトのSQLite読み込みエラー: {e}", exc_info=True)
+        return None
+
     def cleanup_low_relevance_facts(self) -> dict[int, int]:
         """全チャンネルで effective_relevance_score が閾値以下のファクトを削除する。
 
@@ -427,6 +465,8 @@ class FactStore:
             self._append_to_local_archive(channel_id, facts)
         elif storage_type == "firestore":
             self._append_to_firestore_archive(channel_id, facts)
+        elif storage_type == "sqlite":
+            self._append_to_sqlite_archive(channel_id, facts)
 
     def _append_to_local_archive(self, channel_id: int, facts: list[Fact]) -> None:
         """ローカルアーカイブファイルにファクトを追記する"""
@@ -486,6 +526,33 @@ class FactStore:
         except Exception as e:
             logger.error(f"ファクトFirestoreアーカイブエラー: {e}", exc_info=True)
 
+    def _append_to_sqlite_archive(self, channel_id: int, facts: list[Fact]) -> None:
+        """SQLiteアーカイブコレクションにファクトを追加する"""
+        try:
+            from utils.sqlite_store import COLLECTION_FACTS_ARCHIVE, get_sqlite_store
+
+            store = get_sqlite_store()
+            data = store.get(COLLECTION_FACTS_ARCHIVE, str(channel_id)) or {}
+            existing: list[dict] = data.get("archived_facts", [])
+
+            archived_at = datetime.now(timezone.utc).isoformat()
+            for fact in facts:
+                entry = fact.to_dict()
+                entry["archived_at"] = archived_at
+                existing.append(entry)
+
+            max_entries = config.FACT_ARCHIVE_MAX_ENTRIES
+            if len(existing) > max_entries:
+                existing = existing[-max_entries:]
+
+            store.set(
+                COLLECTION_FACTS_ARCHIVE,
+                str(channel_id),
+                {"channel_id": channel_id, "archived_facts": existing},
+            )
+        except Exception as e:
+            logger.error(f"ファクトSQLiteアーカイブエラー: {e}", exc_info=True)
+
 
 # シングルトン
 _fact_store: FactStore | None = None
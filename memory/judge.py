@@ -1,11 +1,18 @@
 """ルールベースの自律応答判定"""
 
+from collections import deque
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 
 import config
 from log_utils.logger import logger
 from memory.short_term import ChannelMessage
+from utils.aho_corasick import AhoCorasick
+from utils.lru_cache import LRUCache
+
+# 特徴量を保持するチャンネル数の上限（追い出されたチャンネルは次の判定で作り直す）
+_FEATURES_MAX_CHANNELS = 256
 
 
 @dataclass
@@ -20,11 +27,24 @@ class JudgeResult:
     reaction_emojis: list[str] = field(default_factory=list)  # LLMが埋める絵文字リスト
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class RuleBasedJudge:
-    """ルールベースのスコアリングによる自律応答判定"""
+    """ルールベースのスコアリングによる自律応答判定
 
-    def __init__(self) -> None:
+    Args:
+        clock: 現在時刻（UTC aware）を返す関数。リプレイ等で時刻を固定する場合に渡す
+    """
+
+    def __init__(self, clock: Callable[[], datetime] | None = None) -> None:
+        self._clock = clock or _utcnow
         self._last_response_times: dict[int, datetime] = {}
+        # チャンネルごとの直近メッセージの特徴量（evaluate 間で差分更新する）
+        self._features: LRUCache[int, _ChannelFeatures] = LRUCache(
+            max_entries=_FEATURES_MAX_CHANNELS
+        )
         self._keywords: list[str] = [
             kw.strip()
             for kw in config.JUDGE_KEYWORDS.split(",")
@@ -32,6 +52,18 @@ class RuleBasedJudge:
         ]
         if self._keywords:
             logger.info(f"Judge キーワード設定: {self._keywords}")
+        # キーワードとボット名を1回の走査で検出する
+        self._bot_name: str = config.BOT_NAME
+        self._matcher = AhoCorasick([*self._keywords, self._bot_name])
+
+    def pattern_hits(self, message: ChannelMessage) -> frozenset[str]:
+        """本文に含まれるキーワード・ボット名の集合（マッチャーと共にメッセージにキャッシュする）"""
+        cached = message.pattern_hits
+        if cached is not None and cached[0] is self._matcher:
+            return cached[1]
+        hits = self._matcher.search(message.content)
+        message.pattern_hits = (self._matcher, hits)
+        return hits
 
     def evaluate(
         self,
@@ -64,44 +96,49 @@ class RuleBasedJudge:
 
         # キーワードマッチ
         if self._keywords:
+            hits = self.pattern_hits(message)
             for keyword in self._keywords:
-                if keyword in message.content:
+                if keyword in hits:
                     score += 15
                     reasons.append(f"キーワード'{keyword}'(+15)")
                     break  # 1キーワードにつき1回のみ
 
         # === Phase 2A 新ルール（recent_messagesがある場合のみ適用） ===
         if recent_messages:
+            features = self._sync_features(message.channel_id, recent_messages)
+
             # 2人会話: ユニーク非bot著者が2人のみ
-            if _count_unique_authors(recent_messages) == 2:
+            if features.unique_authors() == 2:
                 score -= 20
                 reasons.append("2人会話(-20)")
 
             # ボット言及なし: 直近メッセージにBOT_NAMEを含む非botメッセージがない
-            if not _has_bot_mention_in_recent(recent_messages):
+            if not features.has_bot_mention():
                 score -= 10
                 reasons.append("ボット言及なし(-10)")
 
             # 高頻度メッセージ: 直近10件が60秒以内
-            if _is_high_frequency(recent_messages):
+            if features.is_high_frequency():
                 score -= 10
                 reasons.append("高頻度(-10)")
 
             # 得意話題: キーワードマッチ（recent_messagesに対して）
-            if self._is_expert_topic(recent_messages):
+            if features.has_keyword():
                 score += 15
                 reasons.append("得意話題(+15)")
 
             # 沈黙後の最初のメッセージ
-            if _is_first_after_silence(recent_messages):
+            if features.is_first_after_silence():
                 score += 10
                 reasons.append("沈黙後(+10)")
 
             # 会話減衰: 直近メッセージの平均文字数が減少
-            decay = _detect_conversation_decay(recent_messages)
+            decay = features.conversation_decay()
             if decay != 0:
                 score += decay
                 reasons.append(f"会話減衰({decay:+d})")
+        else:
+            self._features.pop(message.channel_id)
 
         # クールダウンチェック
         if self._is_in_cooldown(message.channel_id):
@@ -138,7 +175,7 @@ class RuleBasedJudge:
 
     def record_response(self, channel_id: int) -> None:
         """応答した時刻を記録してクールダウンを開始する"""
-        self._last_response_times[channel_id] = datetime.now(timezone.utc)
+        self._last_response_times[channel_id] = self._clock()
         logger.debug(f"クールダウン記録: チャンネル={channel_id}")
 
     def _is_engaged(self, channel_id: int) -> bool:
@@ -146,7 +183,7 @@ class RuleBasedJudge:
         if channel_id not in self._last_response_times:
             return False
         last_time = self._last_response_times[channel_id]
-        now = datetime.now(timezone.utc)
+        now = self._clock()
         elapsed = (now - last_time).total_seconds()
         return elapsed < config.ENGAGEMENT_DURATION_SECONDS
 
@@ -159,18 +196,20 @@ class RuleBasedJudge:
         if channel_id not in self._last_response_times:
             return False
         last_time = self._last_response_times[channel_id]
-        now = datetime.now(timezone.utc)
+        now = self._clock()
         elapsed = (now - last_time).total_seconds()
         return elapsed < config.COOLDOWN_SECONDS
 
-    def _is_expert_topic(self, recent_messages: list[ChannelMessage]) -> bool:
-        """直近メッセージにキーワードが含まれるかチェックする"""
-        if not self._keywords:
-            return False
-        combined = " ".join(
-            msg.content for msg in recent_messages if not msg.is_bot
-        )
-        return any(kw in combined for kw in self._keywords)
+    def _sync_features(
+        self, channel_id: int, recent_messages: list[ChannelMessage]
+    ) -> "_ChannelFeatures":
+        """チャンネルの特徴量を recent_messages に合わせて差分更新して返す"""
+        features = self._features.get(channel_id)
+        if features is None:
+            features = _ChannelFeatures(self)
+            self._features.put(channel_id, features)
+        features.sync(recent_messages)
+        return features
 
     def _determine_response_type(self, score: int, is_engaged: bool) -> str:
         """スコアに基づいて応答タイプを決定する"""
@@ -187,69 +226,146 @@ class RuleBasedJudge:
         return "full_response"
 
 
-def _count_unique_authors(messages: list[ChannelMessage]) -> int:
-    """メッセージリスト内のユニーク非bot著者数を返す"""
-    return len({msg.author_id for msg in messages if not msg.is_bot})
-
-
-def _has_bot_mention_in_recent(messages: list[ChannelMessage]) -> bool:
-    """直近メッセージにBOT_NAMEを含む非botメッセージがあるか"""
-    bot_name = config.BOT_NAME
-    return any(
-        bot_name in msg.content for msg in messages if not msg.is_bot
-    )
-
-
-def _is_high_frequency(
-    messages: list[ChannelMessage],
-    window_seconds: int = 60,
-    threshold: int = 10,
-) -> bool:
-    """直近N件がwindow_seconds以内に集中しているか"""
-    non_bot = [msg for msg in messages if not msg.is_bot]
-    if len(non_bot) < threshold:
-        return False
-    recent = non_bot[-threshold:]
-    first_ts = recent[0].timestamp.replace(tzinfo=timezone.utc)
-    last_ts = recent[-1].timestamp.replace(tzinfo=timezone.utc)
-    return (last_ts - first_ts).total_seconds() <= window_seconds
-
-
-def _is_first_after_silence(
-    messages: list[ChannelMessage],
-    silence_minutes: int = 10,
-) -> bool:
-    """直前メッセージとの間隔がsilence_minutes以上あるか"""
-    non_bot = [msg for msg in messages if not msg.is_bot]
-    if len(non_bot) < 2:
-        return False
-    prev = non_bot[-2]
-    curr = non_bot[-1]
-    prev_ts = prev.timestamp.replace(tzinfo=timezone.utc)
-    curr_ts = curr.timestamp.replace(tzinfo=timezone.utc)
-    return (curr_ts - prev_ts).total_seconds() >= silence_minutes * 60
-
-
-def _detect_conversation_decay(
-    messages: list[ChannelMessage],
-    window: int = 6,
-) -> int:
-    """直近メッセージの平均文字数の減衰を検出する
-
-    Returns:
-        -10 ~ -15 (減衰あり) or 0 (減衰なし)
+class _FeatureEntry:
+    """特徴量の計算に使う1メッセージ分の値（追加時に一度だけ計算する）"""
+
+    __slots__ = ("message", "is_bot", "author_id", "ts", "length", "mentions_bot", "has_keyword")
+
+    def __init__(self, message: ChannelMessage, judge: RuleBasedJudge) -> None:
+        self.message = message
+        self.is_bot = message.is_bot
+        self.author_id = message.author_id
+        self.ts = message.ts
+        self.length = len(message.content)
+        if message.is_bot:
+            self.mentions_bot = self.has_keyword = False
+        else:
+            hits = judge.pattern_hits(message)
+            self.mentions_bot = judge._bot_name in hits
+            self.has_keyword = any(kw in hits for kw in judge._keywords)
+
+
+class _ChannelFeatures:
+    """直近メッセージ窓の特徴量（著者数・ボット言及・キーワード・非botメッセージ列）
+
+    sync() に渡された窓と前回の窓を先頭・末尾のメッセージの同一性で突き合わせ、
+    窓から外れた分を引いて新しく入った分を足す。バッファから取得した窓は
+    呼び出しごとに末尾が数件進むだけなので、判定は償却 O(1) になる。
+    突き合わせられない場合（別のリスト・途中への挿入）は作り直す。
     """
-    non_bot = [msg for msg in messages if not msg.is_bot]
-    if len(non_bot) < window:
-        return 0
 
-    recent = non_bot[-window:]
-    half = window // 2
-    first_half = recent[:half]
-    second_half = recent[half:]
+    # 高頻度・沈黙・減衰の判定に使う非botメッセージの最大件数
+    _NON_BOT_HISTORY = 10
+
+    def __init__(self, judge: RuleBasedJudge) -> None:
+        self._judge = judge
+        self._entries: deque[_FeatureEntry] = deque()
+        self._author_counts: dict[int, int] = {}
+        self._mention_count = 0
+        self._keyword_count = 0
+        # 窓内の非botメッセージの末尾 _NON_BOT_HISTORY 件と、窓内の非bot件数
+        self._non_bot: deque[_FeatureEntry] = deque(maxlen=self._NON_BOT_HISTORY)
+        self._non_bot_count = 0
+
+    def sync(self, messages: list[ChannelMessage]) -> None:
+        """特徴量を messages（古い順の窓）に合わせる"""
+        if not self._entries:
+            self._rebuild(messages)
+            return
+        last = self._entries[-1].message
+        j = len(messages) - 1
+        while j >= 0 and messages[j] is not last:
+            j -= 1
+        if j < 0:
+            self._rebuild(messages)
+            return
+        first = messages[0]
+        while self._entries and self._entries[0].message is not first:
+            self._remove_oldest()
+        if len(self._entries) != j + 1:
+            self._rebuild(messages)
+            return
+        for msg in messages[j + 1 :]:
+            self._append(msg)
+
+    def unique_authors(self) -> int:
+        return len(self._author_counts)
+
+    def has_bot_mention(self) -> bool:
+        return self._mention_count > 0
+
+    def has_keyword(self) -> bool:
+        return self._keyword_count > 0
+
+    def is_high_frequency(self, window_seconds: int = 60, threshold: int = 10) -> bool:
+        """直近 threshold 件の非botメッセージが window_seconds 以内に集中しているか"""
+        if self._non_bot_count < threshold:
+            return False
+        return self._non_bot[-1].ts - self._non_bot[-threshold].ts <= window_seconds
+
+    def is_first_after_silence(self, silence_minutes: int = 10) -> bool:
+        """直前の非botメッセージとの間隔が silence_minutes 以上あるか"""
+        if self._non_bot_count < 2:
+            return False
+        return self._non_bot[-1].ts - self._non_bot[-2].ts >= silence_minutes * 60
+
+    def conversation_decay(self, window: int = 6) -> int:
+        """直近 window 件の非botメッセージの前半と後半の平均文字数から減衰スコアを返す
 
-    avg_first = sum(len(m.content) for m in first_half) / len(first_half)
-    avg_second = sum(len(m.content) for m in second_half) / len(second_half)
+        Returns:
+            -10 ~ -15 (減衰あり) or 0 (減衰なし)
+        """
+        if self._non_bot_count < window:
+            return 0
+        lengths = [self._non_bot[i].length for i in range(-window, 0)]
+        return _decay_score(lengths)
+
+    def _rebuild(self, messages: list[ChannelMessage]) -> None:
+        self._entries.clear()
+        self._author_counts.clear()
+        self._mention_count = 0
+        self._keyword_count = 0
+        self._non_bot.clear()
+        self._non_bot_count = 0
+        for msg in messages:
+            self._append(msg)
+
+    def _append(self, msg: ChannelMessage) -> None:
+        entry = _FeatureEntry(msg, self._judge)
+        self._entries.append(entry)
+        if entry.is_bot:
+            return
+        self._author_counts[entry.author_id] = self._author_counts.get(entry.author_id, 0) + 1
+        self._mention_count += entry.mentions_bot
+        self._keyword_count += entry.has_keyword
+        self._non_bot.append(entry)
+        self._non_bot_count += 1
+
+    def _remove_oldest(self) -> None:
+        entry = self._entries.popleft()
+        if entry.is_bot:
+            return
+        remaining = self._author_counts[entry.author_id] - 1
+        if remaining:
+            self._author_counts[entry.author_id] = remaining
+        else:
+            del self._author_counts[entry.author_id]
+        self._mention_count -= entry.mentions_bot
+        self._keyword_count -= entry.has_keyword
+        self._non_bot_count -= 1
+        # 末尾 _NON_BOT_HISTORY 件より古いものは _non_bot に残っていない
+        if self._non_bot_count < len(self._non_bot):
+            self._non_bot.popleft()
+
+
+def _decay_score(lengths: list[int]) -> int:
+    """文字数列の前半と後半の平均の比から減衰スコアを返す"""
+    half = len(lengths) // 2
+    first_half = lengths[:half]
+    second_half = lengths[half:]
+
+    avg_first = sum(first_half) / len(first_half)
+    avg_second = sum(second_half) / len(second_half)
 
     if avg_first == 0:
         return 0
@@ -0,0 +1,327 @@
+"""RuleBasedJudge のオフラインリプレイ（閾値調整用）
+
+記録済み、または合成したチャンネルログを、メッセージの時刻に合わせて進む
+仮想時計の上で RuleBasedJudge に流し、bot/events.py の自律応答と同じ分岐で
+判定の内訳・ルールの発火回数・LLM Judge の呼び出し回数を集計する。
+LLM Judge 自体は呼ばず、中間スコアで応答に進む割合を llm_accept_rate で仮定する。
+JUDGE_CACHE_ENABLED=true なら LLM Judge の判定キャッシュも同じ仮想時計で再現し、
+回避できた呼び出し回数を llm_cache_hits として数える。
+
+ログは1行1メッセージの JSONL:
+    {"channel_id": 1, "author_id": 2, "author_name": "A", "content": "...",
+     "timestamp": "2025-01-01T00:00:00+00:00" | 1735689600.0, "is_bot": false}
+
+使い方:
+    python scripts/judge_replay.py --log channel_log.jsonl --set JUDGE_SCORE_THRESHOLD=30
+    python scripts/judge_replay.py --synthetic 5000
+"""
+
+import json
+import random
+import re
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+import config
+from memory.judge import RuleBasedJudge
+from memory.llm_judge import _DecisionCache
+from memory.short_term import ChannelMessage, ChannelMessageBuffer
+
+# bot/events.py の _try_autonomous_response と同じ直近メッセージ数
+_RECENT_LIMIT = 20
+# bot/events.py で LLM Judge に渡す会話の行数
+_LLM_CONTEXT_LIMIT = 15
+
+_REASON_RULE = re.compile(r"^(.+?)\(")
+
+
+@dataclass
+class ReplayReport:
+    """リプレイの集計結果"""
+
+    messages: int = 0  # ボット以外のメッセージ数（mention を含む）
+    span_seconds: float = 0.0  # ログ上の経過時間
+    elapsed_seconds: float = 0.0  # evaluate にかかった実時間
+    decisions: Counter = field(default_factory=Counter)
+    rules: Counter = field(default_factory=Counter)
+    response_types: Counter = field(default_factory=Counter)
+    reactions: int = 0
+    llm_calls: int = 0
+    llm_cache_hits: int = 0
+
+    @property
+    def messages_per_second(self) -> float:
+        """evaluate の処理性能（1秒あたりの判定数）"""
+        evaluated = self.messages - self.decisions["mention"]
+        return evaluated / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def llm_calls_per_hour(self) -> float:
+        """ログ上の1時間あたりの LLM Judge 呼び出し回数"""
+        return self.llm_calls * 3600 / self.span_seconds if self.span_seconds else 0.0
+
+    @property
+    def llm_cache_hit_rate(self) -> float:
+        """中間スコアのうち判定キャッシュで LLM Judge を呼ばずに済んだ割合"""
+        lookups = self.llm_calls + self.llm_cache_hits
+        return self.llm_cache_hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "messages": self.messages,
+            "span_seconds": round(self.span_seconds, 1),
+            "messages_per_second": round(self.messages_per_second, 1),
+            "decisions": dict(self.decisions),
+            "rules": dict(self.rules.most_common()),
+            "response_types": dict(self.response_types),
+            "reactions": self.reactions,
+            "llm_calls": self.llm_calls,
+            "llm_call_rate": round(self.llm_calls / self.messages, 4) if self.messages else 0.0,
+            "llm_calls_per_hour": round(self.llm_calls_per_hour, 1),
+            "llm_cache_hits": self.llm_cache_hits,
+            "llm_cache_hit_rate": round(self.llm_cache_hit_rate, 4),
+        }
+
+
+class _ReplayClock:
+    """メッセージの時刻に合わせて進める仮想時計"""
+
+    def __init__(self) -> None:
+        self.ts = 0.0
+
+    def epoch(self) -> float:
+        return self.ts
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.ts, timezone.utc)
+
+
+@contextmanager
+def config_overrides(overrides: dict[str, object]) -> Iterator[None]:
+    """config の値を一時的に差し替える（未定義の名前は ValueError）"""
+    saved: dict[str, object] = {}
+    for name in overrides:
+        if not hasattr(config, name):
+            raise ValueError(f"未定義の設定項目: {name}")
+        saved[name] = getattr(config, name)
+    try:
+        for name, value in overrides.items():
+            setattr(config, name, value)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+
+def parse_override(text: str) -> tuple[str, object]:
+    """"NAME=VALUE" を現在の config の型に合わせて変換する"""
+    name, sep, raw = text.partition("=")
+    if not sep or not hasattr(config, name):
+        raise ValueError(f"不正な設定指定: {text}")
+    current = getattr(config, name)
+    value: object
+    if isinstance(current, bool):
+        value = raw.lower() == "true"
+    elif isinstance(current, int):
+        value = int(raw)
+    elif isinstance(current, float):
+        value = float(raw)
+    else:
+        value = raw
+    return name, value
+
+
+def load_log(path: str) -> list[ChannelMessage]:
+    """JSONL のチャンネルログを読み込み、時刻順に並べて返す"""
+    messages: list[ChannelMessage] = []
+    with open(path, encoding="utf-8") as f:
+        for i, line in enumerate(f):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            timestamp = row["timestamp"]
+            if isinstance(timestamp, str):
+                timestamp = datetime.fromisoformat(timestamp)
+            messages.append(
+                ChannelMessage(
+                    message_id=row.get("message_id", i),
+                    channel_id=row["channel_id"],
+                    author_id=row["author_id"],
+                    author_name=row.get("author_name", str(row["author_id"])),
+                    content=row.get("content", ""),
+                    timestamp=timestamp,
+                    is_bot=row.get("is_bot", False),
+                )
+            )
+    messages.sort(key=lambda m: m.ts)
+    return messages
+
+
+def synthetic_log(count: int, channels: int = 5, seed: int = 0) -> list[ChannelMessage]:
+    """会話の盛り上がりと沈黙を混ぜた合成ログを生成する"""
+    rng = random.Random(seed)
+    contents = [
+        "おはよ",
+        "今日の零式どうする？",
+        "w",
+        "それな",
+        "ギミック難しすぎて全然クリアできなかった",
+        f"{config.BOT_NAME}おすすめある？",
+        "了解",
+        "明日は何時から？",
+        "ハウジングの土地が当たった！",
+    ]
+    ts = datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp()
+    messages: list[ChannelMessage] = []
+    for i in range(count):
+        # 多くは数秒〜数十秒間隔、時々10分以上の沈黙
+        ts += rng.choice([2, 5, 10, 30, 60]) if rng.random() > 0.05 else rng.randint(600, 3600)
+        channel_id = rng.randint(1, channels)
+        author_id = rng.randint(1, 6)
+        messages.append(
+            ChannelMessage(
+                message_id=i,
+                channel_id=channel_id,
+                author_id=author_id,
+                author_name=f"user{author_id}",
+                content=rng.choice(contents),
+                timestamp=ts,
+                is_bot=False,
+            )
+        )
+    return messages
+
+
+def replay(
+    messages: Iterable[ChannelMessage],
+    llm_accept_rate: float = 0.0,
+    seed: int = 0,
+) -> ReplayReport:
+    """メッセージを時刻順に判定し、自律応答の分岐ごとに集計する
+
+    分岐は bot/events.py と同じ:
+    - BOT_NAME を含む → mention（通常応答として応答記録）
+    - JUDGE_DEBOUNCE_SECONDS 以内に同じチャンネルで次のメッセージが来る → debounced
+    - スコア >= JUDGE_LLM_THRESHOLD_HIGH → respond（react_only かつリアクション済みなら応答なし）
+    - スコア <= JUDGE_LLM_THRESHOLD_LOW → skip
+    - それ以外 → VANGUARD 有効なら llm（llm_accept_rate の確率で応答。判定キャッシュに
+      ヒットすればその判定を使い、呼び出し回数には数えない）、無効なら should_respond に従う
+
+    応答した場合はボットの発言をバッファに加え、クールダウン・エンゲージメントを記録する。
+    """
+    rng = random.Random(seed)
+    clock = _ReplayClock()
+    judge = RuleBasedJudge(clock=clock.now)
+    buffer = ChannelMessageBuffer(
+        max_size=config.CHANNEL_BUFFER_SIZE,
+        ttl_minutes=config.CHANNEL_BUFFER_TTL_MINUTES,
+        clock=clock.epoch,
+    )
+    cache = _DecisionCache(clock=clock.epoch)
+    report = ReplayReport()
+    first_ts: float | None = None
+    elapsed = 0.0
+    messages = list(messages)
+    superseded = _superseded(messages, config.JUDGE_DEBOUNCE_SECONDS)
+
+    for i, msg in enumerate(messages):
+        clock.ts = max(clock.ts, msg.ts)
+        if first_ts is None:
+            first_ts = msg.ts
+        buffer.add_message(msg)
+        if msg.is_bot:
+            continue
+
+        report.messages += 1
+        if config.BOT_NAME and config.BOT_NAME in msg.content:
+            report.decisions["mention"] += 1
+            report.response_types["full_response"] += 1
+            _record_response(judge, buffer, msg, clock)
+            continue
+        if i in superseded:
+            report.decisions["debounced"] += 1
+            continue
+
+        start = time.perf_counter()
+        result = judge.evaluate(msg, buffer.get_recent_messages(msg.channel_id, limit=_RECENT_LIMIT))
+        elapsed += time.perf_counter() - start
+        report.reactions += result.should_react
+        for part in result.reason.split(", "):
+            match = _REASON_RULE.match(part)
+            if match:
+                report.rules[match.group(1)] += 1
+
+        response_type: str | None = None
+        if result.score >= config.JUDGE_LLM_THRESHOLD_HIGH:
+            decision = "respond"
+            if result.response_type != "react_only" or not result.should_react:
+                response_type = result.response_type
+        elif result.score <= config.JUDGE_LLM_THRESHOLD_LOW:
+            decision = "skip"
+        elif config.VANGUARD_ENABLED:
+            decision = "llm"
+            context = buffer.get_context_string(msg.channel_id, limit=_LLM_CONTEXT_LIMIT)
+            cached = cache.get(msg.channel_id, msg.content, context) if config.JUDGE_CACHE_ENABLED else None
+            if cached is not None:
+                report.llm_cache_hits += 1
+                accepted = cached[0]
+            else:
+                report.llm_calls += 1
+                accepted = rng.random() < llm_accept_rate
+                if config.JUDGE_CACHE_ENABLED:
+                    verdict = "full_response" if accepted else "none"
+                    cache.put(msg.channel_id, msg.content, context, (accepted, verdict, False, []))
+            if accepted:
+                response_type = "full_response"
+        else:
+            decision = "rule"
+            if result.should_respond:
+                response_type = result.response_type
+
+        report.decisions[decision] += 1
+        if response_type is not None:
+            report.response_types[response_type] += 1
+            if response_type != "react_only":
+                _record_response(judge, buffer, msg, clock)
+
+    report.span_seconds = clock.ts - first_ts if first_ts is not None else 0.0
+    report.elapsed_seconds = elapsed
+    return report
+
+
+def _superseded(messages: list[ChannelMessage], debounce_seconds: float) -> set[int]:
+    """静穏期間内に同じチャンネルで次の（ボット以外の）メッセージが来るものの位置"""
+    if debounce_seconds <= 0:
+        return set()
+    superseded: set[int] = set()
+    last_index: dict[int, int] = {}
+    for i, msg in enumerate(messages):
+        if msg.is_bot:
+            continue
+        prev = last_index.get(msg.channel_id)
+        if prev is not None and msg.ts - messages[prev].ts < debounce_seconds:
+            superseded.add(prev)
+        last_index[msg.channel_id] = i
+    return superseded
+
+
+def _record_response(
+    judge: RuleBasedJudge, buffer: ChannelMessageBuffer, msg: ChannelMessage, clock: _ReplayClock
+) -> None:
+    """応答したものとしてクールダウンを記録し、ボットの発言をバッファに加える"""
+    judge.record_response(msg.channel_id)
+    buffer.add_message(
+        ChannelMessage(
+            message_id=0,
+            channel_id=msg.channel_id,
+            author_id=0,
+            author_name=config.BOT_NAME,
+            content="(応答)",
+            timestamp=clock.now() + timedelta(seconds=1),
+            is_bot=True,
+        )
+    )
@@ -2,13 +2,18 @@
 
 import json
 import asyncio
+import time
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
 from html import escape
+from typing import Any
 
 import config
 from ai.client import _get_genai_client, get_lite_model_name
 from ai.api import generate_content_with_retry as _generate_content_with_retry
 from google.genai import types
 from log_utils.logger import logger
+from utils.simhash import hamming_distance, normalize_text, simhash
 
 LLM_JUDGE_PROMPT = """\
 あなたはDiscordボットの応答判定AIです。
@@ -28,40 +33,294 @@ JSONで回答してください:
 emojis は文脈に合う Unicode 絵文字を 0〜2 個のリストで返してください。
 """
 
+BATCH_LLM_JUDGE_PROMPT = """\
+あなたはDiscordボットの応答判定AIです。
+以下に複数チャンネルの判定依頼があります。依頼ごとに、そのチャンネルの会話の流れと
+最新メッセージだけを読んで、ボット「{bot_name}」が自然に会話に参加すべきかと、
+その場合の応答形式を独立に判定してください。依頼間で内容を混ぜないでください。
+
+応答形式の種類:
+- "full": 通常の返信（質問への回答、意見の提示、会話の深掘りなど）
+- "short": 短い相槌や同意（「わかる！」「そうなんだね」など）
+- "react": 絵文字リアクションのみ（スタンプ的な応答）
+- "none": 応答しない（会話を静観する）
+
+{requests}
+
+以下のJSON形式で、全依頼分を回答してください:
+{{"decisions": [{{"id": "依頼ID", "respond": true/false, "response_type": "full"|"short"|"react"|"none",
+ "react": true/false, "emojis": ["絵文字1", "絵文字2"], "reason": "判定理由"}}]}}
+
+emojis は文脈に合う Unicode 絵文字を 0〜2 個のリストで返してください。
+"""
+
+JudgeDecision = tuple[bool, str, bool, list[str]]
+
+# 判定できなかった場合（応答しない）。LLMの失敗はキャッシュしない
+_NO_DECISION: JudgeDecision = (False, "none", False, [])
+
+
+# 判定キャッシュの上限（チャンネルあたりのエントリ数・保持するチャンネル数）
+_CACHE_MAX_ENTRIES_PER_CHANNEL = 32
+_CACHE_MAX_CHANNELS = 256
+
+
+@dataclass
+class _CacheEntry:
+    message: str  # 正規化済みの最新メッセージ
+    context_hash: int  # 圧縮した直近の会話の SimHash
+    expires_at: float
+    decision: JudgeDecision
+
+
+class _DecisionCache:
+    """ほぼ同じ状況に対する LLM Judge の判定を短時間使い回すキャッシュ
+
+    チャンネルごとに分離し、正規化した最新メッセージが一致し、かつ直近の会話
+    （発言者名を除いた末尾 JUDGE_CACHE_CONTEXT_LINES 行）の SimHash のハミング距離が
+    JUDGE_CACHE_MAX_DISTANCE 以下のエントリをヒットとみなす。
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._entries: dict[int, list[_CacheEntry]] = {}
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(message_content: str, recent_context: str) -> tuple[str, int]:
+        """最新メッセージの正規化文字列と、圧縮した会話の SimHash を返す"""
+        lines = recent_context.splitlines()[-max(1, config.JUDGE_CACHE_CONTEXT_LINES):]
+        compacted = "\n".join(normalize_text(line.partition(": ")[2] or line) for line in lines)
+        return normalize_text(message_content), simhash(compacted)
+
+    def get(self, channel_id: int, message_content: str, recent_context: str) -> JudgeDecision | None:
+        """有効期限内の近似一致エントリの判定を返す（なければ None）"""
+        message, context_hash = self.fingerprint(message_content, recent_context)
+        entries = self._live_entries(channel_id)
+        if message:
+            for entry in reversed(entries):
+                if entry.message == message and (
+                    hamming_distance(entry.context_hash, context_hash)
+                    <= config.JUDGE_CACHE_MAX_DISTANCE
+                ):
+                    self.hits += 1
+                    should_respond, response_type, should_react, emojis = entry.decision
+                    return should_respond, response_type, should_react, list(emojis)
+        self.misses += 1
+        return None
+
+    def put(
+        self, channel_id: int, message_content: str, recent_context: str, decision: JudgeDecision
+    ) -> None:
+        """判定結果を JUDGE_CACHE_TTL_SECONDS だけ保持する（空メッセージは保持しない）"""
+        message, context_hash = self.fingerprint(message_content, recent_context)
+        if not message:
+            return
+        if channel_id not in self._entries and len(self._entries) >= _CACHE_MAX_CHANNELS:
+            self._prune()
+        entries = self._entries.setdefault(channel_id, [])
+        entries.append(
+            _CacheEntry(
+                message, context_hash, self._clock() + config.JUDGE_CACHE_TTL_SECONDS, decision
+            )
+        )
+        del entries[:-_CACHE_MAX_ENTRIES_PER_CHANNEL]
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _live_entries(self, channel_id: int) -> list[_CacheEntry]:
+        """期限切れを除いたチャンネルのエントリ（古い順）"""
+        entries = self._entries.get(channel_id)
+        if not entries:
+            return []
+        now = self._clock()
+        live = [entry for entry in entries if entry.expires_at > now]
+        if live:
+            self._entries[channel_id] = live
+        else:
+            del self._entries[channel_id]
+        return live
+
+    def _prune(self) -> None:
+        """期限切れのみのチャンネルを捨て、なお上限以上なら最も古いチャンネルから捨てる"""
+        now = self._clock()
+        for channel_id in [c for c, entries in self._entries.items() if entries[-1].expires_at <= now]:
+            del self._entries[channel_id]
+        while len(self._entries) >= _CACHE_MAX_CHANNELS:
+            del self._entries[next(iter(self._entries))]
+
+
+@dataclass
+class _PendingEvaluation:
+    """バッチ送信を待っている判定依頼"""
+
+    key: str
+    message_content: str
+    recent_context: str
+    bot_name: str
+    future: "asyncio.Future[JudgeDecision | None]"
+
 
 class LLMJudge:
-    """曖昧なケースのみLLMで二次判定する"""
+    """曖昧なケースのみLLMで二次判定する
+
+    JUDGE_BATCH_ENABLED=true の場合、JUDGE_BATCH_WINDOW_MS の間に集まった
+    判定依頼（チャンネルを問わない）を最大 JUDGE_BATCH_MAX_ITEMS 件ずつ1回の
+    LLM呼び出しにまとめ、依頼IDごとの結果を待っている呼び出し元に返す。
+    期間中に1件しか集まらなければ従来通り単独で判定する。
+
+    JUDGE_CACHE_ENABLED=true の場合、同じチャンネルでほぼ同じ状況（挨拶の連鎖や
+    スタンプの連投など）の判定を JUDGE_CACHE_TTL_SECONDS の間使い回す。
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._cache = _DecisionCache(clock)
+        self._pending: list[_PendingEvaluation] = []
+        self._flush_task: asyncio.Task | None = None
+        # 送信中のバッチ（イベントループは弱参照しか持たないため、完了まで参照を保持する）
+        self._batch_tasks: set[asyncio.Task] = set()
+        self._sequence = 0
+        self._requests = 0
+        self._decisions = 0
 
     async def evaluate(
         self,
         message_content: str,
         recent_context: str,
         bot_name: str,
-    ) -> tuple[bool, str, bool, list[str]]:
+        channel_id: int | None = None,
+        message_id: int | None = None,
+    ) -> JudgeDecision:
         """LLMで応答すべきかとその形式を判定する
 
+        Args:
+            channel_id: チャンネルID（バッチ時の依頼IDに使用）
+            message_id: メッセージID（バッチ時の依頼IDに使用）
+
         Returns:
             tuple[bool, str, bool, list[str]]:
                 (should_respond, response_type, should_react, reaction_emojis)
         """
+        use_cache = config.JUDGE_CACHE_ENABLED
         try:
-            should_respond, response_type, should_react, reaction_emojis = (
-                await asyncio.to_thread(
+            if use_cache and channel_id is not None:
+                cached = self._cache.get(channel_id, message_content, recent_context)
+                if cached is not None:
+                    logger.debug(f"LLM Judge判定キャッシュヒット: チャンネル={channel_id}")
+                    return cached
+            if config.JUDGE_BATCH_ENABLED:
+                decision = await self._evaluate_batched(
+                    message_content, recent_context, bot_name, channel_id, message_id
+                )
+            else:
+                self._requests += 1
+                self._decisions += 1
+                decision = await asyncio.to_thread(
                     self._call_llm, message_content, recent_context, bot_name
                 )
-            )
+            if decision is None:
+                # 失敗（レート制限・タイムアウト・不正な応答）は次回 LLM に再判定させる
+                return _NO_DECISION
+            if use_cache and channel_id is not None:
+                self._cache.put(channel_id, message_content, recent_context, decision)
+            should_respond, response_type, should_react, reaction_emojis = decision
             return should_respond, response_type, should_react, reaction_emojis
         except Exception as e:
             logger.error(f"LLM Judge呼び出しエラー: {str(e)}", exc_info=True)
             return False, "react_only", False, []
 
+    def stats(self) -> dict[str, int | float]:
+        """LLM呼び出し回数・判定件数・判定キャッシュのヒット率を返す"""
+        return {
+            "requests": self._requests,
+            "decisions": self._decisions,
+            "cache_hits": self._cache.hits,
+            "cache_misses": self._cache.misses,
+            "cache_hit_rate": round(self._cache.hit_rate(), 3),
+        }
+
+    async def _evaluate_batched(
+        self,
+        message_content: str,
+        recent_context: str,
+        bot_name: str,
+        channel_id: int | None,
+        message_id: int | None,
+    ) -> JudgeDecision | None:
+        """判定依頼をバッチに積み、結果が返るまで待つ（判定できなければ None）"""
+        self._sequence += 1
+        key = (
+            f"{channel_id}:{message_id}"
+            if channel_id is not None and message_id is not None
+            else str(self._sequence)
+        )
+        if any(item.key == key for item in self._pending):
+            key = f"{key}#{self._sequence}"
+        future: asyncio.Future[JudgeDecision | None] = asyncio.get_running_loop().create_future()
+        self._pending.append(
+            _PendingEvaluation(key, message_content, recent_context, bot_name, future)
+        )
+        if len(self._pending) >= max(1, config.JUDGE_BATCH_MAX_ITEMS):
+            if self._flush_task is not None:
+                self._flush_task.cancel()
+                self._flush_task = None
+            batch, self._pending = self._pending, []
+            self._start_task(self._run_batch(batch), name="llm_judge_batch")
+        elif self._flush_task is None:
+            # 集約期間の経過後は _flush_task から外れるため、送信中も _batch_tasks で参照を保持する
+            self._flush_task = self._start_task(
+                self._flush_after_window(), name="llm_judge_batch_window"
+            )
+        return await future
+
+    def _start_task(self, coro: Coroutine[Any, Any, None], name: str) -> asyncio.Task:
+        """バッチ送信タスクを開始し、完了まで参照を保持して失敗をログに残す"""
+        task = asyncio.create_task(coro, name=name)
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+        task.add_done_callback(_log_batch_failure)
+        return task
+
+    async def _flush_after_window(self) -> None:
+        """集約期間の経過後に溜まった依頼を送る"""
+        await asyncio.sleep(config.JUDGE_BATCH_WINDOW_MS / 1000)
+        self._flush_task = None
+        batch, self._pending = self._pending, []
+        if batch:
+            await self._run_batch(batch)
+
+    async def _run_batch(self, batch: list[_PendingEvaluation]) -> None:
+        """バッチを判定し、各依頼の Future に結果を設定する（失敗・欠落分は None）"""
+        results: dict[str, JudgeDecision | None] = {}
+        try:
+            self._requests += 1
+            self._decisions += len(batch)
+            if len(batch) == 1:
+                item = batch[0]
+                results[item.key] = await asyncio.to_thread(
+                    self._call_llm, item.message_content, item.recent_context, item.bot_name
+                )
+            else:
+                logger.debug(f"LLM Judgeバッチ判定: {len(batch)}件")
+                results.update(await asyncio.to_thread(self._call_batch_llm, batch))
+        except Exception as e:
+            logger.error(f"LLM Judgeバッチ判定エラー: {str(e)}", exc_info=True)
+        for item in batch:
+            if item.key not in results and len(batch) > 1:
+                logger.warning(f"LLM Judgeバッチ結果が欠落: id={item.key}")
+            if not item.future.done():
+                item.future.set_result(results.get(item.key))
+
     def _call_llm(
         self,
         message_content: str,
         recent_context: str,
         bot_name: str,
-    ) -> tuple[bool, str, bool, list[str]]:
-        """Google Gen AI SDKを同期的に呼び出す"""
+    ) -> JudgeDecision | None:
+        """Google Gen AI SDKを同期的に呼び出す（失敗・空の応答は None）"""
         client = _get_genai_client()
         model_name = get_lite_model_name()
         
@@ -84,40 +343,123 @@ class LLMJudge:
 
             content = response.text
             if not content:
-                return False, "none", False, []
+                return None
 
             result = json.loads(content)
             if isinstance(result, list):
                 result = result[0] if result else {}
-            should_respond = bool(result.get("respond", False))
-            llm_type = result.get("response_type", "none")
-
-            # 内部形式に変換
-            type_map = {
-                "full": "full_response",
-                "short": "short_ack",
-                "react": "react_only",
-                "none": "none"
-            }
-            final_type = type_map.get(llm_type, "react_only")
+            return _parse_decision(result)
+
+        except Exception as e:
+            logger.warning(f"LLM Judge処理失敗: {str(e)}")
+            return None
+
+    def _call_batch_llm(self, batch: list[_PendingEvaluation]) -> dict[str, JudgeDecision]:
+        """複数の判定依頼を1回のLLM呼び出しで判定する（同期）
 
-            if not should_respond:
-                final_type = "none"
+        Returns:
+            {依頼ID: 判定結果} の辞書（失敗時は空辞書）
+        """
+        client = _get_genai_client()
+        model_name = get_lite_model_name()
 
-            should_react = bool(result.get("react", False))
-            raw_emojis = result.get("emojis", [])
-            emojis: list[str] = [e for e in raw_emojis if isinstance(e, str)][:2]
+        sections = [
+            f'<request id="{escape(item.key, quote=True)}">\n'
+            f"直近の会話:\n<context>{escape(item.recent_context)}</context>\n"
+            f"最新メッセージ:\n<message>{escape(item.message_content)}</message>\n"
+            f"</request>"
+            for item in batch
+        ]
+        prompt = BATCH_LLM_JUDGE_PROMPT.format(
+            bot_name=batch[0].bot_name, requests="\n\n".join(sections)
+        )
 
-            logger.info(
-                f"LLM Judge判定: respond={should_respond}, type={final_type}, "
-                f"react={should_react}, emojis={emojis}, "
-                f"reason={result.get('reason', '')}"
+        logger.debug(f"LLM Judgeバッチ呼び出し: model={model_name}, 件数={len(batch)}")
+
+        try:
+            response = _generate_content_with_retry(
+                client=client,
+                model=model_name,
+                contents=[types.Content(role="user", parts=[types.Part.from_text(text=prompt)])],
+                config=types.GenerateContentConfig(
+                    temperature=0.1,
+                    response_mime_type="application/json",
+                ),
             )
-            return should_respond, final_type, should_react, emojis
 
+            content = response.text
+            if not content:
+                return {}
+
+            return {
+                key: _parse_decision(item)
+                for key, item in _parse_batch_result(json.loads(content)).items()
+            }
         except Exception as e:
-            logger.warning(f"LLM Judge処理失敗: {str(e)}")
-            return False, "none", False, []
+            logger.warning(f"LLM Judgeバッチ処理失敗: {str(e)}")
+            return {}
+
+
+def _log_batch_failure(task: asyncio.Task) -> None:
+    """バッチ送信タスクの想定外の例外をログに残す"""
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        logger.error(f"LLM Judgeバッチタスクでエラー: {str(exc)}", exc_info=exc)
+
+
+def _parse_decision(result: dict) -> JudgeDecision:
+    """LLMの判定結果（1件分）を内部形式に変換する"""
+    should_respond = bool(result.get("respond", False))
+    llm_type = result.get("response_type", "none")
+
+    # 内部形式に変換
+    type_map = {
+        "full": "full_response",
+        "short": "short_ack",
+        "react": "react_only",
+        "none": "none"
+    }
+    final_type = type_map.get(llm_type, "react_only")
+
+    if not should_respond:
+        final_type = "none"
+
+    should_react = bool(result.get("react", False))
+    raw_emojis = result.get("emojis", [])
+    emojis: list[str] = [e for e in raw_emojis if isinstance(e, str)][:2]
+
+    logger.info(
+        f"LLM Judge判定: respond={should_respond}, type={final_type}, "
+        f"react={should_react}, emojis={emojis}, "
+        f"reason={result.get('reason', '')}"
+    )
+    return should_respond, final_type, should_react, emojis
+
+
+def _parse_batch_result(raw: object) -> dict[str, dict]:
+    """バッチ判定のLLM出力を依頼IDごとの辞書に変換する
+
+    {"decisions": [...]} 形式・配列形式・{依頼ID: {...}} 形式のいずれも受け付ける。
+    """
+    items: list = []
+    if isinstance(raw, dict) and isinstance(raw.get("decisions"), list):
+        items = raw["decisions"]
+    elif isinstance(raw, list):
+        items = raw
+    elif isinstance(raw, dict):
+        items = [
+            {**value, "id": key}
+            for key, value in raw.items()
+            if isinstance(value, dict)
+        ]
+
+    results: dict[str, dict] = {}
+    for item in items:
+        if isinstance(item, dict) and item.get("id") is not None:
+            results[str(item["id"])] = item
+    return results
 
 
 _llm_judge: LLMJudge | None = None
@@ -2,6 +2,7 @@
 
 import asyncio
 import json
+import re
 import threading
 import uuid
 from datetime import datetime, timezone
@@ -57,6 +58,19 @@ USER_PROFILE_REFLECTION_PROMPT = """\
 """
 
 
+# 実質的な文字数に数えない要素（カスタム絵文字・メンション・URL）
+_NON_SUBSTANTIVE_PATTERN = re.compile(r"<a?:\w+:\d+>|<[@#][!&]?\d+>|https?://\S+")
+_NON_WORD_PATTERN = re.compile(r"\W+")
+# スキップ分のトークン数の概算に使う1トークンあたりの文字数（日本語・英語混在の目安）
+_CHARS_PER_TOKEN = 2
+
+
+def _substantive_length(content: str) -> int:
+    """絵文字・メンション・URL・記号・空白を除いた実質的な文字数を返す"""
+    text = _NON_SUBSTANTIVE_PATTERN.sub("", content)
+    return len(_NON_WORD_PATTERN.sub("", text))
+
+
 def _format_messages_for_reflection(messages: list[ChannelMessage]) -> str:
     """メッセージを反省会プロンプト用にフォーマットする（XMLタグでプロンプトインジェクション対策）"""
     lines = []
@@ -78,6 +92,15 @@ class ReflectionEngine:
     def __init__(self) -> None:
         self._running: set[int] = set()
         self._lock = threading.Lock()
+        # (チャンネル, ユーザー)ごとのプロファイル反省会ウォーターマーク（反映済みの最新発言のエポック秒）
+        # メモリ上のみで保持し、再起動後は最初の反省会で一度だけ再送される
+        self._profile_watermarks: dict[tuple[int, int], float] = {}
+        self._profile_stats = {
+            "users_sent": 0,
+            "users_skipped": 0,
+            "tokens_skipped": 0,
+            "calls_skipped": 0,
+        }
 
     def maybe_reflect(
         self, channel_id: int, recent_messages: list[ChannelMessage]
@@ -238,21 +261,106 @@ class ReflectionEngine:
         if saved_count > 0 or len(raw_facts) == 0:
             get_channel_buffer().mark_reflected(channel_id)
 
+    def profile_reflection_stats(self) -> dict[str, int]:
+        """プロファイル反省会の累計（送信/スキップしたユーザー数・推定スキップトークン数・省略した呼び出し数）"""
+        with self._lock:
+            return dict(self._profile_stats)
+
+    def _select_profile_messages(
+        self, messages: list[ChannelMessage]
+    ) -> tuple[list[ChannelMessage], dict[tuple[int, int], float]]:
+        """前回のプロファイル反映以降に十分な発言があるユーザーのメッセージだけを選ぶ
+
+        ウォーターマーク以前の発言とボットの発言は除外し、新しい発言の実質的な
+        文字数が REFLECTION_PROFILE_MIN_CHARS 未満のユーザーはスキップする。
+
+        Returns:
+            (LLMに送るメッセージ, 送信対象の(チャンネル, ユーザー)ごとの新しいウォーターマーク)
+        """
+        with self._lock:
+            watermarks = {
+                key: self._profile_watermarks.get(key)
+                for key in {(msg.channel_id, msg.author_id) for msg in messages}
+            }
+
+        new_messages: dict[tuple[int, int], list[ChannelMessage]] = {}
+        authors: set[tuple[int, int]] = set()
+        for msg in messages:
+            if msg.is_bot:
+                continue
+            key = (msg.channel_id, msg.author_id)
+            authors.add(key)
+            mark = watermarks.get(key)
+            if mark is None or msg.ts > mark:
+                new_messages.setdefault(key, []).append(msg)
+
+        min_chars = config.REFLECTION_PROFILE_MIN_CHARS
+        marks = {
+            key: max(m.ts for m in msgs)
+            for key, msgs in new_messages.items()
+            if sum(_substantive_length(m.content) for m in msgs) >= min_chars
+        }
+        selected = [
+            msg
+            for key, msgs in new_messages.items()
+            if key in marks
+            for msg in msgs
+        ]
+        selected.sort(key=lambda m: m.ts)
+
+        skipped_chars = len(_format_messages_for_reflection(messages)) - len(
+            _format_messages_for_reflection(selected)
+        )
+        skipped_users = len(authors) - len(marks)
+        with self._lock:
+            self._profile_stats["users_sent"] += len(marks)
+            self._profile_stats["users_skipped"] += skipped_users
+            self._profile_stats["tokens_skipped"] += skipped_chars // _CHARS_PER_TOKEN
+            if not selected:
+                self._profile_stats["calls_skipped"] += 1
+        logger.info(
+            f"ユーザープロファイル反省会の対象選定: 送信={len(marks)}人, "
+            f"スキップ={skipped_users}人, 推定削減トークン={skipped_chars // _CHARS_PER_TOKEN}"
+        )
+        return selected, marks
+
+    def _advance_profile_watermarks(self, marks: dict[tuple[int, int], float]) -> None:
+        """ウォーターマークを進め、バッファのTTLより古いものを削除する
+
+        TTLを超えた発言はチャンネルバッファから消えて再送されないため、
+        そのウォーターマークは不要になる。
+        """
+        if not marks:
+            return
+        horizon = max(marks.values()) - config.CHANNEL_BUFFER_TTL_MINUTES * 60
+        with self._lock:
+            for key, mark in marks.items():
+                current = self._profile_watermarks.get(key)
+                if current is None or mark > current:
+                    self._profile_watermarks[key] = mark
+            stale = [key for key, mark in self._profile_watermarks.items() if mark < horizon]
+            for key in stale:
+                del self._profile_watermarks[key]
+
     def _call_user_profile_llm(self, messages: list[ChannelMessage]) -> None:
         """ユーザープロファイル専用LLMコール。会話からユーザー特性を抽出してストアに反映
 
+        前回の反映以降に十分な新しい発言があるユーザーだけを対象にする。
+
         Args:
             messages: 対象メッセージリスト
         """
         from memory.user_profile import get_user_profile_store
 
-        client = get_genai_client()
-        model_name = get_model_name()
-
-        messages_text = _format_messages_for_reflection(messages)
+        selected, marks = self._select_profile_messages(messages)
+        user_ids = {uid for _, uid in marks}
+        messages_text = _format_messages_for_reflection(selected)
         if not messages_text:
             return
 
+        client = get_genai_client()
+        model_name = get_model_name()
+
         prompt = USER_PROFILE_REFLECTION_PROMPT.format(messages=messages_text)
 
         try:
@@ -285,14 +393,15 @@ class ReflectionEngine:
                 if not isinstance(item, dict):
                     continue
                 user_id = item.get("user_id")
-                if isinstance(user_id, int):
+                if isinstance(user_id, str) and user_id.isdigit():
+                    user_id = int(user_id)
+                # 送信対象外のユーザー（ボットや他の登場人物）は反映しない
+                if isinstance(user_id, int) and user_id in user_ids:
                     store.update_from_reflection(user_id, item)
                     updated_count += 1
-                elif isinstance(user_id, str) and user_id.isdigit():
-                    store.update_from_reflection(int(user_id), item)
-                    updated_count += 1
             if updated_count > 0:
-                store.persist_all()
+                store.persist_dirty()
+            self._advance_profile_watermarks(marks)
             logger.info(f"ユーザープロファイル反省会完了: {updated_count}件処理")
         except json.JSONDecodeError as e:
             logger.warning(f"ユーザープロファイルLLM JSONパースエラー: {e}")
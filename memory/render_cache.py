@@ -0,0 +1,73 @@
+"""プロンプト注入用文字列のメモ化: 依存フィールドの変更時のみ再レンダリングする"""
+
+from collections.abc import Callable, Hashable
+from typing import Any, ClassVar
+
+
+class RenderCacheMixin:
+    """フォーマット済み文字列をセクション単位でキャッシュする dataclass 用ミックスイン
+
+    サブクラスは _RENDER_DEPENDENCIES にセクション名と依存フィールド名を宣言する。
+    依存フィールドへの代入（__setattr__）でそのセクションのキャッシュだけが破棄され、
+    render_version が進む。リストをインプレースで変更した場合は
+    invalidate_render_cache() を呼ぶこと。
+    """
+
+    _RENDER_DEPENDENCIES: ClassVar[dict[str, frozenset[str]]] = {}
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        cache: dict[str, tuple[Hashable, str, int]] | None = self.__dict__.get(
+            "_render_cache"
+        )
+        if cache is None:
+            return
+        stale = [
+            section
+            for section, deps in self._RENDER_DEPENDENCIES.items()
+            if name in deps
+        ]
+        if stale:
+            for section in stale:
+                cache.pop(section, None)
+            self.__dict__["_render_version"] = self.render_version + 1
+
+    @property
+    def render_version(self) -> int:
+        """依存フィールドが変更されるたびに増えるバージョン番号"""
+        return self.__dict__.get("_render_version", 0)
+
+    def invalidate_render_cache(self) -> None:
+        """全セクションのキャッシュを破棄する"""
+        self.__dict__.pop("_render_cache", None)
+        self.__dict__["_render_version"] = self.render_version + 1
+
+    def rendered_byte_size(self, section: str) -> int:
+        """セクションのレンダリング結果のUTF-8バイト数を返す（必要ならレンダリングする）"""
+        cache = self.__dict__.get("_render_cache") or {}
+        entry = cache.get(section)
+        if entry is None or entry[0] != self._render_key(section):
+            self._render_section(section)
+            entry = self.__dict__["_render_cache"][section]
+        return entry[2]
+
+    def _render_key(self, section: str) -> Hashable:
+        """フィールド以外にレンダリング結果を左右する値（設定値など）を返す"""
+        return None
+
+    def _render_section(self, section: str) -> str:
+        """セクション名に対応する format_for_<section> を呼び出す"""
+        return getattr(self, f"format_for_{section}")()
+
+    def _cached_render(self, section: str, render: Callable[[], str]) -> str:
+        """キャッシュ済みならそれを返し、なければ render() の結果を記録して返す"""
+        cache: dict[str, tuple[Hashable, str, int]] = self.__dict__.setdefault(
+            "_render_cache", {}
+        )
+        key = self._render_key(section)
+        entry = cache.get(section)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        text = render()
+        cache[section] = (key, text, len(text.encode("utf-8")))
+        return text
@@ -1,8 +1,9 @@
 """短期記憶: チャンネルメッセージのリングバッファ"""
 
-from collections import deque
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta, timezone
+import sys
+from bisect import bisect_right
+from collections.abc import Callable, Iterator
+from datetime import datetime, timezone
 
 import config
 from log_utils.logger import logger
@@ -15,81 +16,283 @@ def _to_utc(ts: datetime) -> datetime:
     return ts.astimezone(timezone.utc)
 
 
-@dataclass
+def _utc_epoch() -> float:
+    """現在時刻の UTC エポック秒
+
+    datetime 経由で求め、ChannelMessage.ts と同じマイクロ秒精度・同じ計算にそろえる
+    （time.time() だと直後に datetime.now() で作ったメッセージより大きくなりうる）。
+    """
+    return datetime.now(timezone.utc).timestamp()
+
+
 class ChannelMessage:
-    """チャンネルメッセージのデータクラス"""
+    """チャンネルメッセージ（短期記憶バッファの1件）
+
+    __slots__ でインスタンス辞書を持たず、タイムスタンプは生成時に一度だけ
+    UTC エポック秒（ts）へ正規化して保持する。timestamp は ts から UTC aware な
+    datetime を生成して返す。発言者名は sys.intern で同じ文字列を共有する。
+
+    pattern_hits は本文に含まれる Judge のキーワード・ボット名の集合のキャッシュで、
+    Judge が初回の判定時に（照合に使ったマッチャー, 集合）の組で埋める。
+    マッチャーが異なる Judge は再計算する（比較には含めない）。
+    """
+
+    _FIELDS = (
+        "message_id",
+        "channel_id",
+        "author_id",
+        "author_name",
+        "content",
+        "ts",
+        "is_bot",
+        "attachments",
+    )
+    __slots__ = _FIELDS + ("pattern_hits",)
+
+    def __init__(
+        self,
+        message_id: int,
+        channel_id: int,
+        author_id: int,
+        author_name: str,
+        content: str,
+        timestamp: datetime | float,
+        is_bot: bool = False,
+        attachments: list[str] | tuple[str, ...] | None = None,
+    ) -> None:
+        self.message_id = message_id
+        self.channel_id = channel_id
+        self.author_id = author_id
+        # intern は str 以外（サブクラス含む）を受け付けない
+        self.author_name = sys.intern(author_name) if type(author_name) is str else author_name
+        self.content = content
+        self.ts: float = (
+            float(timestamp)
+            if isinstance(timestamp, (int, float))
+            else _to_utc(timestamp).timestamp()
+        )
+        self.is_bot = is_bot
+        self.attachments: tuple[str, ...] = tuple(attachments) if attachments else ()
+        self.pattern_hits: tuple[object, frozenset[str]] | None = None
+
+    @property
+    def timestamp(self) -> datetime:
+        """投稿日時（UTC aware）"""
+        return datetime.fromtimestamp(self.ts, timezone.utc)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ChannelMessage):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._FIELDS)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (
+            f"ChannelMessage(message_id={self.message_id}, channel_id={self.channel_id}, "
+            f"author_id={self.author_id}, author_name={self.author_name!r}, "
+            f"content={self.content!r}, timestamp={self.timestamp.isoformat()}, "
+            f"is_bot={self.is_bot})"
+        )
+
+
+def _render_line(msg: ChannelMessage) -> str:
+    """コンテキスト文字列の1行（「発言者[BOT]: 本文」）"""
+    role = "[BOT]" if msg.is_bot else ""
+    return f"{msg.author_name}{role}: {msg.content}"
+
+
+class _ChannelWindow:
+    """1チャンネル分のメッセージ列（タイムスタンプ昇順）
 
-    message_id: int
-    channel_id: int
-    author_id: int
-    author_name: str
-    content: str
-    timestamp: datetime
-    is_bot: bool = False
-    attachments: list[str] = field(default_factory=list)
+    メッセージと並行してタイムスタンプの配列を持ち、TTL 境界や反省会の
+    チェックポイントを bisect で求める。先頭から捨てたメッセージは _start を
+    進めるだけにし、捨てた分が max_size を超えたらまとめて詰める（償却 O(1)）。
+
+    LLM 向けの1行表現は追加時に一度だけ生成して並行配列に持ち、limit ごとに
+    直近の連結結果を (先頭メッセージ, 末尾メッセージ, 件数) と共に覚えておく。
+    同じ範囲への問い合わせは境界の二分探索だけで済む。
+    """
+
+    __slots__ = ("_max_size", "_messages", "_timestamps", "_lines", "_start", "_rendered")
+
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._messages: list[ChannelMessage] = []
+        self._timestamps: list[float] = []
+        self._lines: list[str] = []
+        self._start = 0
+        # limit → (先頭メッセージ, 末尾メッセージ, 件数, 連結済み文字列)
+        self._rendered: dict[int, tuple[ChannelMessage, ChannelMessage, int, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._messages) - self._start
+
+    def __iter__(self) -> Iterator[ChannelMessage]:
+        for i in range(self._start, len(self._messages)):
+            yield self._messages[i]
+
+    def append(self, msg: ChannelMessage) -> None:
+        """メッセージを追加し、max_size を超えた分を古い方から捨てる"""
+        line = _render_line(msg)
+        if not self or msg.ts >= self._timestamps[-1]:
+            self._messages.append(msg)
+            self._timestamps.append(msg.ts)
+            self._lines.append(line)
+        else:
+            # 遅れて届いたメッセージは時刻順の位置に挿入する
+            i = bisect_right(self._timestamps, msg.ts, lo=self._start)
+            self._messages.insert(i, msg)
+            self._timestamps.insert(i, msg.ts)
+            self._lines.insert(i, line)
+        if len(self) > self._max_size:
+            self._drop_until(len(self._messages) - self._max_size)
+
+    def last(self) -> ChannelMessage:
+        return self._messages[-1]
+
+    def index_after(self, ts: float) -> int:
+        """ts より後の最初のメッセージ位置（_messages 上の添字）"""
+        return bisect_right(self._timestamps, ts, lo=self._start)
+
+    def tail(self, after: float, limit: int) -> list[ChannelMessage]:
+        """after より新しいメッセージのうち末尾 limit 件（O(log n + limit)）"""
+        return self._messages[self._tail_start(after, limit) :]
+
+    def render_tail(self, after: float, limit: int) -> str:
+        """tail と同じ範囲の1行表現を改行で連結して返す（範囲が同じなら再利用）"""
+        lo = self._tail_start(after, limit)
+        count = len(self._messages) - lo
+        if count == 0:
+            return ""
+        first, last = self._messages[lo], self._messages[-1]
+        cached = self._rendered.get(limit)
+        if cached is not None and cached[0] is first and cached[1] is last and cached[2] == count:
+            return cached[3]
+        text = "\n".join(self._lines[lo:])
+        self._rendered[limit] = (first, last, count, text)
+        return text
+
+    def _tail_start(self, after: float, limit: int) -> int:
+        lo = self.index_after(after)
+        if limit > 0:
+            lo = max(lo, len(self._messages) - limit)
+        return lo
+
+    def count_after(self, ts: float) -> int:
+        return len(self._messages) - self.index_after(ts)
+
+    def estimated_bytes(self) -> int:
+        """保持しているメッセージ・本文・1行表現のおおよそのバイト数（発言者名は共有のため除く）"""
+        size = sys.getsizeof(self._messages) + sys.getsizeof(self._timestamps)
+        size += sys.getsizeof(self._lines)
+        for i in range(self._start, len(self._messages)):
+            msg = self._messages[i]
+            size += sys.getsizeof(msg) + sys.getsizeof(msg.ts)
+            size += sys.getsizeof(msg.content) + sys.getsizeof(self._lines[i])
+        return size
+
+    def drop_expired(self, cutoff: float) -> int:
+        """cutoff 以前のメッセージを捨て、捨てた件数を返す"""
+        end = self.index_after(cutoff)
+        removed = end - self._start
+        if removed:
+            self._drop_until(end)
+        return removed
+
+    def _drop_until(self, end: int) -> None:
+        self._start = end
+        if self._start > self._max_size or self._start == len(self._messages):
+            del self._messages[: self._start]
+            del self._timestamps[: self._start]
+            del self._lines[: self._start]
+            self._start = 0
 
 
 class ChannelMessageBuffer:
-    """チャンネルごとのリングバッファ（collections.deque使用）"""
+    """チャンネルごとのリングバッファ
+
+    各チャンネルのメッセージはタイムスタンプ昇順に保持し、TTL 境界や
+    反省会以降の件数は二分探索で求める。
 
-    def __init__(self, max_size: int, ttl_minutes: int) -> None:
+    max_total_messages（0で無制限）を超えると、最後にメッセージが届いてから
+    最も時間の経ったチャンネルのバッファを丸ごと解放する。反省会の
+    チェックポイントは解放後も残す。
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_minutes: int,
+        max_total_messages: int = 0,
+        clock: Callable[[], float] = _utc_epoch,
+    ) -> None:
         self._max_size = max_size
+        # 現在時刻（UTC エポック秒）。リプレイ等で時刻を固定する場合に差し替える
+        self._clock = clock
         self._ttl_minutes = ttl_minutes
-        self._buffers: dict[int, deque[ChannelMessage]] = {}
-        self._last_reflected: dict[int, datetime] = {}
+        self._max_total_messages = max_total_messages
+        # 挿入順 = 最後にメッセージが追加された順（先頭が最もアイドル）
+        self._buffers: dict[int, _ChannelWindow] = {}
+        self._total_messages = 0
+        self._evicted_channels = 0
+        # 反省会のチェックポイント（UTC エポック秒）
+        self._last_reflected: dict[int, float] = {}
 
     def add_message(self, msg: ChannelMessage) -> None:
         """メッセージをチャンネルバッファに追加する"""
         channel_id = msg.channel_id
-        if channel_id not in self._buffers:
-            self._buffers[channel_id] = deque(maxlen=self._max_size)
-        self._buffers[channel_id].append(msg)
+        buf = self._buffers.pop(channel_id, None)
+        if buf is None:
+            buf = _ChannelWindow(self._max_size)
+        self._buffers[channel_id] = buf
+        before = len(buf)
+        buf.append(msg)
+        self._total_messages += len(buf) - before
         logger.debug(
             f"バッファ追加: チャンネル={channel_id}, "
-            f"サイズ={len(self._buffers[channel_id])}/{self._max_size}"
+            f"サイズ={len(buf)}/{self._max_size}"
         )
+        if self._max_total_messages > 0 and self._total_messages > self._max_total_messages:
+            self._evict_idle_channels(keep=channel_id)
+
+    def _evict_idle_channels(self, keep: int) -> None:
+        """全体のメッセージ数が上限以下になるまでアイドルなチャンネルを解放する"""
+        while self._total_messages > self._max_total_messages:
+            channel_id = next(iter(self._buffers))
+            if channel_id == keep:
+                break
+            self._total_messages -= len(self._buffers.pop(channel_id))
+            self._evicted_channels += 1
+            logger.debug(f"バッファ上限によりチャンネルを解放: チャンネル={channel_id}")
 
     def get_recent_messages(
         self, channel_id: int, limit: int = 20
     ) -> list[ChannelMessage]:
         """チャンネルの直近メッセージを取得する（TTL超過を除外）"""
-        if channel_id not in self._buffers:
+        buf = self._buffers.get(channel_id)
+        if buf is None:
             return []
-        now = datetime.now(timezone.utc)
-        cutoff = now - timedelta(minutes=self._ttl_minutes)
-        messages = [
-            msg
-            for msg in self._buffers[channel_id]
-            if _to_utc(msg.timestamp) > cutoff
-        ]
-        return messages[-limit:]
+        return buf.tail(self._cutoff(), limit)
 
     def get_context_string(self, channel_id: int, limit: int = 10) -> str:
         """LLMに渡すためのフォーマット済みコンテキスト文字列を返す"""
-        messages = self.get_recent_messages(channel_id, limit)
-        if not messages:
+        buf = self._buffers.get(channel_id)
+        if buf is None:
             return ""
-        lines = []
-        for msg in messages:
-            role = "[BOT]" if msg.is_bot else ""
-            lines.append(f"{msg.author_name}{role}: {msg.content}")
-        return "\n".join(lines)
+        return buf.render_tail(self._cutoff(), limit)
 
     def cleanup_expired(self) -> int:
         """TTL超過メッセージを全チャンネルから削除する"""
-        now = datetime.now(timezone.utc)
-        cutoff = now - timedelta(minutes=self._ttl_minutes)
+        cutoff = self._cutoff()
         total_removed = 0
         empty_channels: list[int] = []
 
         for channel_id, buf in self._buffers.items():
-            before = len(buf)
-            # dequeなので左側（古い方）から期限切れを削除
-            while buf and _to_utc(buf[0].timestamp) <= cutoff:
-                buf.popleft()
-                total_removed += 1
+            total_removed += buf.drop_expired(cutoff)
             if not buf:
                 empty_channels.append(channel_id)
+        self._total_messages -= total_removed
 
         # 空になったチャンネルのバッファを削除
         for channel_id in empty_channels:
@@ -97,16 +300,38 @@ class ChannelMessageBuffer:
 
         return total_removed
 
+    def _cutoff(self) -> float:
+        """TTL の境界（これ以前のメッセージは期限切れ）を UTC エポック秒で返す"""
+        return self._clock() - self._ttl_minutes * 60
+
     def get_active_channel_ids(self) -> list[int]:
         """バッファが存在するチャンネルIDのリストを返す"""
         return list(self._buffers.keys())
 
+    def has_channel(self, channel_id: int) -> bool:
+        """チャンネルのバッファが存在するかを返す"""
+        return channel_id in self._buffers
+
+    def get_author_ids(self, channel_id: int | None = None) -> list[int]:
+        """バッファ内の（ボット以外の）発言者IDを重複なしで返す
+
+        Args:
+            channel_id: 対象チャンネル（None の場合は全チャンネル）
+        """
+        if channel_id is None:
+            buffers = list(self._buffers.values())
+        else:
+            buffers = [self._buffers[channel_id]] if channel_id in self._buffers else []
+        return list(
+            dict.fromkeys(msg.author_id for buf in buffers for msg in buf if not msg.is_bot)
+        )
+
     def get_last_message_time(self, channel_id: int) -> datetime | None:
         """最新メッセージのタイムスタンプをUTCで返す（バッファが空なら None）"""
         buf = self._buffers.get(channel_id)
         if not buf:
             return None
-        return _to_utc(buf[-1].timestamp)
+        return buf.last().timestamp
 
     def count_messages_since_reflection(self, channel_id: int) -> int:
         """最後の反省会以降のメッセージ数を返す"""
@@ -116,21 +341,140 @@ class ChannelMessageBuffer:
         last_reflected = self._last_reflected.get(channel_id)
         if last_reflected is None:
             return len(buf)
-        count = 0
-        for msg in buf:
-            if _to_utc(msg.timestamp) > last_reflected:
-                count += 1
-        return count
+        return buf.count_after(last_reflected)
 
     def mark_reflected(self, channel_id: int) -> None:
         """反省会実行後に呼ぶ。現在時刻をチェックポイントとして記録する"""
-        self._last_reflected[channel_id] = datetime.now(timezone.utc)
+        self._last_reflected[channel_id] = self._clock()
 
     @property
     def channel_count(self) -> int:
         """バッファを持つチャンネル数"""
         return len(self._buffers)
 
+    def snapshot_rows(self) -> list[dict]:
+        """スナップショット用の行（メッセージと反省会チェックポイント）を集める
+
+        メッセージはアイドルな順（解放される順）に並ぶため、復元後も同じ順序になる。
+        チェックポイントの行は channel_id と reflected_at のみを持つ。
+        """
+        rows: list[dict] = [
+            {
+                "message_id": msg.message_id,
+                "channel_id": msg.channel_id,
+                "author_id": msg.author_id,
+                "author_name": msg.author_name,
+                "content": msg.content,
+                "ts": msg.ts,
+                "is_bot": msg.is_bot,
+                "attachments": list(msg.attachments),
+            }
+            for buf in self._buffers.values()
+            for msg in buf
+        ]
+        rows.extend(
+            {"channel_id": channel_id, "reflected_at": reflected_at}
+            for channel_id, reflected_at in self._last_reflected.items()
+        )
+        return rows
+
+    def save_snapshot(self, rows: list[dict] | None = None) -> int:
+        """バッファと反省会チェックポイントを圧縮スナップショットとして保存する
+
+        Args:
+            rows: 事前に snapshot_rows() で集めた行。イベントループ外のスレッドで
+                保存する場合はループ上で集めてから渡す（None ならその場で集める）
+
+        Returns:
+            保存したメッセージ数（保存しなかった・失敗した場合は0）。
+            メッセージがなければ既存のスナップショットを残すため保存しない。
+        """
+        from utils.snapshot import encode_columnar, save_snapshot
+
+        if rows is None:
+            rows = self.snapshot_rows()
+        count = sum(1 for row in rows if "reflected_at" not in row)
+        if count == 0:
+            return 0
+        if not save_snapshot(_SNAPSHOT_NAME, encode_columnar(rows)):
+            return 0
+        logger.debug(f"チャンネルバッファのスナップショットを保存: {count}件")
+        return count
+
+    @staticmethod
+    def load_snapshot_rows() -> list[dict]:
+        """保存済みスナップショットを読み込んで行に展開する（無い・壊れている場合は空）"""
+        from utils.snapshot import decode_columnar, load_snapshot
+
+        data = load_snapshot(_SNAPSHOT_NAME)
+        if data is None:
+            return []
+        try:
+            return decode_columnar(data)
+        except ValueError as e:
+            logger.warning(f"チャンネルバッファのスナップショットを無視: {e}")
+            return []
+
+    def restore_snapshot(self, rows: list[dict] | None = None) -> int:
+        """スナップショットからバッファと反省会チェックポイントを復元する（起動時用）
+
+        TTL を超えたメッセージは読み込まない。既にバッファを持つチャンネルには
+        まだ無いメッセージ（message_id で判定）だけを時刻順の位置に合流させる。
+        記録済みのチェックポイントは上書きしない。
+
+        Args:
+            rows: 事前に load_snapshot_rows() で読み込んだ行（None ならその場で読み込む）
+
+        Returns:
+            復元したメッセージ数
+        """
+        if rows is None:
+            rows = self.load_snapshot_rows()
+        cutoff = self._cutoff()
+        # 起動後に届いたメッセージとの重複を避ける
+        seen = {
+            channel_id: {msg.message_id for msg in buf}
+            for channel_id, buf in self._buffers.items()
+        }
+        restored = 0
+        for row in rows:
+            channel_id = row["channel_id"]
+            if row.get("reflected_at") is not None:
+                self._last_reflected.setdefault(channel_id, row["reflected_at"])
+                continue
+            if row["ts"] <= cutoff or row["message_id"] in seen.get(channel_id, ()):
+                continue
+            self.add_message(
+                ChannelMessage(
+                    message_id=row["message_id"],
+                    channel_id=channel_id,
+                    author_id=row["author_id"],
+                    author_name=row["author_name"],
+                    content=row["content"],
+                    timestamp=row["ts"],
+                    is_bot=row["is_bot"],
+                    attachments=row["attachments"],
+                )
+            )
+            restored += 1
+        logger.info(
+            f"チャンネルバッファをスナップショットから復元: {restored}件, "
+            f"チャンネル={len(self._buffers)}"
+        )
+        return restored
+
+    def stats(self) -> dict[str, int]:
+        """バッファの統計（チャンネル数・メッセージ数・推定バイト数・上限による解放数）を返す"""
+        return {
+            "channels": len(self._buffers),
+            "messages": self._total_messages,
+            "estimated_bytes": sum(buf.estimated_bytes() for buf in self._buffers.values()),
+            "evicted_channels": self._evicted_channels,
+        }
+
+
+_SNAPSHOT_NAME = "channel_buffer"
+
 
 # モジュールレベルのシングルトン
 _buffer: ChannelMessageBuffer | None = None
@@ -143,9 +487,11 @@ def get_channel_buffer() -> ChannelMessageBuffer:
         _buffer = ChannelMessageBuffer(
             max_size=config.CHANNEL_BUFFER_SIZE,
             ttl_minutes=config.CHANNEL_BUFFER_TTL_MINUTES,
+            max_total_messages=config.CHANNEL_BUFFER_MAX_TOTAL_MESSAGES,
         )
         logger.info(
             f"チャンネルバッファ初期化: max_size={config.CHANNEL_BUFFER_SIZE}, "
-            f"ttl={config.CHANNEL_BUFFER_TTL_MINUTES}分"
+            f"ttl={config.CHANNEL_BUFFER_TTL_MINUTES}分, "
+            f"max_total={config.CHANNEL_BUFFER_MAX_TOTAL_MESSAGES}"
         )
     return _buffer
@@ -28,6 +28,17 @@ SUMMARIZE_PROMPT = """\
 {{"summary": "会話の要約（2-3文）", "mood": "場の雰囲気（一言）", "topic_keywords": ["話題1", "話題2"]}}
 """
 
+BATCH_SUMMARIZE_PROMPT = """\
+あなたはDiscordチャンネルの会話を要約するAIです。
+以下に複数チャンネルの会話ログがあります。チャンネルごとに独立して要約してください。
+チャンネル間で内容を混ぜないでください。
+
+{channels}
+
+以下のJSON形式で、全チャンネル分を回答してください:
+{{"channels": [{{"channel_id": "チャンネルID", "summary": "会話の要約（2-3文）", "mood": "場の雰囲気（一言）", "topic_keywords": ["話題1", "話題2"]}}]}}
+"""
+
 
 class Summarizer:
     """チャンネル会話の要約を非同期で生成する"""
@@ -37,28 +48,25 @@ class Summarizer:
         self._running_lock = threading.Lock()
 
     def maybe_summarize(
-        self, channel_id: int, recent_messages: list[ChannelMessage]
+        self,
+        channel_id: int,
+        recent_messages: list[ChannelMessage],
+        guild_id: int | None = None,
     ) -> None:
         """要約トリガー判定と非同期実行
 
+        SUMMARIZE_ADAPTIVE_ENABLED=true の場合は固定閾値の代わりに
+        AdaptiveSummaryPolicy（レートEWMA・話題ドリフト・ギルド予算）で判定する。
+
         Args:
             channel_id: チャンネルID
             recent_messages: 直近メッセージリスト
+            guild_id: ギルドID（予算管理用。None の場合はレート推定器の記録から補完）
         """
-        store = get_channel_context_store()
-        ctx = store.get_context(channel_id)
-
-        if not ctx.should_summarize():
+        ctx = self._reserve(channel_id, recent_messages, guild_id)
+        if ctx is None:
             return
 
-        with self._running_lock:
-            if channel_id in self._running:
-                logger.debug(f"要約が既に実行中: channel_id={channel_id}")
-                return
-            # create_task の前に追加することで、次のイベントループ反復で
-            # maybe_summarize が再度呼ばれても二重スケジュールされない
-            self._running.add(channel_id)
-
         logger.info(
             f"要約トリガー: channel_id={channel_id}, "
             f"count={ctx.message_count_since_update}"
@@ -68,6 +76,88 @@ class Summarizer:
             name=f"summarize_{channel_id}",
         )
 
+    def summarize_due_channels(
+        self, due_channels: dict[int, list[ChannelMessage]]
+    ) -> None:
+        """複数チャンネルの要約をまとめてスケジュールする（定期タスク用）
+
+        SUMMARIZE_BATCH_ENABLED=true の場合、メッセージ数の少ないチャンネルを
+        SUMMARIZE_BATCH_MAX_CHANNELS 件ずつ1回のLLM呼び出しにまとめる。
+        メッセージ数の多いチャンネルは従来通り個別に要約する。
+
+        Args:
+            due_channels: {channel_id: 直近メッセージリスト}
+        """
+        if not config.SUMMARIZE_BATCH_ENABLED:
+            for channel_id, messages in due_channels.items():
+                self.maybe_summarize(channel_id, messages)
+            return
+
+        small: list[tuple[int, ChannelContext, list[ChannelMessage]]] = []
+        for channel_id, messages in due_channels.items():
+            if len(messages) > config.SUMMARIZE_BATCH_SMALL_CHANNEL_MESSAGES:
+                self.maybe_summarize(channel_id, messages)
+                continue
+            ctx = self._reserve(channel_id, messages)
+            if ctx is not None:
+                small.append((channel_id, ctx, messages))
+
+        size = max(1, config.SUMMARIZE_BATCH_MAX_CHANNELS)
+        for i in range(0, len(small), size):
+            batch = small[i : i + size]
+            if len(batch) == 1:
+                channel_id, ctx, messages = batch[0]
+                asyncio.create_task(
+                    self._run_summarize(channel_id, ctx, messages),
+                    name=f"summarize_{channel_id}",
+                )
+                continue
+            logger.info(
+                f"バッチ要約トリガー: channels={[cid for cid, _, _ in batch]}"
+            )
+            asyncio.create_task(
+                self._run_batch_summarize(batch),
+                name=f"summarize_batch_{batch[0][0]}",
+            )
+
+    def _reserve(
+        self,
+        channel_id: int,
+        recent_messages: list[ChannelMessage],
+        guild_id: int | None = None,
+    ) -> ChannelContext | None:
+        """要約要否を判定し、実行中セットに登録する。対象外なら None を返す"""
+        store = get_channel_context_store()
+        ctx = store.get_context(channel_id)
+
+        policy = None
+        if config.SUMMARIZE_ADAPTIVE_ENABLED:
+            from memory.summary_policy import get_summary_policy
+
+            policy = get_summary_policy()
+            if not policy.should_summarize(ctx, recent_messages):
+                return None
+        elif not ctx.should_summarize():
+            return None
+
+        with self._running_lock:
+            if channel_id in self._running:
+                logger.debug(f"要約が既に実行中: channel_id={channel_id}")
+                return None
+            if policy is not None:
+                if guild_id is None:
+                    guild_id = policy.get_guild_id(channel_id)
+                if not policy.try_consume_budget(guild_id):
+                    logger.debug(
+                        f"ギルド要約予算切れのためスキップ: "
+                        f"guild_id={guild_id}, channel_id={channel_id}"
+                    )
+                    return None
+            # create_task の前に追加することで、次のイベントループ反復で
+            # maybe_summarize が再度呼ばれても二重スケジュールされない
+            self._running.add(channel_id)
+        return ctx
+
     async def _run_summarize(
         self,
         channel_id: int,
@@ -95,6 +185,31 @@ class Summarizer:
             with self._running_lock:
                 self._running.discard(channel_id)
 
+    async def _run_batch_summarize(
+        self, batch: list[tuple[int, ChannelContext, list[ChannelMessage]]]
+    ) -> None:
+        """複数チャンネルのバッチ要約を実行し、チャンネルごとに結果を適用する"""
+        try:
+            results = await asyncio.to_thread(self._call_batch_summarize_llm, batch)
+            store = get_channel_context_store()
+            for channel_id, context, messages in batch:
+                result = results.get(channel_id)
+                if not result:
+                    # カウンタを残しておき、次回のチェックで再度要約対象にする
+                    logger.warning(f"バッチ要約結果が欠落: channel_id={channel_id}")
+                    continue
+                self._apply_result(context, result, messages)
+                store.save_context(context)
+            logger.info(
+                f"バッチ要約完了: {len(results)}/{len(batch)}チャンネル"
+            )
+        except Exception as e:
+            logger.error(f"バッチ要約実行エラー: {e}", exc_info=True)
+        finally:
+            with self._running_lock:
+                for channel_id, _, _ in batch:
+                    self._running.discard(channel_id)
+
     def _call_summarize_llm(
         self, context: ChannelContext, messages: list[ChannelMessage]
     ) -> dict | None:
@@ -136,6 +251,53 @@ class Summarizer:
             logger.warning(f"要約LLM呼び出し失敗: {e}")
             return None
 
+    def _call_batch_summarize_llm(
+        self, batch: list[tuple[int, ChannelContext, list[ChannelMessage]]]
+    ) -> dict[int, dict]:
+        """複数チャンネルを1回のLLM呼び出しで要約する（同期）
+
+        Returns:
+            {channel_id: 要約結果} の辞書（失敗時は空辞書）
+        """
+        client = _get_genai_client()
+        model_name = get_model_name()
+
+        sections = []
+        for channel_id, context, messages in batch:
+            messages_text = _format_messages_for_summary(messages)
+            if not messages_text:
+                continue
+            previous = ""
+            if context.summary:
+                previous = f"前回の要約: {escape(context.summary)}\n"
+            sections.append(
+                f'<channel id="{channel_id}">\n{previous}{messages_text}\n</channel>'
+            )
+        if not sections:
+            return {}
+
+        prompt = BATCH_SUMMARIZE_PROMPT.format(channels="\n\n".join(sections))
+
+        try:
+            response = _generate_content_with_retry(
+                client=client,
+                model=model_name,
+                contents=[types.Content(role="user", parts=[types.Part.from_text(text=prompt)])],
+                config=types.GenerateContentConfig(
+                    temperature=0.3,
+                    response_mime_type="application/json",
+                ),
+            )
+
+            content = response.text
+            if not content:
+                return {}
+
+            return _parse_batch_result(json.loads(content))
+        except Exception as e:
+            logger.warning(f"バッチ要約LLM呼び出し失敗: {e}")
+            return {}
+
     def _apply_result(
         self,
         context: ChannelContext,
@@ -155,6 +317,33 @@ class Summarizer:
         context.message_count_since_update = 0
 
 
+def _parse_batch_result(raw: object) -> dict[int, dict]:
+    """バッチ要約のLLM出力をチャンネルIDごとの辞書に変換する
+
+    {"channels": [...]} 形式・配列形式・{channel_id: {...}} 形式のいずれも受け付ける。
+    """
+    items: list = []
+    if isinstance(raw, dict) and isinstance(raw.get("channels"), list):
+        items = raw["channels"]
+    elif isinstance(raw, list):
+        items = raw
+    elif isinstance(raw, dict):
+        items = [
+            {**value, "channel_id": key}
+            for key, value in raw.items()
+            if isinstance(value, dict)
+        ]
+
+    results: dict[int, dict] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        channel_id = str(item.get("channel_id", ""))
+        if channel_id.isdigit():
+            results[int(channel_id)] = item
+    return results
+
+
 def _format_messages_for_summary(messages: list[ChannelMessage]) -> str:
     """メッセージを要約用にフォーマットする（XMLタグでプロンプトインジェクション対策）"""
     if not messages:
@@ -0,0 +1,205 @@
+"""適応的要約ポリシー: メッセージレート・話題ドリフト・ギルド予算による要約判定"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+
+import config
+from log_utils.logger import logger
+from memory.channel_context import ChannelContext
+from memory.short_term import ChannelMessage
+
+# メッセージ数閾値のスケール範囲（静かなチャンネルは早め、活発なチャンネルは遅めに要約）
+_MIN_COUNT_SCALE = 0.5
+_MAX_COUNT_SCALE = 4.0
+# ドリフト判定に必要な最低メッセージ数
+_DRIFT_MIN_MESSAGES = 5
+# レート推定を捨てるアイドル時間（SUMMARIZE_RATE_WINDOW_MINUTES の倍数。レートは e^-10 以下に減衰済み）
+_IDLE_PRUNE_WINDOWS = 10
+# アイドルチャンネルの掃除を始めるチャンネル数の下限
+_PRUNE_MIN_CHANNELS = 256
+
+
+@dataclass
+class _ChannelActivity:
+    """チャンネルごとのメッセージレート推定値"""
+
+    rate_per_minute: float = 0.0
+    last_message_at: float | None = None
+    guild_id: int | None = None
+
+
+@dataclass
+class _GuildBudget:
+    """ギルドごとの要約予算（トークンバケット）"""
+
+    tokens: float
+    updated_at: float
+
+
+class AdaptiveSummaryPolicy:
+    """情報量の変化に応じて要約タイミングを決定するポリシー"""
+
+    def __init__(self) -> None:
+        self._activity: dict[int, _ChannelActivity] = {}
+        self._budgets: dict[int, _GuildBudget] = {}
+        self._lock = threading.Lock()
+        self._prune_at = _PRUNE_MIN_CHANNELS
+
+    def record_message(
+        self, channel_id: int, guild_id: int | None = None, now: float | None = None
+    ) -> None:
+        """メッセージ受信をレート推定器に反映する
+
+        指数減衰付きのイベントレート推定（EWMA）を用いる:
+        rate ← rate * exp(-dt/τ) + 1/τ
+
+        記録チャンネル数が前回の掃除時の2倍に達したら、長くアイドルな
+        チャンネルの推定値を捨てる。
+        """
+        now = time.time() if now is None else now
+        tau = config.SUMMARIZE_RATE_WINDOW_MINUTES
+        with self._lock:
+            if channel_id not in self._activity and len(self._activity) >= self._prune_at:
+                self._prune_idle(now)
+            activity = self._activity.setdefault(channel_id, _ChannelActivity())
+            if activity.last_message_at is not None:
+                dt_minutes = max(0.0, now - activity.last_message_at) / 60
+                activity.rate_per_minute *= math.exp(-dt_minutes / tau)
+            activity.rate_per_minute += 1 / tau
+            activity.last_message_at = now
+            if guild_id is not None:
+                activity.guild_id = guild_id
+
+    def _prune_idle(self, now: float) -> None:
+        """アイドル時間が _IDLE_PRUNE_WINDOWS * τ を超えたチャンネルを捨てる（ロック保持下で呼ぶ）"""
+        cutoff = now - _IDLE_PRUNE_WINDOWS * config.SUMMARIZE_RATE_WINDOW_MINUTES * 60
+        idle = [
+            channel_id
+            for channel_id, activity in self._activity.items()
+            if activity.last_message_at is not None and activity.last_message_at < cutoff
+        ]
+        for channel_id in idle:
+            del self._activity[channel_id]
+        self._prune_at = max(_PRUNE_MIN_CHANNELS, len(self._activity) * 2)
+
+    def message_rate(self, channel_id: int, now: float | None = None) -> float:
+        """現在時刻まで減衰させたメッセージレート（件/分）を返す"""
+        now = time.time() if now is None else now
+        with self._lock:
+            activity = self._activity.get(channel_id)
+            if activity is None or activity.last_message_at is None:
+                return 0.0
+            dt_minutes = max(0.0, now - activity.last_message_at) / 60
+            return activity.rate_per_minute * math.exp(
+                -dt_minutes / config.SUMMARIZE_RATE_WINDOW_MINUTES
+            )
+
+    def get_guild_id(self, channel_id: int) -> int | None:
+        """チャンネルに紐づくギルドIDを返す（未記録なら None）"""
+        with self._lock:
+            activity = self._activity.get(channel_id)
+            return activity.guild_id if activity else None
+
+    def count_threshold(self, channel_id: int, now: float | None = None) -> int:
+        """メッセージレートに応じてスケールした要約トリガー件数を返す"""
+        base = config.SUMMARIZE_EVERY_N_MESSAGES
+        reference = config.SUMMARIZE_REFERENCE_RATE_PER_MINUTE
+        if reference <= 0:
+            return base
+        scale = self.message_rate(channel_id, now) / reference
+        scale = max(_MIN_COUNT_SCALE, min(_MAX_COUNT_SCALE, scale))
+        return max(1, round(base * scale))
+
+    def should_summarize(
+        self,
+        context: ChannelContext,
+        recent_messages: list[ChannelMessage],
+        now: float | None = None,
+    ) -> bool:
+        """要約すべきかを判定する（予算は消費しない）
+
+        Args:
+            context: 対象チャンネルのコンテキスト
+            recent_messages: 直近メッセージリスト
+            now: 判定時刻（UNIX秒、テスト用）
+        """
+        count = context.message_count_since_update
+        if count == 0:
+            return False
+
+        now = time.time() if now is None else now
+        elapsed_seconds = now - context.last_updated.timestamp()
+        if elapsed_seconds < config.SUMMARIZE_MIN_INTERVAL_SECONDS:
+            return False
+
+        if elapsed_seconds / 60 >= config.SUMMARIZE_EVERY_N_MINUTES:
+            return True
+
+        threshold = self.count_threshold(context.channel_id, now)
+        if count >= threshold:
+            return True
+
+        if count >= _DRIFT_MIN_MESSAGES:
+            drift = keyword_drift(context.topic_keywords, recent_messages)
+            if drift >= config.SUMMARIZE_DRIFT_THRESHOLD:
+                logger.debug(
+                    f"話題ドリフト検出: channel_id={context.channel_id}, "
+                    f"drift={drift:.2f}, count={count}"
+                )
+                return True
+        return False
+
+    def try_consume_budget(self, guild_id: int | None, now: float | None = None) -> bool:
+        """ギルドの要約予算を1回分消費する。予算切れなら False を返す"""
+        per_hour = config.SUMMARIZE_GUILD_BUDGET_PER_HOUR
+        if guild_id is None or per_hour <= 0:
+            return True
+        now = time.time() if now is None else now
+        with self._lock:
+            budget = self._budgets.get(guild_id)
+            if budget is None:
+                budget = _GuildBudget(tokens=float(per_hour), updated_at=now)
+                self._budgets[guild_id] = budget
+            refill = (now - budget.updated_at) / 3600 * per_hour
+            budget.tokens = min(float(per_hour), budget.tokens + refill)
+            budget.updated_at = now
+            if budget.tokens < 1:
+                return False
+            budget.tokens -= 1
+            return True
+
+
+def keyword_drift(topic_keywords: list[str], messages: list[ChannelMessage]) -> float:
+    """現在の話題キーワードのうち、直近の会話に現れなくなった割合を返す
+
+    キーワードがない（未要約・要約がキーワードを返さなかった）場合は比較対象が
+    ないためドリフトなしとし、件数・経過時間の閾値に任せる。
+
+    Returns:
+        0.0（全キーワードが継続中 / キーワードなし）〜 1.0（全て入れ替わった）
+    """
+    if not topic_keywords:
+        return 0.0
+    combined = "\n".join(msg.content for msg in messages if not msg.is_bot)
+    if not combined:
+        return 0.0
+    present = sum(1 for kw in topic_keywords if kw and kw in combined)
+    return 1 - present / len(topic_keywords)
+
+
+# シングルトン
+_policy: AdaptiveSummaryPolicy | None = None
+_policy_lock = threading.Lock()
+
+
+def get_summary_policy() -> AdaptiveSummaryPolicy:
+    """AdaptiveSummaryPolicyのシングルトンインスタンスを取得する"""
+    global _policy
+    if _policy is None:
+        with _policy_lock:
+            if _policy is None:
+                _policy = AdaptiveSummaryPolicy()
+                logger.info("AdaptiveSummaryPolicy初期化完了")
+    return _policy
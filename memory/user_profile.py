@@ -1,18 +1,44 @@
 """ユーザープロファイル: 交流回数・関係性レベル・直近話題の記録"""
 
+import asyncio
 import json
 import os
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 
 import config
 from log_utils.logger import logger
+from memory.render_cache import RenderCacheMixin
+from utils.write_behind import WriteBehindCache
+
+# ローカルストレージからの並列プリフェッチのワーカー数
+_PREFETCH_LOCAL_WORKERS = 8
+
+# utils.snapshot でのスナップショット名
+_SNAPSHOT_NAME = "user_profiles"
 
 
 @dataclass
-class UserProfile:
-    """ユーザーのプロファイル情報"""
+class UserProfile(RenderCacheMixin):
+    """ユーザーのプロファイル情報
+
+    format_for_* の結果はセクション単位でキャッシュされ、依存フィールドへの代入時のみ再生成される。
+    """
+
+    _RENDER_DEPENDENCIES = {
+        "familiarity": frozenset({"interaction_count", "nickname", "display_name"}),
+        "context": frozenset({"last_conversation_summary", "last_topic"}),
+        "persona": frozenset({
+            "tags",
+            "notable_facts",
+            "personality_notes",
+            "preferred_tone",
+            "emotional_state_last",
+        }),
+    }
 
     user_id: int
     display_name: str
@@ -53,6 +79,37 @@ class UserProfile:
 
     def format_for_familiarity(self) -> str:
         """関係性・基本情報の注入用"""
+        return self._cached_render("familiarity", self._render_familiarity)
+
+    def format_for_context(self) -> str:
+        """会話文脈（前回要約・直近話題）の注入用"""
+        return self._cached_render("context", self._render_context)
+
+    def format_for_persona(self) -> str:
+        """ユーザー人物像（tags・notable_facts・personality_notes）の注入用"""
+        return self._cached_render("persona", self._render_persona)
+
+    def injection_byte_size(self) -> int:
+        """format_for_injection の結果のUTF-8バイト数を返す（再レンダリングしない）"""
+        sizes = [
+            self.rendered_byte_size(section)
+            for section in ("familiarity", "context", "persona")
+        ]
+        non_empty = [size for size in sizes if size > 0]
+        # セクション間の区切り "\n\n" の分を加算する
+        return sum(non_empty) + 2 * max(0, len(non_empty) - 1)
+
+    def _render_key(self, section: str) -> tuple[int, ...] | None:
+        if section == "familiarity":
+            # 関係性レベルは設定の閾値にも依存する
+            return (
+                config.FAMILIARITY_THRESHOLD_ACQUAINTANCE,
+                config.FAMILIARITY_THRESHOLD_REGULAR,
+                config.FAMILIARITY_THRESHOLD_CLOSE,
+            )
+        return None
+
+    def _render_familiarity(self) -> str:
         if self.interaction_count == 0:
             return ""
         name = self.nickname or self.display_name
@@ -60,8 +117,7 @@ class UserProfile:
         parts.append(f"関係性: {self.familiarity_level}（{self.interaction_count}回のやりとり）")
         return "\n".join(parts)
 
-    def format_for_context(self) -> str:
-        """会話文脈（前回要約・直近話題）の注入用"""
+    def _render_context(self) -> str:
         parts = []
         if self.last_conversation_summary:
             parts.append(f"前回の会話要約: {self.last_conversation_summary}")
@@ -69,8 +125,7 @@ class UserProfile:
             parts.append(f"直近の話題: {', '.join(self.last_topic)}")
         return "\n".join(parts)
 
-    def format_for_persona(self) -> str:
-        """ユーザー人物像（tags・notable_facts・personality_notes）の注入用"""
+    def _render_persona(self) -> str:
         parts = []
         if self.tags:
             parts.append(f"タグ: {', '.join(self.tags)}")
@@ -132,63 +187,162 @@ class UserProfile:
         )
 
 
-class UserProfileStore:
-    """ユーザープロファイルの永続化ストア"""
+class _InteractionCounter:
+    """プロファイルへ未反映のメッセージ記録（ユーザーごとのカウンタテーブルの1行）"""
+
+    __slots__ = ("messages", "mentions", "display_name", "last_ts", "channels")
 
-    def __init__(self) -> None:
-        self._profiles: dict[int, UserProfile] = {}
+    def __init__(self, display_name: str) -> None:
+        self.messages = 0
+        self.mentions = 0
+        self.display_name = display_name
+        self.last_ts = 0.0
+        # 挿入順 dict をチャンネルの最近度順リストとして使う（末尾が最新）
+        self.channels: dict[int, None] = {}
+
+
+class UserProfileStore:
+    """ユーザープロファイルの永続化ストア
+
+    インメモリのプロファイルは件数上限・アイドルTTL付きのLRUで保持する。
+    更新されたプロファイルのIDをダーティセットで追跡し、persist_dirty で
+    変更分だけをまとめて永続化する。ダーティなプロファイルは追い出す前に永続化する。
+
+    メッセージごとの記録（交流回数・最終交流日時・チャンネル最近度・メンション数）は
+    プロファイルを触らずカウンタテーブルに O(1) で積み上げ、プロファイルの読み出し時・
+    永続化時・追い出し時にまとめて反映する。
+
+    Args:
+        max_entries: インメモリに保持する最大ユーザー数（0で無制限）
+        ttl_minutes: 最終アクセスからの保持時間（分、0で無期限）
+    """
+
+    def __init__(self, max_entries: int = 0, ttl_minutes: int = 0) -> None:
+        self._profiles: WriteBehindCache[int, UserProfile] = WriteBehindCache(
+            lambda profiles: self._write_profiles(profiles),
+            max_entries=max_entries,
+            ttl_seconds=ttl_minutes * 60,
+            on_evict=self._merge_evicted_counters,
+        )
+        self._counters: dict[int, _InteractionCounter] = {}
+        self._counters_lock = threading.Lock()
 
     def get_profile(self, user_id: int, display_name: str = "") -> UserProfile:
         """ユーザープロファイルを取得する（なければ新規作成 or 永続化先から読み込み）"""
-        if user_id in self._profiles:
-            return self._profiles[user_id]
+        profile = self._profiles.get(user_id)
+        if profile is not None:
+            return self._apply_pending(profile)
 
         # 永続化先からの読み込みを試行
         profile = self._load_profile(user_id)
         if profile is None:
             profile = UserProfile(user_id=user_id, display_name=display_name)
-        self._profiles[user_id] = profile
-        return profile
+        self._profiles.add(user_id, profile)
+        return self._apply_pending(profile)
+
+    async def get_profile_async(self, user_id: int, display_name: str = "") -> UserProfile:
+        """ユーザープロファイルを非同期に取得する
+
+        キャッシュヒット時は即座に返す。ミス時の読み込みはスレッドで実行し、
+        同一ユーザーへの同時要求は1回の読み込みにまとめる（single-flight）。
+        """
+        profile = await self._profiles.get_or_load(
+            user_id,
+            lambda: self._load_profile(user_id),
+            lambda: UserProfile(user_id=user_id, display_name=display_name),
+            name=f"load_user_profile_{user_id}",
+        )
+        return self._apply_pending(profile)
+
+    def prefetch(self, user_ids: list[int]) -> int:
+        """未読み込みのプロファイルを永続化先からまとめて読み込み、キャッシュに載せる
+
+        Firestore では get_all による一括取得、ローカルではスレッドプールで並列に読み込む。
+        永続化先に存在しないユーザーはキャッシュしない（初回メッセージ時に新規作成される）。
+
+        Args:
+            user_ids: プリフェッチ対象のユーザーIDリスト
+
+        Returns:
+            キャッシュに追加したプロファイル数
+        """
+        missing = list(dict.fromkeys(uid for uid in user_ids if uid not in self._profiles))
+        if not missing:
+            return 0
+
+        loaded = self._load_profiles(missing)
+        added = 0
+        for profile in loaded:
+            # 読み込み中に get_profile 経由で登録済みならそちらを優先する
+            if profile.user_id in self._profiles:
+                continue
+            self._profiles.add(profile.user_id, profile)
+            added += 1
+        logger.debug(f"ユーザープロファイルをプリフェッチ: 要求={len(missing)}件, 読み込み={added}件")
+        return added
+
+    async def prefetch_async(self, user_ids: list[int]) -> int:
+        """prefetch をスレッドで実行する（イベントループから呼ぶ場合用）"""
+        return await asyncio.to_thread(self.prefetch, user_ids)
 
     def record_message(self, user_id: int, channel_id: int, display_name: str) -> None:
-        """メッセージ受信時にプロファイルを更新する
+        """メッセージ受信時の記録をカウンタテーブルに積む（I/O・プロファイル更新なし）
 
         Args:
             user_id: DiscordユーザーID
             channel_id: メッセージが投稿されたチャンネルID
             display_name: ユーザーの表示名
         """
-        profile = self.get_profile(user_id, display_name)
-        profile.interaction_count += 1
-        profile.display_name = display_name
-        profile.last_interaction = datetime.now(timezone.utc)
-        if channel_id not in profile.channels_active:
-            profile.channels_active.append(channel_id)
-        else:
-            profile.channels_active.remove(channel_id)
-            profile.channels_active.append(channel_id)
-        limit = config.CHANNELS_ACTIVE_LIMIT
-        if len(profile.channels_active) > limit:
-            profile.channels_active = profile.channels_active[-limit:]
+        with self._counters_lock:
+            counter = self._counters.get(user_id)
+            if counter is None:
+                counter = self._counters[user_id] = _InteractionCounter(display_name)
+            counter.messages += 1
+            counter.display_name = display_name
+            counter.last_ts = time.time()
+            counter.channels.pop(channel_id, None)
+            counter.channels[channel_id] = None
 
     def record_bot_mention(self, user_id: int) -> None:
-        """ボットへのメンション時にカウンタを更新する
+        """ボットへのメンションをカウンタテーブルに積む
+
+        キャッシュにもカウンタテーブルにもない（最近発言していない）ユーザーは無視する。
 
         Args:
             user_id: DiscordユーザーID
         """
-        if user_id in self._profiles:
-            self._profiles[user_id].mentioned_bot_count += 1
+        with self._counters_lock:
+            counter = self._counters.get(user_id)
+            if counter is None:
+                profile = self._peek(user_id)
+                if profile is None:
+                    return
+                counter = self._counters[user_id] = _InteractionCounter(profile.display_name)
+            counter.mentions += 1
 
     def update_last_topic(self, user_id: int, topic_keywords: list[str]) -> None:
         """応答生成後に直近の話題を更新する
 
+        未キャッシュのプロファイルは同期的に読み込むため、イベントループからは
+        update_last_topic_async を使う。
+
         Args:
             user_id: DiscordユーザーID
             topic_keywords: チャンネルコンテキストから取得した話題キーワード
         """
-        if user_id in self._profiles and topic_keywords:
-            self._profiles[user_id].last_topic = list(topic_keywords)
+        profile = self._active_profile(user_id)
+        if profile is not None and topic_keywords:
+            profile.last_topic = list(topic_keywords)
+            self._mark_dirty(user_id)
+
+    async def update_last_topic_async(self, user_id: int, topic_keywords: list[str]) -> None:
+        """update_last_topic のイベントループ版（未キャッシュ時の読み込みはスレッドで行う）"""
+        if not topic_keywords:
+            return
+        profile = await self._active_profile_async(user_id)
+        if profile is not None:
+            profile.last_topic = list(topic_keywords)
+            self._mark_dirty(user_id)
 
     def update_from_reflection(self, user_id: int, extracted: dict) -> None:
         """反省会LLM抽出結果でUserProfileを更新する
@@ -197,7 +351,7 @@ class UserProfileStore:
             user_id: DiscordユーザーID
             extracted: LLMが抽出した辞書（tags, notable_facts, personality_notes 等）
         """
-        profile = self._profiles.get(user_id)
+        profile = self._active_profile(user_id)
         if not profile:
             return
         for tag in extracted.get("tags") or []:
@@ -218,6 +372,7 @@ class UserProfileStore:
             profile.emotional_state_last = extracted["emotional_state_last"]
         if extracted.get("nickname"):
             self.update_nickname(user_id, extracted["nickname"])
+        self._mark_dirty(user_id)
 
     def update_nickname(self, user_id: int, nickname: str) -> None:
         """ユーザーのニックネームを更新する
@@ -226,20 +381,244 @@ class UserProfileStore:
             user_id: DiscordユーザーID
             nickname: 設定するニックネーム
         """
-        profile = self._profiles.get(user_id)
+        profile = self._active_profile(user_id)
         if profile:
             profile.nickname = nickname
+            self._mark_dirty(user_id)
             logger.info(f"ニックネーム更新: user_id={user_id}, nickname={nickname!r}")
 
     def persist_all(self) -> None:
-        """全プロファイルを永続化する（定期タスクから呼ばれる）"""
+        """読み込み済みの全プロファイルを永続化する"""
+        self._merge_pending_counters()
+        self._profiles.flush_all()
+
+    def persist_dirty(self) -> int:
+        """前回の永続化以降に更新されたプロファイルだけをまとめて永続化する
+
+        書き込みに失敗したプロファイルは次回の呼び出しで再試行する。
+
+        Returns:
+            永続化したプロファイル数
+        """
+        self._merge_pending_counters()
+        return self._flush_dirty_profiles()
+
+    async def persist_dirty_async(self) -> int:
+        """persist_dirty のイベントループ版
+
+        カウンタの反映（キャッシュ上のプロファイルの変更・キャッシュへの登録）はループ上で行い、
+        未キャッシュのプロファイルの読み込みと書き込みだけをスレッドで実行する。
+        """
+        counters = self._take_counters()
+        if counters:
+            missing = [uid for uid in counters if uid not in self._profiles]
+            loaded = await asyncio.to_thread(self._load_profiles, missing) if missing else []
+            dirty = self._profiles.take_dirty(self._apply_counters(counters, loaded))
+            if dirty:
+                await asyncio.to_thread(self._write_profiles, dirty)
+        return await asyncio.to_thread(self._flush_dirty_profiles)
+
+    def snapshot_rows(self) -> list[dict]:
+        """スナップショットに保存する行（キャッシュ上の全プロファイルをLRU順（古い順）に）を集める
+
+        キャッシュを読むだけで、カウンタの未反映分は反映しない。
+        """
+        return [profile.to_dict() for profile in self._profiles.values()]
+
+    def save_snapshot(self, rows: list[dict] | None = None) -> int:
+        """インメモリの全プロファイルをコンパクトなスナップショットとして保存する
+
+        復元時に永続化先と突き合わせないため、スナップショットが永続化先より
+        古くならないよう persist_dirty / persist_dirty_async の直後に呼ぶ。
+        キャッシュが空のときは既存のスナップショットを残すため保存しない。
+
+        Args:
+            rows: 事前に snapshot_rows() で集めた行。イベントループ外のスレッドで
+                保存する場合はループ上で集めてから渡す（None ならその場で集める）
+
+        Returns:
+            保存したプロファイル数（保存しなかった・失敗した場合は0）
+        """
+        from utils.snapshot import encode_columnar, save_snapshot
+
+        if rows is None:
+            rows = self.snapshot_rows()
+        if not rows:
+            return 0
+        if not save_snapshot(_SNAPSHOT_NAME, encode_columnar(rows)):
+            return 0
+        logger.debug(f"ユーザープロファイルのスナップショットを保存: {len(rows)}件")
+        return len(rows)
+
+    def restore_snapshot(self) -> int:
+        """スナップショットからプロファイルを一括でキャッシュに載せる（起動時用）
+
+        既にキャッシュ済みのプロファイルは上書きしない。
+
+        Returns:
+            キャッシュに追加したプロファイル数
+        """
+        from utils.snapshot import decode_columnar, load_snapshot
+
+        data = load_snapshot(_SNAPSHOT_NAME)
+        if data is None:
+            return 0
+        try:
+            rows = decode_columnar(data)
+        except ValueError as e:
+            logger.warning(f"ユーザープロファイルのスナップショットを無視: {e}")
+            return 0
+        added = 0
+        for row in rows:
+            profile = UserProfile.from_dict(row)
+            if profile.user_id in self._profiles:
+                continue
+            self._profiles.add(profile.user_id, profile)
+            added += 1
+        logger.info(f"ユーザープロファイルをスナップショットから復元: {added}件")
+        return added
+
+    def has_pending_writes(self) -> bool:
+        """未保存のプロファイル・未反映のカウンタがあるかを返す"""
+        with self._counters_lock:
+            if self._counters:
+                return True
+        return self._profiles.has_dirty()
+
+    def evict_expired(self) -> int:
+        """アイドルTTLを超えたプロファイルを永続化してから削除する（定期タスク用）
+
+        Returns:
+            削除したプロファイル数
+        """
+        return self._profiles.write_back_expired()
+
+    def stats(self) -> dict[str, int]:
+        """インメモリキャッシュの統計（エントリ数・ヒット・ミス・追い出し・未保存数・未反映カウンタ数）を返す"""
+        stats = self._profiles.stats()
+        with self._counters_lock:
+            stats["pending_counters"] = len(self._counters)
+        return stats
+
+    def _merge_evicted_counters(self, evicted: list[tuple[int, "UserProfile"]]) -> None:
+        """追い出されるプロファイルにカウンタの未反映分を反映する（書き戻しの前に呼ばれる）"""
+        with self._counters_lock:
+            pending = [
+                (profile, self._counters.pop(uid))
+                for uid, profile in evicted
+                if uid in self._counters
+            ]
+        for profile, counter in pending:
+            _merge_counter(profile, counter)
+            self._mark_dirty(profile.user_id)
+
+    def _peek(self, user_id: int) -> "UserProfile | None":
+        """LRU順序・統計を変えずにキャッシュ上のプロファイルを返す"""
+        return self._profiles.peek(user_id)
+
+    def _active_profile(self, user_id: int) -> "UserProfile | None":
+        """キャッシュ済み、または未反映のカウンタがある（最近発言した）ユーザーのプロファイルを返す
+
+        未キャッシュなら同期的に読み込む（反省会などスレッドから呼ぶ場合用）。
+        """
+        profile = self._profiles.get(user_id)
+        if profile is not None:
+            return self._apply_pending(profile)
+        with self._counters_lock:
+            active = user_id in self._counters
+        return self.get_profile(user_id) if active else None
+
+    async def _active_profile_async(self, user_id: int) -> "UserProfile | None":
+        """_active_profile のイベントループ版（未キャッシュ時は single-flight でスレッド読み込み）"""
+        profile = self._profiles.get(user_id)
+        if profile is not None:
+            return self._apply_pending(profile)
+        with self._counters_lock:
+            active = user_id in self._counters
+        return await self.get_profile_async(user_id) if active else None
+
+    def _apply_pending(self, profile: UserProfile) -> UserProfile:
+        """カウンタテーブルの未反映分をプロファイルに反映して返す"""
+        with self._counters_lock:
+            counter = self._counters.pop(profile.user_id, None)
+        if counter is not None:
+            _merge_counter(profile, counter)
+            self._mark_dirty(profile.user_id)
+        return profile
+
+    def _merge_pending_counters(self) -> None:
+        """カウンタテーブル全体をプロファイルへ反映する（永続化の直前に呼ぶ）
+
+        未キャッシュのユーザーは永続化先からまとめて読み込み（なければ新規作成）、
+        反映後にキャッシュへ載せる。
+        """
+        counters = self._take_counters()
+        if not counters:
+            return
+        missing = [uid for uid in counters if uid not in self._profiles]
+        loaded = self._load_profiles(missing) if missing else []
+        self._profiles.write_back(self._apply_counters(counters, loaded))
+
+    def _take_counters(self) -> dict[int, _InteractionCounter]:
+        """カウンタテーブルを取り出して空にする"""
+        with self._counters_lock:
+            counters, self._counters = self._counters, {}
+        return counters
+
+    def _apply_counters(
+        self, counters: dict[int, _InteractionCounter], loaded: list["UserProfile"]
+    ) -> list[tuple[int, "UserProfile"]]:
+        """カウンタをプロファイルに反映し、未キャッシュだったものをキャッシュへ載せる
+
+        キャッシュ済みのプロファイルを優先し、なければ loaded（なければ新規作成）に反映する。
+
+        Returns:
+            キャッシュへの登録で追い出されたエントリ（書き戻しは呼び出し側）
+        """
+        loaded_by_id = {p.user_id: p for p in loaded}
+        new_profiles: list[UserProfile] = []
+        for uid, counter in counters.items():
+            profile = self._peek(uid)
+            if profile is None:
+                profile = loaded_by_id.get(uid) or UserProfile(
+                    user_id=uid, display_name=counter.display_name
+                )
+                new_profiles.append(profile)
+            _merge_counter(profile, counter)
+            self._mark_dirty(uid)
+        # 全件を反映してから載せる（途中の追い出しで反映前のプロファイルを失わないため）
+        evicted: list[tuple[int, UserProfile]] = []
+        for profile in new_profiles:
+            evicted.extend(self._profiles.put(profile.user_id, profile))
+        return evicted
+
+    def _flush_dirty_profiles(self) -> int:
+        """ダーティなプロファイルを書き込む（カウンタは反映済みであること）"""
+        written, failed = self._profiles.flush_dirty()
+        if written or failed:
+            logger.debug(
+                f"ユーザープロファイルを永続化: 成功={written}件, 失敗={failed}件"
+            )
+        return written
+
+    def _mark_dirty(self, user_id: int) -> None:
+        self._profiles.mark_dirty(user_id)
+
+    def _write_profiles(self, profiles: list["UserProfile"]) -> list[int]:
+        """プロファイルをまとめて書き込み、失敗したユーザーIDを返す"""
         storage_type = config.STORAGE_TYPE
 
-        for profile in self._profiles.values():
-            if storage_type == "local":
-                self._save_to_local(profile)
-            elif storage_type == "firestore":
-                self._save_to_firestore(profile)
+        if storage_type == "local":
+            return [
+                profile.user_id
+                for profile in profiles
+                if not self._save_to_local(profile)
+            ]
+        elif storage_type == "firestore":
+            return self._save_batch_to_firestore(profiles)
+        elif storage_type == "sqlite":
+            return self._save_batch_to_sqlite(profiles)
+        return []
 
     def _load_profile(self, user_id: int) -> "UserProfile | None":
         """永続化先からプロファイルを読み込む"""
@@ -249,8 +628,26 @@ class UserProfileStore:
             return self._load_from_local(user_id)
         elif storage_type == "firestore":
             return self._load_from_firestore(user_id)
+        elif storage_type == "sqlite":
+            profiles = self._load_batch_from_sqlite([user_id])
+            return profiles[0] if profiles else None
         return None
 
+    def _load_profiles(self, user_ids: list[int]) -> list["UserProfile"]:
+        """複数プロファイルを永続化先からまとめて読み込む（存在したもののみ返す）"""
+        storage_type = config.STORAGE_TYPE
+
+        if storage_type == "local":
+            workers = min(_PREFETCH_LOCAL_WORKERS, len(user_ids))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(self._load_from_local, user_ids))
+            return [profile for profile in results if profile is not None]
+        elif storage_type == "firestore":
+            return self._load_batch_from_firestore(user_ids)
+        elif storage_type == "sqlite":
+            return self._load_batch_from_sqlite(user_ids)
+        return []
+
     def _load_from_local(self, user_id: int) -> "UserProfile | None":
         """ローカルファイルからプロファイルを読み込む"""
         file_path = f"storage/user_profile.{user_id}.json"
@@ -263,17 +660,19 @@ class UserProfileStore:
             logger.error(f"ユーザープロファイル読み込みエラー: {e}", exc_info=True)
         return None
 
-    def _save_to_local(self, profile: "UserProfile") -> None:
+    def _save_to_local(self, profile: "UserProfile") -> bool:
         """ローカルファイルにアトミック書き込み"""
         from utils.file_utils import atomic_write_json
 
         file_path = f"storage/user_profile.{profile.user_id}.json"
         try:
             atomic_write_json(file_path, profile.to_dict())
+            return True
         except Exception as e:
             logger.error(
                 f"ユーザープロファイルのローカル保存エラー: {e}", exc_info=True
             )
+            return False
 
     def _load_from_firestore(self, user_id: int) -> "UserProfile | None":
         """Firestoreからプロファイルを読み込む"""
@@ -297,19 +696,80 @@ class UserProfileStore:
             )
         return None
 
-    def _save_to_firestore(self, profile: "UserProfile") -> None:
-        """Firestoreにプロファイルを保存する"""
-        try:
-            from utils.firestore_client import get_firestore_client
+    def _load_batch_from_firestore(self, user_ids: list[int]) -> list["UserProfile"]:
+        """Firestoreから get_all で複数プロファイルを読み込む"""
+        from utils.firestore_client import get_documents
 
-            db = get_firestore_client()
-            db.collection(config.FIRESTORE_COLLECTION_USER_PROFILES).document(
-                str(profile.user_id)
-            ).set(profile.to_dict())
+        documents = get_documents(
+            config.FIRESTORE_COLLECTION_USER_PROFILES,
+            [str(uid) for uid in user_ids],
+        )
+        profiles: list[UserProfile] = []
+        for doc_id, data in documents.items():
+            try:
+                data["user_id"] = int(doc_id)
+                profiles.append(UserProfile.from_dict(data))
+            except Exception as e:
+                logger.error(
+                    f"プロファイルの復元に失敗: user_id={doc_id}, {e}", exc_info=True
+                )
+        return profiles
+
+    def _save_batch_to_firestore(self, profiles: list["UserProfile"]) -> list[int]:
+        """Firestoreにバッチ書き込みし、失敗したユーザーIDを返す"""
+        from utils.firestore_client import batch_set_documents
+
+        failed = batch_set_documents(
+            config.FIRESTORE_COLLECTION_USER_PROFILES,
+            {str(profile.user_id): profile.to_dict() for profile in profiles},
+        )
+        return [int(doc_id) for doc_id in failed]
+
+    def _load_batch_from_sqlite(self, user_ids: list[int]) -> list["UserProfile"]:
+        """SQLiteから主キー検索で複数プロファイルを読み込む"""
+        from utils.sqlite_store import COLLECTION_USER_PROFILES, get_sqlite_store
+
+        try:
+            documents = get_sqlite_store().get_many(
+                COLLECTION_USER_PROFILES, [str(uid) for uid in user_ids]
+            )
         except Exception as e:
-            logger.error(
-                f"Firestoreへのプロファイル保存エラー: {e}", exc_info=True
+            logger.error(f"SQLiteからのプロファイル読み込みエラー: {e}", exc_info=True)
+            return []
+        profiles: list[UserProfile] = []
+        for doc_id, data in documents.items():
+            data["user_id"] = int(doc_id)
+            profiles.append(UserProfile.from_dict(data))
+        return profiles
+
+    def _save_batch_to_sqlite(self, profiles: list["UserProfile"]) -> list[int]:
+        """SQLiteに1トランザクションで書き込み、失敗したユーザーIDを返す"""
+        from utils.sqlite_store import COLLECTION_USER_PROFILES, get_sqlite_store
+
+        try:
+            get_sqlite_store().set_many(
+                COLLECTION_USER_PROFILES,
+                {str(profile.user_id): profile.to_dict() for profile in profiles},
             )
+            return []
+        except Exception as e:
+            logger.error(f"SQLiteへのプロファイル一括保存エラー: {e}", exc_info=True)
+            return [profile.user_id for profile in profiles]
+
+
+def _merge_counter(profile: UserProfile, counter: _InteractionCounter) -> None:
+    """カウンタテーブルの1行をプロファイルに反映する"""
+    if counter.messages > 0:
+        profile.interaction_count += counter.messages
+        profile.display_name = counter.display_name
+        last_interaction = datetime.fromtimestamp(counter.last_ts, timezone.utc)
+        if last_interaction > profile.last_interaction:
+            profile.last_interaction = last_interaction
+        channels = [c for c in profile.channels_active if c not in counter.channels]
+        channels.extend(counter.channels)
+        profile.channels_active = channels[-config.CHANNELS_ACTIVE_LIMIT:]
+    if counter.mentions > 0:
+        profile.mentioned_bot_count += counter.mentions
 
 
 # シングルトン
@@ -323,8 +783,13 @@ def get_user_profile_store() -> UserProfileStore:
     if _store is None:
         with _store_lock:
             if _store is None:
-                _store = UserProfileStore()
+                _store = UserProfileStore(
+                    max_entries=config.USER_PROFILE_CACHE_MAX_ENTRIES,
+                    ttl_minutes=config.USER_PROFILE_CACHE_TTL_MINUTES,
+                )
                 logger.info(
-                    f"UserProfileStore初期化: storage_type={config.STORAGE_TYPE}"
+                    f"UserProfileStore初期化: storage_type={config.STORAGE_TYPE}, "
+                    f"max_entries={config.USER_PROFILE_CACHE_MAX_ENTRIES}, "
+                    f"ttl={config.USER_PROFILE_CACHE_TTL_MINUTES}分"
                 )
     return _store
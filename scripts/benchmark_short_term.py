@@ -0,0 +1,127 @@
+"""短期記憶バッファのベンチマーク
+
+旧実装（dict を持つ dataclass + timezone aware datetime、呼び出しごとに _to_utc で
+正規化）と現在の memory.short_term を、1メッセージあたりのメモリと
+バッファ操作1回あたりの CPU 時間で比較する。
+
+使い方（リポジトリのルートで実行。config の読み込みに DISCORD_TOKEN と INSTANCE_NAME が必要）:
+    DISCORD_TOKEN=dummy INSTANCE_NAME=bench python scripts/benchmark_short_term.py [--messages 50] [--channels 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+import timeit
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory.short_term import ChannelMessage, ChannelMessageBuffer, _to_utc  # noqa: E402
+
+
+@dataclass
+class _LegacyMessage:
+    message_id: int
+    channel_id: int
+    author_id: int
+    author_name: str
+    content: str
+    timestamp: datetime
+    is_bot: bool = False
+    attachments: list[str] = field(default_factory=list)
+
+
+def _legacy_recent(buf: list[_LegacyMessage], ttl_minutes: int, limit: int) -> list:
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=ttl_minutes)
+    return [m for m in buf if _to_utc(m.timestamp) > cutoff][-limit:]
+
+
+def _legacy_count_since(buf: list[_LegacyMessage], last: datetime) -> int:
+    return sum(1 for m in buf if _to_utc(m.timestamp) > last)
+
+
+def _legacy_context(buf: list[_LegacyMessage], ttl_minutes: int, limit: int) -> str:
+    return "\n".join(
+        f"{m.author_name}{'[BOT]' if m.is_bot else ''}: {m.content}"
+        for m in _legacy_recent(buf, ttl_minutes, limit)
+    )
+
+
+def _make_rows(channels: int, per_channel: int) -> list[tuple]:
+    base = datetime.now(timezone.utc) - timedelta(minutes=per_channel)
+    return [
+        (i, ch, i % 37, f"user{i % 37}", f"メッセージ本文 {i}", base + timedelta(minutes=i))
+        for ch in range(channels)
+        for i in range(per_channel)
+    ]
+
+
+def _measure_memory(factory, rows: list[tuple]) -> float:
+    """rows から生成したオブジェクト群の1件あたりの確保バイト数"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [factory(*row) for row in rows]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del objects
+    return size / len(rows)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=50, help="チャンネルあたりのメッセージ数")
+    parser.add_argument("--channels", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    # author_name は実運用同様にメッセージごとに別の文字列オブジェクトとして生成する
+    rows = [
+        (r[0], r[1], r[2], "".join(list(r[3])), r[4], r[5])
+        for r in _make_rows(args.channels, args.messages)
+    ]
+    legacy_bytes = _measure_memory(_LegacyMessage, rows)
+    current_bytes = _measure_memory(ChannelMessage, rows)
+    print(f"メモリ/メッセージ: legacy={legacy_bytes:.0f}B current={current_bytes:.0f}B")
+
+    ttl = 24 * 60
+    legacy_buf = [_LegacyMessage(*row) for row in rows[: args.messages]]
+    buffer = ChannelMessageBuffer(max_size=args.messages, ttl_minutes=ttl)
+    for row in rows[: args.messages]:
+        buffer.add_message(ChannelMessage(*row))
+    channel_id = rows[0][1]
+    mark = legacy_buf[len(legacy_buf) // 2].timestamp
+    buffer._last_reflected[channel_id] = mark.timestamp()
+
+    cases = [
+        (
+            "get_recent_messages(limit=20)",
+            lambda: _legacy_recent(legacy_buf, ttl, 20),
+            lambda: buffer.get_recent_messages(channel_id, limit=20),
+        ),
+        (
+            "get_context_string(limit=15)",
+            lambda: _legacy_context(legacy_buf, ttl, 15),
+            lambda: buffer.get_context_string(channel_id, limit=15),
+        ),
+        (
+            "count_messages_since_reflection",
+            lambda: _legacy_count_since(legacy_buf, mark),
+            lambda: buffer.count_messages_since_reflection(channel_id),
+        ),
+    ]
+    for name, legacy, current in cases:
+        legacy_us = timeit.timeit(legacy, number=args.repeat) / args.repeat * 1e6
+        current_us = timeit.timeit(current, number=args.repeat) / args.repeat * 1e6
+        print(f"{name}: legacy={legacy_us:.1f}us current={current_us:.1f}us")
+
+    start = time.perf_counter()
+    buffer.cleanup_expired()
+    print(f"cleanup_expired: {(time.perf_counter() - start) * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""RuleBasedJudge のオフラインリプレイ
+
+記録済み（JSONL）または合成したチャンネルログを仮想時計の上で判定し、判定の内訳・
+ルールの発火回数・LLM Judge の呼び出し率・処理性能を JSON で出力する。
+ログの形式は memory/judge_replay.py を参照。
+
+使い方（リポジトリのルートで実行。config の読み込みに DISCORD_TOKEN と INSTANCE_NAME が必要）:
+    DISCORD_TOKEN=dummy INSTANCE_NAME=replay python scripts/judge_replay.py --synthetic 5000 \\
+        --set JUDGE_LLM_THRESHOLD_LOW=25 --set ENGAGEMENT_BOOST=30 --llm-accept-rate 0.3
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory.judge_replay import (  # noqa: E402
+    config_overrides,
+    load_log,
+    parse_override,
+    replay,
+    synthetic_log,
+)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--log", help="JSONL のチャンネルログ")
+    source.add_argument("--synthetic", type=int, metavar="N", help="N 件の合成ログを使う")
+    parser.add_argument(
+        "--set", action="append", default=[], metavar="NAME=VALUE", help="config の値を上書きする"
+    )
+    parser.add_argument(
+        "--llm-accept-rate", type=float, default=0.0, help="LLM Judge が応答を選ぶと仮定する割合"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    overrides = dict(parse_override(item) for item in args.set)
+    with config_overrides(overrides):
+        messages = load_log(args.log) if args.log else synthetic_log(args.synthetic, seed=args.seed)
+        report = replay(messages, llm_accept_rate=args.llm_accept_rate, seed=args.seed)
+    print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
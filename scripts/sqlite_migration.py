@@ -0,0 +1,105 @@
+"""ローカルJSONファイルから SQLite への一括移行・性能比較ツール
+
+使い方（リポジトリのルートで実行。config の読み込みに DISCORD_TOKEN と INSTANCE_NAME が必要）:
+    python scripts/sqlite_migration.py migrate [--storage-dir storage] [--db storage/sphene.db]
+    python scripts/sqlite_migration.py benchmark [--count 1000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from memory.user_profile import UserProfile  # noqa: E402
+from utils.sqlite_migration import migrate_json_files  # noqa: E402
+from utils.sqlite_store import COLLECTION_USER_PROFILES, SQLiteStore  # noqa: E402
+
+
+def _sample_profile(user_id: int) -> dict:
+    """実運用と同じ形のプロファイル文書（UserProfile.to_dict）を作る"""
+    return UserProfile(
+        user_id=user_id,
+        display_name=f"user{user_id}",
+        interaction_count=user_id % 100,
+        mentioned_bot_count=user_id % 7,
+        channels_active=[1, 2, 3],
+        last_interaction=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        last_topic=["絶もう", "極蛮神", "ハウジング"],
+        tags=["FF14", "零式", "ギャザラー"],
+        personality_notes="落ち着いた口調で攻略情報に詳しい",
+        last_conversation_summary="零式のギミック処理について相談した",
+        preferred_tone="casual",
+        notable_facts=["タンク職をメインにしている", "週末に固定で活動している"],
+        emotional_state_last="楽しそう",
+        nickname=f"u{user_id}",
+    ).to_dict()
+
+
+def run_benchmark(count: int) -> dict[str, float]:
+    """プロファイル count 件の書き込み・読み込み時間（秒）をJSONファイルとSQLiteで比較する"""
+    from utils.file_utils import atomic_write_json
+
+    results: dict[str, float] = {}
+    profiles = {str(i): _sample_profile(i) for i in range(count)}
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        for doc_id, data in profiles.items():
+            atomic_write_json(os.path.join(tmp, f"user_profile.{doc_id}.json"), data)
+        results["json_write"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for doc_id in profiles:
+            with open(os.path.join(tmp, f"user_profile.{doc_id}.json"), encoding="utf-8") as f:
+                json.load(f)
+        results["json_read"] = time.perf_counter() - start
+
+        store = SQLiteStore(os.path.join(tmp, "bench.db"))
+        try:
+            start = time.perf_counter()
+            store.set_many(COLLECTION_USER_PROFILES, profiles)
+            results["sqlite_write"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for doc_id in profiles:
+                store.get(COLLECTION_USER_PROFILES, doc_id)
+            results["sqlite_read"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            store.get_many(COLLECTION_USER_PROFILES, profiles.keys())
+            results["sqlite_read_many"] = time.perf_counter() - start
+        finally:
+            store.close()
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="JSONファイル → SQLite 移行ツール")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="storage/*.json を SQLite に移行する")
+    migrate.add_argument("--storage-dir", default="storage")
+    migrate.add_argument("--db", default=config.SQLITE_DB_PATH)
+    bench = sub.add_parser("benchmark", help="JSONファイルとSQLiteの読み書き性能を比較する")
+    bench.add_argument("--count", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        store = SQLiteStore(args.db)
+        try:
+            migrated = migrate_json_files(args.storage_dir, store)
+        finally:
+            store.close()
+        for collection, count in migrated.items():
+            print(f"{collection}: {count}")
+    else:
+        for name, seconds in run_benchmark(args.count).items():
+            print(f"{name}: {seconds * 1000:.1f} ms ({args.count} profiles)")
+
+
+if __name__ == "__main__":
+    main()
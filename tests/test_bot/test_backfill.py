@@ -0,0 +1,136 @@
+"""起動時のチャンネルバッファ埋め戻しのテスト"""
+
+# type: ignore
+# mypy: ignore-errors
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+import pytest
+
+from bot.backfill import backfill_channel_buffers
+from memory.short_term import ChannelMessage, ChannelMessageBuffer
+
+BOT_USER_ID = 999
+
+
+def _snowflake(dt: datetime) -> int:
+    return discord.utils.time_snowflake(dt)
+
+
+def _message(channel_id: int, author_id: int, content: str, minutes_ago: int, bot: bool = False):
+    created = datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)
+    message = MagicMock()
+    message.id = _snowflake(created)
+    message.channel.id = channel_id
+    message.author.id = author_id
+    message.author.bot = bot
+    message.author.display_name = f"user{author_id}"
+    message.content = content
+    message.attachments = []
+    message.created_at = created
+    return message
+
+
+def _channel(channel_id: int, messages: list, minutes_ago: int = 1, error: Exception | None = None):
+    channel = MagicMock()
+    channel.id = channel_id
+    channel.last_message_id = _snowflake(datetime.now(timezone.utc) - timedelta(minutes=minutes_ago))
+    calls = {"count": 0}
+
+    def history(**kwargs):
+        async def gen():
+            calls["count"] += 1
+            if error is not None and calls["count"] == 1:
+                raise error
+            # 新しい順で返す
+            for m in sorted(messages, key=lambda m: m.created_at, reverse=True)[: kwargs["limit"]]:
+                yield m
+
+        return gen()
+
+    channel.history = history
+    channel.calls = calls
+    return channel
+
+
+def _bot(channels: list):
+    guild = MagicMock()
+    guild.id = 1
+    guild.text_channels = channels
+    bot = MagicMock()
+    bot.guilds = [guild]
+    bot.user.id = BOT_USER_ID
+    return bot
+
+
+@pytest.fixture
+def buffer():
+    buf = ChannelMessageBuffer(max_size=50, ttl_minutes=30)
+    with patch("bot.backfill.get_channel_buffer", return_value=buf):
+        yield buf
+
+
+@pytest.fixture
+def config_manager():
+    manager = MagicMock()
+    manager.get_config.return_value.can_bot_speak.side_effect = lambda channel_id: channel_id != 30
+    return manager
+
+
+class TestBackfillChannelBuffers:
+    """backfill_channel_buffers のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_backfills_active_allowed_channels(self, buffer, config_manager):
+        """発言可能で直近に発言のあるチャンネルだけが古い順に埋め戻されること"""
+        channels = [
+            _channel(10, [_message(10, 1, "一番目", 5), _message(10, BOT_USER_ID, "返事", 4, bot=True)]),
+            _channel(20, [_message(20, 2, "古い", 120)], minutes_ago=120),
+            _channel(30, [_message(30, 3, "禁止", 1)]),
+            _channel(40, [_message(40, 4, "他ボット", 1, bot=True), _message(40, 5, "", 1)]),
+        ]
+
+        added = await backfill_channel_buffers(_bot(channels), config_manager)
+
+        assert added == 2
+        assert buffer.get_context_string(10) == "user1: 一番目\nuser999[BOT]: 返事"
+        assert not buffer.has_channel(20)
+        assert not buffer.has_channel(30)
+        assert not buffer.has_channel(40)
+        assert channels[1].calls["count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_skips_channels_already_buffered(self, buffer, config_manager):
+        """スナップショット等で既にバッファを持つチャンネルは取得しないこと"""
+        buffer.add_message(ChannelMessage(1, 10, 1, "A", "既存", datetime.now(timezone.utc)))
+        channel = _channel(10, [_message(10, 1, "履歴", 5)])
+
+        assert await backfill_channel_buffers(_bot([channel]), config_manager) == 0
+        assert channel.calls["count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_retries_after_rate_limit(self, buffer, config_manager):
+        """429 を受けたら retry_after だけ待って再試行すること"""
+        response = MagicMock(status=429, reason="Too Many Requests")
+        error = discord.HTTPException(response, "rate limited")
+        error.retry_after = 0.5
+        channel = _channel(10, [_message(10, 1, "履歴", 5)], error=error)
+
+        with patch("bot.backfill.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+            added = await backfill_channel_buffers(_bot([channel]), config_manager)
+
+        assert added == 1
+        mock_sleep.assert_awaited_once_with(0.5)
+
+    @pytest.mark.asyncio
+    async def test_failed_channel_is_skipped(self, buffer, config_manager):
+        """権限エラー等で取得できないチャンネルは飛ばして他を埋めること"""
+        response = MagicMock(status=403, reason="Forbidden")
+        failing = _channel(10, [], error=discord.Forbidden(response, "no access"))
+        ok = _channel(20, [_message(20, 2, "見える", 3)])
+
+        assert await backfill_channel_buffers(_bot([failing, ok]), config_manager) == 1
+        assert buffer.has_channel(20)
+
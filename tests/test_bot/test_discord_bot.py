@@ -1,8 +1,12 @@
 """bot/discord_bot.pyのテスト"""
 
-from unittest.mock import MagicMock, patch
+import asyncio
+import os
+import signal
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import discord
+import pytest
 
 from bot.discord_bot import SpheneBot
 
@@ -59,3 +63,29 @@ def test_sphene_bot_run() -> None:
             # run メソッドのテスト
             bot.run()
             mock_bot.run.assert_called_once_with(mock_config.DISCORD_TOKEN)
+
+
+@pytest.mark.asyncio
+async def test_sigterm_closes_bot() -> None:
+    """SIGTERM を受けたら bot.close() が1回だけ呼ばれること"""
+    with patch("bot.discord_bot.load_system_prompt"), patch(
+        "bot.discord_bot.commands.Bot"
+    ) as mock_bot_cls, patch.object(SpheneBot, "_setup"):
+        mock_bot = MagicMock()
+        mock_bot.close = AsyncMock()
+        mock_bot_cls.return_value = mock_bot
+        bot = SpheneBot()
+
+    loop = asyncio.get_running_loop()
+    bot._install_signal_handlers()
+    try:
+        os.kill(os.getpid(), signal.SIGTERM)
+        os.kill(os.getpid(), signal.SIGTERM)
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if mock_bot.close.await_count:
+                break
+    finally:
+        loop.remove_signal_handler(signal.SIGTERM)
+
+    mock_bot.close.assert_awaited_once()
@@ -75,10 +75,22 @@ class TestDiscordBotAdditional:
                 123: MagicMock(should_summarize_by_time=MagicMock(return_value=True))
             }
 
-            await bot_wrapper._cleanup_task()
+            mock_user_store.return_value.persist_dirty_async = AsyncMock(return_value=1)
+
+            with patch("config.USER_PROFILE_SNAPSHOT_ENABLED", True):
+                await bot_wrapper._cleanup_task()
 
-            mock_user_store.return_value.persist_all.assert_called_once()
-            mock_summ_fn.return_value.maybe_summarize.assert_called_once()
+            mock_user_store.return_value.persist_dirty_async.assert_awaited_once()
+            # スナップショットは永続化の後にループ上で集めた行から保存する
+            calls = [c[0] for c in mock_user_store.return_value.mock_calls]
+            assert calls.index("persist_dirty_async") < calls.index("snapshot_rows")
+            mock_user_store.return_value.save_snapshot.assert_called_once_with(
+                mock_user_store.return_value.snapshot_rows.return_value
+            )
+            mock_user_store.return_value.persist_all.assert_not_called()
+            mock_summ_fn.return_value.summarize_due_channels.assert_called_once()
+            due = mock_summ_fn.return_value.summarize_due_channels.call_args[0][0]
+            assert list(due.keys()) == [123]
             mock_fact_store.return_value.persist_all.assert_called_once()
 
     @pytest.mark.asyncio
@@ -99,3 +111,43 @@ class TestDiscordBotAdditional:
             patch("memory.reflection.get_reflection_engine", side_effect=Exception("error5")),
         ):
             await bot_wrapper._cleanup_task()
+
+    @pytest.mark.asyncio
+    async def test_flush_task_flushes_pending_contexts(self):
+        """_flush_task が未保存のチャンネルコンテキストを永続化すること"""
+        with (
+            patch("bot.discord_bot.commands.Bot"),
+            patch("bot.discord_bot.load_system_prompt"),
+        ):
+            bot_wrapper = SpheneBot()
+
+        with patch("memory.channel_context.get_channel_context_store") as mock_store_fn:
+            mock_store_fn.return_value.has_pending_writes.return_value = True
+            await bot_wrapper._flush_task()
+            mock_store_fn.return_value.flush_dirty.assert_called_once()
+
+            mock_store_fn.return_value.reset_mock()
+            mock_store_fn.return_value.has_pending_writes.return_value = False
+            await bot_wrapper._flush_task()
+            mock_store_fn.return_value.flush_dirty.assert_not_called()
+
+    def test_run_flushes_on_shutdown(self):
+        """ボット停止時（例外終了を含む）に未保存データがフラッシュされること"""
+        with (
+            patch("bot.discord_bot.commands.Bot") as mock_bot_cls,
+            patch("bot.discord_bot.load_system_prompt"),
+        ):
+            bot_wrapper = SpheneBot()
+
+        mock_bot_cls.return_value.run.side_effect = KeyboardInterrupt
+        with (
+            patch("config.LIVING_MEMORY_ENABLED", True),
+            patch("memory.channel_context.get_channel_context_store") as mock_store_fn,
+            patch("memory.user_profile.get_user_profile_store") as mock_profile_fn,
+        ):
+            mock_store_fn.return_value.flush_dirty.side_effect = Exception("error")
+            with pytest.raises(KeyboardInterrupt):
+                bot_wrapper.run()
+            mock_store_fn.return_value.flush_dirty.assert_called_once()
+            # 一方の失敗が他方のフラッシュを妨げないこと
+            mock_profile_fn.return_value.persist_dirty.assert_called_once()
@@ -806,3 +806,52 @@ class TestTryAutonomousResponseReaction:
         mock_create_task.assert_called_once()
         # 返信も発火
         mock_dispatch.assert_called_once()
+
+
+class TestAutonomousResponseDebounce:
+    """自律応答判定の静穏期間（デバウンス）のテスト"""
+
+    @pytest.mark.asyncio
+    @patch("bot.events.config")
+    async def test_burst_coalesced_into_last_message(self, mock_config):
+        """静穏期間内の連投は取り消され、最後のメッセージだけが判定されること"""
+        import asyncio
+
+        from bot.events import _pending_judgements, _schedule_autonomous_response
+
+        mock_config.JUDGE_DEBOUNCE_SECONDS = 0.02
+        messages = []
+        for i in range(3):
+            message = MagicMock()
+            message.channel.id = 555
+            message.id = i
+            messages.append(message)
+
+        with patch("bot.events._try_autonomous_response", new=AsyncMock()) as mock_try:
+            for message in messages:
+                _schedule_autonomous_response(MagicMock(), message, [], MagicMock())
+                await asyncio.sleep(0)
+            await asyncio.sleep(0.05)
+
+        mock_try.assert_awaited_once()
+        assert mock_try.await_args.args[1] is messages[-1]
+        assert 555 not in _pending_judgements
+
+    @pytest.mark.asyncio
+    @patch("bot.events.config")
+    async def test_cancel_pending_judgement(self, mock_config):
+        """メンションで応答する場合は待機中の判定が取り消されること"""
+        import asyncio
+
+        from bot.events import _cancel_pending_judgement, _schedule_autonomous_response
+
+        mock_config.JUDGE_DEBOUNCE_SECONDS = 0.02
+        message = MagicMock()
+        message.channel.id = 556
+
+        with patch("bot.events._try_autonomous_response", new=AsyncMock()) as mock_try:
+            _schedule_autonomous_response(MagicMock(), message, [], MagicMock())
+            _cancel_pending_judgement(556)
+            await asyncio.sleep(0.05)
+
+        mock_try.assert_not_awaited()
@@ -25,6 +25,9 @@ from bot.events import (
     translate_and_reply,
     _try_autonomous_response,
     _process_autonomous_response,
+    _prefetch_channel_profiles,
+    _prefetch_profiles,
+    _start_background_task,
 )
 
 
@@ -278,7 +281,7 @@ class TestCollectAiContext:
         mock_ctx.format_for_injection.return_value = "summary text"
         mock_ctx.topic_keywords = ["topic1", "topic2"]
         mock_ctx_store = MagicMock()
-        mock_ctx_store.get_context.return_value = mock_ctx
+        mock_ctx_store.get_context_async = AsyncMock(return_value=mock_ctx)
         mock_ctx_store_fn.return_value = mock_ctx_store
 
         mock_fact_store_fn.return_value.search.return_value = []
@@ -320,7 +323,7 @@ class TestCollectAiContext:
         mock_profile.format_for_context.return_value = ""
         mock_profile.format_for_persona.return_value = ""
         mock_profile_store = MagicMock()
-        mock_profile_store.get_profile.return_value = mock_profile
+        mock_profile_store.get_profile_async = AsyncMock(return_value=mock_profile)
         mock_profile_store_fn.return_value = mock_profile_store
 
         mock_fact_store_fn.return_value.search.return_value = []
@@ -450,20 +453,22 @@ class TestSendChunks:
 class TestPostResponseUpdate:
     """_post_response_update のテスト"""
 
+    @pytest.mark.asyncio
     @patch("bot.events.config")
-    def test_skips_profile_update_when_no_keywords(self, mock_config: MagicMock) -> None:
-        """topic_keywords が空のとき update_last_topic は呼ばれない"""
+    async def test_skips_profile_update_when_no_keywords(self, mock_config: MagicMock) -> None:
+        """topic_keywords が空のとき update_last_topic_async は呼ばれない"""
         mock_config.LIVING_MEMORY_ENABLED = True
 
         message = MagicMock()
         message.channel.id = 100
 
         with patch("memory.user_profile.get_user_profile_store") as mock_store_fn:
-            _post_response_update(message, "answer", [], MagicMock())
+            await _post_response_update(message, "answer", [], MagicMock())
             mock_store_fn.assert_not_called()
 
+    @pytest.mark.asyncio
     @patch("bot.events.config")
-    def test_skips_buffer_when_bot_user_is_none(self, mock_config: MagicMock) -> None:
+    async def test_skips_buffer_when_bot_user_is_none(self, mock_config: MagicMock) -> None:
         """bot_user が None のとき add_message は呼ばれない"""
         mock_config.LIVING_MEMORY_ENABLED = False
 
@@ -471,11 +476,12 @@ class TestPostResponseUpdate:
         message.channel.id = 100
 
         with patch("memory.short_term.get_channel_buffer") as mock_buffer_fn:
-            _post_response_update(message, "answer", [], None)
+            await _post_response_update(message, "answer", [], None)
             mock_buffer_fn.assert_not_called()
 
+    @pytest.mark.asyncio
     @patch("bot.events.config")
-    def test_updates_profile_and_buffer(self, mock_config: MagicMock) -> None:
+    async def test_updates_profile_and_buffer(self, mock_config: MagicMock) -> None:
         """keywords あり・bot_user あり の場合、両方更新される"""
         mock_config.LIVING_MEMORY_ENABLED = True
 
@@ -493,11 +499,115 @@ class TestPostResponseUpdate:
             patch("memory.short_term.get_channel_buffer") as mock_buffer_fn,
         ):
             mock_profile_store = MagicMock()
+            mock_profile_store.update_last_topic_async = AsyncMock()
             mock_profile_fn.return_value = mock_profile_store
             mock_buffer = MagicMock()
             mock_buffer_fn.return_value = mock_buffer
 
-            _post_response_update(message, "answer", ["kw1"], bot_user)
+            await _post_response_update(message, "answer", ["kw1"], bot_user)
 
-            mock_profile_store.update_last_topic.assert_called_once_with(200, ["kw1"])
+            mock_profile_store.update_last_topic_async.assert_awaited_once_with(200, ["kw1"])
             mock_buffer.add_message.assert_called_once()
+
+
+class TestBackgroundTasks:
+    """_start_background_task のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_keeps_reference_until_done_and_logs_failure(self) -> None:
+        """完了まで参照を保持し、完了後に取り除いて例外をログに残すこと"""
+        from bot import events
+
+        release = asyncio.Event()
+
+        async def fail() -> None:
+            await release.wait()
+            raise RuntimeError("boom")
+
+        with patch("bot.events.logger") as mock_logger:
+            task = _start_background_task(fail(), name="test_task")
+            assert task in events._background_tasks
+            release.set()
+            with pytest.raises(RuntimeError):
+                await task
+            await asyncio.sleep(0)
+
+        assert task not in events._background_tasks
+        mock_logger.error.assert_called_once()
+        assert "test_task" in mock_logger.error.call_args.args[0]
+
+
+class TestProfilePrefetch:
+    """_prefetch_profiles / _prefetch_channel_profiles のテスト"""
+
+    @pytest.mark.asyncio
+    @patch("bot.events.config")
+    async def test_prefetch_profiles_caps_user_count(self, mock_config: MagicMock) -> None:
+        """上限人数までに切り詰めてプリフェッチすること"""
+        mock_config.PROFILE_PREFETCH_MAX_USERS = 2
+        with patch("memory.user_profile.get_user_profile_store") as mock_store_fn:
+            mock_store_fn.return_value.prefetch_async = AsyncMock(return_value=2)
+            await _prefetch_profiles([1, 2, 3])
+            mock_store_fn.return_value.prefetch_async.assert_awaited_once_with([1, 2])
+
+    @pytest.mark.asyncio
+    @patch("bot.events.config")
+    async def test_prefetch_disabled(self, mock_config: MagicMock) -> None:
+        """上限0のときプリフェッチしないこと"""
+        mock_config.PROFILE_PREFETCH_MAX_USERS = 0
+        with patch("memory.user_profile.get_user_profile_store") as mock_store_fn:
+            await _prefetch_profiles([1])
+            mock_store_fn.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("bot.events.config")
+    async def test_prefetch_errors_are_swallowed(self, mock_config: MagicMock) -> None:
+        """プリフェッチの失敗が例外として伝播しないこと"""
+        mock_config.PROFILE_PREFETCH_MAX_USERS = 10
+        with patch("memory.user_profile.get_user_profile_store", side_effect=Exception("err")):
+            await _prefetch_profiles([1])
+
+    @pytest.mark.asyncio
+    @patch("bot.events.config")
+    async def test_channel_prefetch_collects_authors_and_members(
+        self, mock_config: MagicMock
+    ) -> None:
+        """バッファの発言者と、チャンネルを閲覧できるボット以外のメンバーが対象になること"""
+        mock_config.PROFILE_PREFETCH_MAX_USERS = 3
+        channel = MagicMock()
+        channel.id = 100
+        channel.guild.members = [
+            MagicMock(id=1, bot=False),
+            MagicMock(id=50, bot=True),
+            MagicMock(id=4, bot=False),
+            MagicMock(id=2, bot=False),
+            MagicMock(id=3, bot=False),
+        ]
+        channel.permissions_for.side_effect = lambda m: MagicMock(read_messages=m.id != 4)
+        with (
+            patch("memory.short_term.get_channel_buffer") as mock_buffer_fn,
+            patch("bot.events._prefetch_profiles", new_callable=AsyncMock) as mock_prefetch,
+        ):
+            mock_buffer_fn.return_value.get_author_ids.return_value = [1]
+            await _prefetch_channel_profiles(channel)
+            mock_prefetch.assert_awaited_once_with([1, 2, 3])
+
+    @pytest.mark.asyncio
+    @patch("bot.events.config")
+    async def test_channel_prefetch_bounds_permission_checks(
+        self, mock_config: MagicMock
+    ) -> None:
+        """大きなギルドでも権限確認は上限の倍数の人数で打ち切ること"""
+        mock_config.PROFILE_PREFETCH_MAX_USERS = 2
+        channel = MagicMock()
+        channel.id = 100
+        channel.guild.members = [MagicMock(id=i, bot=False) for i in range(1000)]
+        channel.permissions_for.return_value = MagicMock(read_messages=False)
+        with (
+            patch("memory.short_term.get_channel_buffer") as mock_buffer_fn,
+            patch("bot.events._prefetch_profiles", new_callable=AsyncMock) as mock_prefetch,
+        ):
+            mock_buffer_fn.return_value.get_author_ids.return_value = []
+            await _prefetch_channel_profiles(channel)
+            mock_prefetch.assert_awaited_once_with([])
+        assert channel.permissions_for.call_count == 8
@@ -3,6 +3,7 @@
 # type: ignore
 # mypy: ignore-errors
 
+import asyncio
 from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock, mock_open, patch
 
@@ -249,6 +250,55 @@ class TestFormatForInjection:
         assert "参加者:" not in result
 
 
+class TestRenderCache:
+    """format_for_injection のメモ化のテスト"""
+
+    def test_cached_until_field_changes(self):
+        """依存フィールドが変わるまで同一の文字列が再利用されること"""
+        ctx = ChannelContext(channel_id=1, summary="要約", topic_keywords=["Python"])
+        first = ctx.format_for_injection()
+        version = ctx.render_version
+        with patch.object(ctx, "_render_injection") as mock_render:
+            assert ctx.format_for_injection() is first
+            mock_render.assert_not_called()
+        ctx.topic_keywords = ["Rust"]
+        assert "Rust" in ctx.format_for_injection()
+        assert ctx.render_version == version + 1
+
+    def test_unrelated_field_keeps_cache(self):
+        """描画に関係しないフィールドの変更ではキャッシュが破棄されないこと"""
+        ctx = ChannelContext(channel_id=1, summary="要約")
+        ctx.format_for_injection()
+        version = ctx.render_version
+        ctx.increment_message_count()
+        assert ctx.render_version == version
+        assert "_render_cache" in ctx.__dict__
+
+    def test_invalidate_after_in_place_change(self):
+        """インプレース変更後に invalidate_render_cache で再生成されること"""
+        ctx = ChannelContext(channel_id=1, summary="要約", active_users=["A"])
+        ctx.format_for_injection()
+        ctx.active_users.append("B")
+        ctx.invalidate_render_cache()
+        assert "参加者: A, B" in ctx.format_for_injection()
+
+    def test_injection_byte_size(self):
+        """描画結果のUTF-8バイト数が返ること"""
+        ctx = ChannelContext(channel_id=1, summary="要約", mood="穏やか")
+        assert ctx.injection_byte_size() == len(ctx.format_for_injection().encode("utf-8"))
+        assert ChannelContext(channel_id=2).injection_byte_size() == 0
+
+    def test_cache_not_serialized_or_compared(self):
+        """キャッシュが to_dict や等価比較に影響しないこと"""
+        ctx1 = ChannelContext(channel_id=1, summary="要約")
+        ctx2 = ChannelContext(
+            channel_id=1, summary="要約", last_updated=ctx1.last_updated
+        )
+        ctx1.format_for_injection()
+        assert ctx1 == ctx2
+        assert "_render_cache" not in ctx1.to_dict()
+
+
 class TestToDictFromDict:
     """to_dict / from_dictのラウンドトリップテスト"""
 
@@ -366,27 +416,30 @@ class TestChannelContextStore:
         assert ctx2.channel_id == 200
 
     @patch("memory.channel_context.config")
-    def test_save_context_updates_cache_and_calls_save(self, mock_config):
-        """save_contextがインメモリキャッシュを更新し、_save_to_localを呼ぶこと"""
+    def test_save_context_updates_cache_and_defers_write(self, mock_config):
+        """save_contextがインメモリキャッシュを更新し、書き込みはフラッシュまで遅延すること"""
         mock_config.STORAGE_TYPE = "local"
         store = ChannelContextStore()
         ctx = ChannelContext(channel_id=100, summary="保存テスト")
         with patch.object(store, "_save_to_local") as mock_save:
             store.save_context(ctx)
+            mock_save.assert_not_called()
+            assert store.flush_dirty() == 1
             mock_save.assert_called_once_with(ctx)
         # インメモリキャッシュに反映されていること
         assert store._contexts[100] is ctx
 
     @patch("memory.channel_context.config")
-    def test_save_context_firestore_calls_save_to_firestore(self, mock_config):
-        """storage_type=firestoreの場合、_save_to_firestoreが呼ばれること"""
+    def test_save_context_firestore_flushes_in_batch(self, mock_config):
+        """storage_type=firestoreの場合、フラッシュでバッチ書き込みされること"""
         mock_config.STORAGE_TYPE = "firestore"
         store = ChannelContextStore()
         ctx = ChannelContext(channel_id=100, summary="Firestore保存")
 
-        with patch.object(store, "_save_to_firestore") as mock_save:
+        with patch.object(store, "_save_batch_to_firestore", return_value=[]) as mock_save:
             store.save_context(ctx)
-            mock_save.assert_called_once_with(ctx)
+            store.flush_dirty()
+            mock_save.assert_called_once_with([ctx])
 
     @patch("memory.channel_context.config")
     def test_load_context_from_local(self, mock_config):
@@ -435,6 +488,194 @@ class TestChannelContextStore:
             assert ctx.summary == ""
 
 
+class TestChannelContextStoreBounded:
+    """ChannelContextStoreのLRU上限・TTL・非同期読み込みのテスト"""
+
+    @patch("memory.channel_context.config")
+    def test_lru_eviction_flushes_unsaved_counts(self, mock_config):
+        """上限超過で追い出される未保存のコンテキストが永続化されること"""
+        mock_config.STORAGE_TYPE = "local"
+        store = ChannelContextStore(max_entries=2)
+        with patch("memory.channel_context.os.path.exists", return_value=False), \
+             patch.object(store, "_save_to_local") as mock_save:
+            ctx1 = store.get_context(1)
+            ctx1.increment_message_count()
+            store.mark_dirty(1)
+            store.get_context(2)
+            store.get_context(3)
+            mock_save.assert_called_once_with(ctx1)
+        assert 1 not in store._contexts
+        assert store.stats()["evictions"] == 1
+
+    @patch("memory.channel_context.config")
+    def test_lru_eviction_skips_clean_context(self, mock_config):
+        """未保存の変更がないコンテキストは追い出し時に書き込まれないこと"""
+        mock_config.STORAGE_TYPE = "local"
+        store = ChannelContextStore(max_entries=1)
+        with patch("memory.channel_context.os.path.exists", return_value=False), \
+             patch.object(store, "_save_to_local") as mock_save:
+            store.get_context(1)
+            store.get_context(2)
+            mock_save.assert_not_called()
+
+    @patch("memory.channel_context.config")
+    def test_recent_access_protects_from_eviction(self, mock_config):
+        """最近アクセスしたコンテキストが追い出されないこと"""
+        mock_config.STORAGE_TYPE = "local"
+        store = ChannelContextStore(max_entries=2)
+        with patch("memory.channel_context.os.path.exists", return_value=False):
+            store.get_context(1)
+            store.get_context(2)
+            store.get_context(1)
+            store.get_context(3)
+        assert 1 in store._contexts
+        assert 2 not in store._contexts
+
+    @patch("memory.channel_context.config")
+    def test_evict_expired(self, mock_config):
+        """アイドルTTLを超えたコンテキストが永続化のうえ解放されること"""
+        mock_config.STORAGE_TYPE = "local"
+        store = ChannelContextStore(ttl_minutes=10)
+        with patch("memory.channel_context.os.path.exists", return_value=False), \
+             patch("utils.lru_cache.time.monotonic", return_value=0.0):
+            ctx = store.get_context(1)
+        ctx.increment_message_count()
+        store.mark_dirty(1)
+        with patch("utils.lru_cache.time.monotonic", return_value=601.0), \
+             patch.object(store, "_save_to_local") as mock_save:
+            assert store.evict_expired() == 1
+            mock_save.assert_called_once_with(ctx)
+        assert len(store._contexts) == 0
+
+    @pytest.mark.asyncio
+    @patch("memory.channel_context.config")
+    async def test_get_context_async_single_flight(self, mock_config):
+        """同一チャンネルへの同時要求で読み込みが1回だけ行われること"""
+        mock_config.STORAGE_TYPE = "local"
+        store = ChannelContextStore()
+        loaded = ChannelContext(channel_id=100, summary="読み込み済み")
+        with patch.object(store, "_load_context", return_value=loaded) as mock_load:
+            results = await asyncio.gather(
+                *(store.get_context_async(100) for _ in range(5))
+            )
+        mock_load.assert_called_once_with(100)
+        assert all(r is loaded for r in results)
+        assert store._contexts[100] is loaded
+        assert store._contexts._loading == {}
+
+    @pytest.mark.asyncio
+    @patch("memory.channel_context.config")
+    async def test_get_context_async_cache_hit(self, mock_config):
+        """キャッシュヒット時は読み込みが発生しないこと"""
+        mock_config.STORAGE_TYPE = "local"
+        store = ChannelContextStore()
+        ctx = ChannelContext(channel_id=100)
+        store._contexts.put(100, ctx)
+        with patch.object(store, "_load_context") as mock_load:
+            assert await store.get_context_async(100) is ctx
+        mock_load.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("memory.channel_context.config")
+    async def test_get_context_async_new_context(self, mock_config):
+        """永続化先に存在しない場合、新規コンテキストが作成されること"""
+        mock_config.STORAGE_TYPE = "local"
+        store = ChannelContextStore()
+        with patch.object(store, "_load_context", return_value=None):
+            ctx = await store.get_context_async(200)
+        assert ctx.channel_id == 200
+        assert ctx.summary == ""
+
+
+class TestChannelContextWriteBehind:
+    """ChannelContextStoreのwrite-behind永続化のテスト"""
+
+    @patch("memory.channel_context.config")
+    def test_updates_are_coalesced_per_channel(self, mock_config):
+        """同一チャンネルへの複数回の更新が1回の書き込みにまとめられること"""
+        mock_config.STORAGE_TYPE = "local"
+        store = ChannelContextStore()
+        ctx = ChannelContext(channel_id=100)
+        with patch.object(store, "_save_to_local", return_value=True) as mock_save:
+            store.save_context(ctx)
+            for _ in range(10):
+                ctx.increment_message_count()
+                store.mark_dirty(100)
+            assert store.flush_dirty() == 1
+            assert store.flush_dirty() == 0
+        mock_save.assert_called_once_with(ctx)
+        assert store.has_pending_writes() is False
+
+    @patch("memory.channel_context.config")
+    def test_failed_writes_are_retried(self, mock_config):
+        """書き込みに失敗したコンテキストが次回のフラッシュで再試行されること"""
+        mock_config.STORAGE_TYPE = "local"
+        store = ChannelContextStore()
+        store.save_context(ChannelContext(channel_id=100))
+        with patch.object(store, "_save_to_local", return_value=False):
+            assert store.flush_dirty() == 0
+        assert store.stats()["dirty"] == 1
+        with patch.object(store, "_save_to_local", return_value=True):
+            assert store.flush_dirty() == 1
+        assert store.has_pending_writes() is False
+
+    @patch("memory.channel_context.config")
+    def test_message_count_is_persisted(self, mock_config):
+        """mark_dirty したメッセージカウンタがフラッシュで永続化されること"""
+        mock_config.STORAGE_TYPE = "local"
+        store = ChannelContextStore()
+        with patch("memory.channel_context.os.path.exists", return_value=False):
+            ctx = store.get_context(100)
+        ctx.increment_message_count()
+        store.mark_dirty(100)
+        with patch("utils.file_utils.atomic_write_json") as mock_write:
+            store.flush_dirty()
+        path, data = mock_write.call_args[0]
+        assert path == "storage/channel_context.100.json"
+        assert data["message_count_since_update"] == 1
+
+    @patch("memory.channel_context.config")
+    def test_firestore_batch_write(self, mock_config):
+        """Firestoreへは1回のバッチコミットで書き込まれること"""
+        mock_config.STORAGE_TYPE = "firestore"
+        mock_config.FIRESTORE_COLLECTION_CHANNEL_CONTEXTS = "channel_contexts"
+        store = ChannelContextStore()
+        for cid in (1, 2, 3):
+            store.save_context(ChannelContext(channel_id=cid))
+        mock_db = MagicMock()
+        with patch("utils.firestore_client.get_firestore_client", return_value=mock_db):
+            assert store.flush_dirty() == 3
+        mock_db.batch.assert_called_once()
+        batch = mock_db.batch.return_value
+        assert batch.set.call_count == 3
+        batch.commit.assert_called_once()
+
+    @patch("memory.channel_context.config")
+    def test_firestore_batch_failure_keeps_dirty(self, mock_config):
+        """バッチコミット失敗時にチャンネルが未保存のまま残ること"""
+        mock_config.STORAGE_TYPE = "firestore"
+        store = ChannelContextStore()
+        store.save_context(ChannelContext(channel_id=1))
+        mock_db = MagicMock()
+        mock_db.batch.return_value.commit.side_effect = Exception("unavailable")
+        with patch("utils.firestore_client.get_firestore_client", return_value=mock_db):
+            assert store.flush_dirty() == 0
+        assert store.has_pending_writes() is True
+
+    @patch("memory.channel_context.config")
+    @patch("utils.firestore_client.FIRESTORE_BATCH_LIMIT", 2)
+    def test_firestore_batch_is_chunked(self, mock_config):
+        """バッチ上限を超える件数は複数バッチに分割されること"""
+        mock_config.STORAGE_TYPE = "firestore"
+        store = ChannelContextStore()
+        for cid in range(5):
+            store.save_context(ChannelContext(channel_id=cid))
+        mock_db = MagicMock()
+        with patch("utils.firestore_client.get_firestore_client", return_value=mock_db):
+            assert store.flush_dirty() == 5
+        assert mock_db.batch.call_count == 3
+
+
 class TestGetChannelContextStore:
     """get_channel_context_storeシングルトンのテスト"""
 
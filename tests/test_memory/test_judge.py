@@ -11,11 +11,7 @@ import pytest
 from memory.judge import (
     JudgeResult,
     RuleBasedJudge,
-    _count_unique_authors,
-    _detect_conversation_decay,
-    _has_bot_mention_in_recent,
-    _is_first_after_silence,
-    _is_high_frequency,
+    _ChannelFeatures,
 )
 from memory.short_term import ChannelMessage
 
@@ -642,12 +638,19 @@ class TestRuleBasedJudge:
         assert result2.should_react is True
 
 
-class TestHelperFunctions:
-    """ヘルパー関数のテスト"""
+def _features(messages: list[ChannelMessage]) -> _ChannelFeatures:
+    """messages の窓で特徴量を作る"""
+    features = _ChannelFeatures(RuleBasedJudge())
+    features.sync(messages)
+    return features
+
+
+class TestChannelFeatures:
+    """窓の特徴量のテスト"""
 
     def test_count_unique_authors_empty(self):
         """空リストは0人"""
-        assert _count_unique_authors([]) == 0
+        assert _features([]).unique_authors() == 0
 
     def test_count_unique_authors_excludes_bot(self):
         """Bot著者は除外"""
@@ -656,7 +659,7 @@ class TestHelperFunctions:
             _make_message(author_id=2, is_bot=True),
             _make_message(author_id=3, is_bot=False),
         ]
-        assert _count_unique_authors(messages) == 2
+        assert _features(messages).unique_authors() == 2
 
     def test_count_unique_authors_deduplicates(self):
         """同一著者は1回だけカウント"""
@@ -665,51 +668,54 @@ class TestHelperFunctions:
             _make_message(author_id=1, is_bot=False),
             _make_message(author_id=2, is_bot=False),
         ]
-        assert _count_unique_authors(messages) == 2
+        assert _features(messages).unique_authors() == 2
 
     @patch("memory.judge.config")
     def test_has_bot_mention_true(self, mock_config):
         """BOT_NAMEを含むメッセージがあればTrue"""
         mock_config.BOT_NAME = "テストボット"
+        mock_config.JUDGE_KEYWORDS = ""
         messages = [
             _make_message(content="テストボット こんにちは"),
         ]
-        assert _has_bot_mention_in_recent(messages) is True
+        assert _features(messages).has_bot_mention() is True
 
     @patch("memory.judge.config")
     def test_has_bot_mention_false(self, mock_config):
         """BOT_NAMEを含まなければFalse"""
         mock_config.BOT_NAME = "テストボット"
+        mock_config.JUDGE_KEYWORDS = ""
         messages = [
             _make_message(content="こんにちは"),
         ]
-        assert _has_bot_mention_in_recent(messages) is False
+        assert _features(messages).has_bot_mention() is False
 
     @patch("memory.judge.config")
     def test_has_bot_mention_ignores_bot_messages(self, mock_config):
         """Botメッセージは無視"""
         mock_config.BOT_NAME = "テストボット"
+        mock_config.JUDGE_KEYWORDS = ""
         messages = [
             _make_message(content="テストボット です", is_bot=True),
         ]
-        assert _has_bot_mention_in_recent(messages) is False
+        assert _features(messages).has_bot_mention() is False
 
     def test_is_high_frequency_below_threshold(self):
         """10件未満はFalse"""
         messages = [_make_message(seconds_ago=i) for i in range(5)]
-        assert _is_high_frequency(messages) is False
+        assert _features(messages).is_high_frequency() is False
 
     def test_is_high_frequency_true(self):
         """10件が60秒以内ならTrue"""
         # 古い順に並べる（バッファと同じ順序）
         messages = [_make_message(seconds_ago=(9 - i) * 5) for i in range(10)]
-        assert _is_high_frequency(messages) is True
+        assert _features(messages).is_high_frequency() is True
 
     def test_is_high_frequency_false_spread_out(self):
         """10件が60秒超ならFalse"""
         # 古い順に並べる（バッファと同じ順序）
         messages = [_make_message(seconds_ago=(9 - i) * 10) for i in range(10)]
-        assert _is_high_frequency(messages) is False
+        assert _features(messages).is_high_frequency() is False
 
     def test_is_first_after_silence_true(self):
         """10分以上の間隔があればTrue"""
@@ -717,7 +723,7 @@ class TestHelperFunctions:
             _make_message(minutes_ago=15),
             _make_message(minutes_ago=0),
         ]
-        assert _is_first_after_silence(messages) is True
+        assert _features(messages).is_first_after_silence() is True
 
     def test_is_first_after_silence_false(self):
         """10分未満の間隔ならFalse"""
@@ -725,21 +731,21 @@ class TestHelperFunctions:
             _make_message(minutes_ago=5),
             _make_message(minutes_ago=0),
         ]
-        assert _is_first_after_silence(messages) is False
+        assert _features(messages).is_first_after_silence() is False
 
     def test_is_first_after_silence_too_few(self):
         """メッセージ1件以下はFalse"""
-        assert _is_first_after_silence([_make_message()]) is False
-        assert _is_first_after_silence([]) is False
+        assert _features([_make_message()]).is_first_after_silence() is False
+        assert _features([]).is_first_after_silence() is False
 
-    def test_detect_conversation_decay_no_decay(self):
+    def test_conversation_decay_no_decay(self):
         """減衰なしは0"""
         messages = [
             _make_message(content="a" * 50) for _ in range(6)
         ]
-        assert _detect_conversation_decay(messages) == 0
+        assert _features(messages).conversation_decay() == 0
 
-    def test_detect_conversation_decay_moderate(self):
+    def test_conversation_decay_moderate(self):
         """文字数が50-70%に低下で-10"""
         messages = [
             _make_message(content="a" * 100),
@@ -749,9 +755,9 @@ class TestHelperFunctions:
             _make_message(content="a" * 60),
             _make_message(content="a" * 60),
         ]
-        assert _detect_conversation_decay(messages) == -10
+        assert _features(messages).conversation_decay() == -10
 
-    def test_detect_conversation_decay_severe(self):
+    def test_conversation_decay_severe(self):
         """文字数が50%以下に低下で-15"""
         messages = [
             _make_message(content="a" * 100),
@@ -761,9 +767,97 @@ class TestHelperFunctions:
             _make_message(content="a" * 30),
             _make_message(content="a" * 30),
         ]
-        assert _detect_conversation_decay(messages) == -15
+        assert _features(messages).conversation_decay() == -15
 
-    def test_detect_conversation_decay_too_few(self):
+    def test_conversation_decay_too_few(self):
         """メッセージ数不足は0"""
         messages = [_make_message() for _ in range(3)]
-        assert _detect_conversation_decay(messages) == 0
+        assert _features(messages).conversation_decay() == 0
+
+
+class TestIncrementalFeatures:
+    """evaluate 間で差分更新される特徴量のテスト"""
+
+    @patch("memory.judge.config")
+    def test_incremental_matches_full_recompute(self, mock_config):
+        """バッファの窓が進んでも、毎回作り直した場合と同じ判定になること"""
+        import random
+
+        from memory.short_term import ChannelMessageBuffer
+
+        mock_config.JUDGE_KEYWORDS = "零式,絶"
+        mock_config.COOLDOWN_SECONDS = 120
+        mock_config.ENGAGEMENT_DURATION_SECONDS = 300
+        mock_config.ENGAGEMENT_BOOST = 0
+        mock_config.JUDGE_SCORE_THRESHOLD = 20
+        mock_config.JUDGE_SCORE_FULL_RESPONSE = 60
+        mock_config.JUDGE_SCORE_SHORT_ACK = 30
+        mock_config.VANGUARD_ENABLED = False
+        mock_config.BOT_NAME = "スフェーン"
+        mock_config.JUDGE_REACT_THRESHOLD = 5
+
+        rng = random.Random(0)
+        buffer = ChannelMessageBuffer(max_size=50, ttl_minutes=30)
+        judge = RuleBasedJudge()
+        contents = ["零式いく？", "スフェーンおはよ", "w", "今日は絶の練習", "a" * 40, "了解"]
+        ts = datetime.now(timezone.utc) - timedelta(minutes=25)
+        for i in range(120):
+            ts += timedelta(seconds=rng.choice([1, 5, 30, 700]) / 10)
+            msg = ChannelMessage(
+                message_id=i,
+                channel_id=100,
+                author_id=rng.randint(1, 4),
+                author_name="U",
+                content=rng.choice(contents),
+                timestamp=ts,
+                is_bot=rng.random() < 0.2,
+            )
+            buffer.add_message(msg)
+            recent = buffer.get_recent_messages(100, limit=20)
+            incremental = judge.evaluate(msg, recent)
+            fresh = RuleBasedJudge().evaluate(msg, list(recent))
+            assert (incremental.score, incremental.reason) == (fresh.score, fresh.reason)
+
+    @patch("memory.judge.config")
+    def test_unrelated_window_rebuilds(self, mock_config):
+        """前回と繋がらない窓が来た場合は作り直すこと"""
+        mock_config.JUDGE_KEYWORDS = ""
+        mock_config.BOT_NAME = "スフェーン"
+        judge = RuleBasedJudge()
+        first = [_make_message(author_id=i) for i in range(3)]
+        second = [_make_message(author_id=1), _make_message(author_id=2)]
+
+        assert judge._sync_features(100, first).unique_authors() == 3
+        assert judge._sync_features(100, second).unique_authors() == 2
+
+    def test_features_bounded_by_channel_count(self):
+        """特徴量を保持するチャンネル数が上限を超えないこと"""
+        with patch("memory.judge._FEATURES_MAX_CHANNELS", 2):
+            judge = RuleBasedJudge()
+        for channel_id in range(5):
+            judge._sync_features(channel_id, [_make_message(channel_id=channel_id)])
+        assert list(judge._features) == [3, 4]
+
+    @patch("memory.judge.config")
+    def test_pattern_hits_cached_on_message(self, mock_config):
+        """キーワード・ボット名の検出結果がメッセージにキャッシュされること"""
+        mock_config.JUDGE_KEYWORDS = "零式"
+        mock_config.BOT_NAME = "スフェーン"
+        judge = RuleBasedJudge()
+        msg = _make_message(content="スフェーン、零式いく？")
+
+        assert judge.pattern_hits(msg) == {"スフェーン", "零式"}
+        with patch("memory.judge.AhoCorasick.search") as mock_search:
+            assert judge.pattern_hits(msg) == {"スフェーン", "零式"}
+        mock_search.assert_not_called()
+
+    @patch("memory.judge.config")
+    def test_pattern_hits_recomputed_for_other_matcher(self, mock_config):
+        """別のキーワード設定の Judge ではキャッシュを使わず再計算すること"""
+        mock_config.BOT_NAME = "スフェーン"
+        mock_config.JUDGE_KEYWORDS = "零式"
+        msg = _make_message(content="零式と絶の練習")
+        assert RuleBasedJudge().pattern_hits(msg) == {"零式"}
+
+        mock_config.JUDGE_KEYWORDS = "絶"
+        assert RuleBasedJudge().pattern_hits(msg) == {"絶"}
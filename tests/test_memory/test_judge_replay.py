@@ -0,0 +1,94 @@
+"""Judge リプレイのテスト"""
+
+# type: ignore
+# mypy: ignore-errors
+
+import json
+
+import pytest
+
+import config
+from memory.judge_replay import (
+    config_overrides,
+    load_log,
+    parse_override,
+    replay,
+    synthetic_log,
+)
+
+
+class TestJudgeReplay:
+    """replay と周辺関数のテスト"""
+
+    def test_replay_is_deterministic(self):
+        """同じログ・シードなら実時間に依らず同じ集計になること"""
+        first = replay(synthetic_log(300), llm_accept_rate=0.5).to_dict()
+        second = replay(synthetic_log(300), llm_accept_rate=0.5).to_dict()
+        first.pop("messages_per_second")
+        second.pop("messages_per_second")
+        assert first == second
+        assert first["messages"] == 300
+        assert sum(first["decisions"].values()) == 300
+
+    def test_synthetic_log_names_match_authors(self):
+        """合成ログの発言者名が author_id と対応すること"""
+        assert all(m.author_name == f"user{m.author_id}" for m in synthetic_log(100))
+
+    def test_thresholds_change_llm_call_rate(self):
+        """LLM 判定の帯域を狭めると呼び出し回数が減ること"""
+        messages = synthetic_log(500)
+        with config_overrides({"VANGUARD_ENABLED": True}):
+            wide = replay(messages)
+            with config_overrides({"JUDGE_LLM_THRESHOLD_LOW": 59}):
+                narrow = replay(messages)
+        assert narrow.llm_calls < wide.llm_calls
+
+    def test_config_overrides_restored(self):
+        """上書きした値は終了後に元に戻り、未定義の名前は拒否されること"""
+        original = config.JUDGE_SCORE_THRESHOLD
+        with config_overrides({"JUDGE_SCORE_THRESHOLD": original + 1}):
+            assert config.JUDGE_SCORE_THRESHOLD == original + 1
+        assert config.JUDGE_SCORE_THRESHOLD == original
+        with pytest.raises(ValueError):
+            with config_overrides({"NO_SUCH_SETTING": 1}):
+                pass
+
+    def test_parse_override_uses_config_types(self):
+        """現在の設定値の型に合わせて変換されること"""
+        assert parse_override("JUDGE_SCORE_THRESHOLD=35") == ("JUDGE_SCORE_THRESHOLD", 35)
+        assert parse_override("VANGUARD_ENABLED=false") == ("VANGUARD_ENABLED", False)
+        with pytest.raises(ValueError):
+            parse_override("JUDGE_SCORE_THRESHOLD")
+
+    def test_load_log_sorts_by_timestamp(self, tmp_path):
+        """ISO 文字列・エポック秒の混在したログを時刻順に読み込むこと"""
+        path = tmp_path / "log.jsonl"
+        rows = [
+            {"channel_id": 1, "author_id": 2, "content": "後", "timestamp": 1735689660.0},
+            {"channel_id": 1, "author_id": 3, "content": "先", "timestamp": "2025-01-01T00:00:00+00:00"},
+        ]
+        path.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in rows) + "\n")
+        messages = load_log(str(path))
+        assert [m.content for m in messages] == ["先", "後"]
+        assert messages[0].author_name == "3"
+
+    def test_debounce_coalesces_bursts(self):
+        """静穏期間を設けると連投が debounced になり LLM 呼び出しが減ること"""
+        messages = synthetic_log(500)
+        with config_overrides({"VANGUARD_ENABLED": True}):
+            baseline = replay(messages)
+            with config_overrides({"JUDGE_DEBOUNCE_SECONDS": 15.0}):
+                debounced = replay(messages)
+        assert debounced.decisions["debounced"] > 0
+        assert debounced.llm_calls < baseline.llm_calls
+
+    def test_decision_cache_avoids_llm_calls(self):
+        """判定キャッシュを有効にすると同じ状況の呼び出しがヒットとして数えられること"""
+        messages = synthetic_log(2000, channels=1)
+        with config_overrides({"VANGUARD_ENABLED": True, "JUDGE_CACHE_CONTEXT_LINES": 1}):
+            baseline = replay(messages)
+            with config_overrides({"JUDGE_CACHE_ENABLED": True}):
+                cached = replay(messages)
+        assert baseline.llm_cache_hits == 0
+        assert cached.llm_cache_hits > 0
+        assert 0 < cached.to_dict()["llm_cache_hit_rate"] < 1
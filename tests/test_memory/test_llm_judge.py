@@ -3,6 +3,7 @@
 # type: ignore
 # mypy: ignore-errors
 
+import asyncio
 import json
 from unittest.mock import MagicMock, patch
 
@@ -355,3 +356,246 @@ class TestLLMJudge:
         assert isinstance(result[1], str)
         assert isinstance(result[2], bool)
         assert isinstance(result[3], list)
+
+
+class TestLLMJudgeBatch:
+    """複数チャンネルの判定依頼のバッチ化のテスト"""
+
+    @pytest.fixture(autouse=True)
+    def batch_config(self):
+        with patch("memory.llm_judge.config.JUDGE_BATCH_ENABLED", True), \
+             patch("memory.llm_judge.config.JUDGE_BATCH_WINDOW_MS", 20), \
+             patch("memory.llm_judge.config.JUDGE_BATCH_MAX_ITEMS", 8):
+            yield
+
+    @pytest.mark.asyncio
+    @patch("memory.llm_judge.get_lite_model_name", return_value="gemini-2.5-flash")
+    @patch("memory.llm_judge._get_genai_client")
+    async def test_concurrent_evaluations_share_one_call(self, mock_get_client, _):
+        """集約期間内の依頼が1回の呼び出しにまとまり、依頼IDごとに結果が返ること"""
+        mock_response = MagicMock()
+        mock_response.text = json.dumps({"decisions": [
+            {"id": "2:20", "respond": False, "response_type": "none"},
+            {"id": "1:10", "respond": True, "response_type": "short", "react": True, "emojis": ["👍"]},
+        ]})
+        generate = mock_get_client.return_value.models.generate_content
+        generate.return_value = mock_response
+
+        judge = LLMJudge()
+        results = await asyncio.gather(
+            judge.evaluate("それな", "A: 零式行く?", "スフェーン", channel_id=1, message_id=10),
+            judge.evaluate("おやすみ", "B: 眠い", "スフェーン", channel_id=2, message_id=20),
+            judge.evaluate("了解", "C: 明日ね", "スフェーン", channel_id=3, message_id=30),
+        )
+
+        assert generate.call_count == 1
+        prompt = generate.call_args.kwargs["contents"][0].parts[0].text
+        assert '<request id="1:10">' in prompt and '<request id="3:30">' in prompt
+        assert results[0] == (True, "short_ack", True, ["👍"])
+        assert results[1] == (False, "none", False, [])
+        # 結果が欠落した依頼は応答しない
+        assert results[2] == (False, "none", False, [])
+        assert judge.stats()["requests"] == 1
+        assert judge.stats()["decisions"] == 3
+
+    @pytest.mark.asyncio
+    @patch("memory.llm_judge.get_lite_model_name", return_value="gemini-2.5-flash")
+    @patch("memory.llm_judge._get_genai_client")
+    async def test_single_evaluation_uses_single_prompt(self, mock_get_client, _):
+        """集約期間内に1件しか来なければ単独の判定プロンプトで呼ぶこと"""
+        mock_response = MagicMock()
+        mock_response.text = json.dumps({"respond": True, "response_type": "full"})
+        generate = mock_get_client.return_value.models.generate_content
+        generate.return_value = mock_response
+
+        judge = LLMJudge()
+        result = await judge.evaluate("教えて", "A: Python", "スフェーン", channel_id=1, message_id=10)
+
+        assert result[:2] == (True, "full_response")
+        prompt = generate.call_args.kwargs["contents"][0].parts[0].text
+        assert "<request id=" not in prompt
+
+    @pytest.mark.asyncio
+    @patch("memory.llm_judge.get_lite_model_name", return_value="gemini-2.5-flash")
+    @patch("memory.llm_judge._get_genai_client")
+    async def test_max_items_flushes_without_waiting(self, mock_get_client, _):
+        """最大件数に達したら集約期間を待たずに送信すること"""
+        mock_response = MagicMock()
+        mock_response.text = json.dumps([
+            {"id": "1:1", "respond": True, "response_type": "full"},
+            {"id": "2:2", "respond": True, "response_type": "react"},
+        ])
+        mock_get_client.return_value.models.generate_content.return_value = mock_response
+
+        judge = LLMJudge()
+        with patch("memory.llm_judge.config.JUDGE_BATCH_MAX_ITEMS", 2), \
+             patch("memory.llm_judge.config.JUDGE_BATCH_WINDOW_MS", 60_000):
+            results = await asyncio.wait_for(
+                asyncio.gather(
+                    judge.evaluate("a", "", "スフェーン", channel_id=1, message_id=1),
+                    judge.evaluate("b", "", "スフェーン", channel_id=2, message_id=2),
+                ),
+                timeout=5,
+            )
+
+        assert [r[1] for r in results] == ["full_response", "react_only"]
+        assert judge._flush_task is None
+
+    @pytest.mark.asyncio
+    async def test_batch_tasks_referenced_until_done(self):
+        """送信中のバッチタスクは完了まで参照が保持され、完了後に取り除かれること"""
+        judge = LLMJudge()
+        release = asyncio.Event()
+
+        async def slow_batch(batch):
+            await release.wait()
+            for item in batch:
+                item.future.set_result(None)
+
+        with patch.object(judge, "_run_batch", side_effect=slow_batch), \
+             patch("memory.llm_judge.config.JUDGE_BATCH_MAX_ITEMS", 2):
+            pending = asyncio.gather(
+                judge.evaluate("a", "", "スフェーン", channel_id=1, message_id=1),
+                judge.evaluate("b", "", "スフェーン", channel_id=2, message_id=2),
+            )
+            await asyncio.sleep(0.01)
+            assert len(judge._batch_tasks) == 1
+            release.set()
+            await pending
+        await asyncio.sleep(0)
+        assert not judge._batch_tasks
+
+    @pytest.mark.asyncio
+    @patch("memory.llm_judge.get_lite_model_name", return_value="gemini-2.5-flash")
+    @patch("memory.llm_judge._get_genai_client")
+    async def test_batch_api_error_returns_false_for_all(self, mock_get_client, _):
+        """バッチ呼び出しが失敗したら全依頼が応答しない判定になること"""
+        judge = LLMJudge()
+        with patch("memory.llm_judge._generate_content_with_retry", side_effect=Exception("API Error")):
+            results = await asyncio.gather(
+                judge.evaluate("a", "", "スフェーン", channel_id=1, message_id=1),
+                judge.evaluate("b", "", "スフェーン", channel_id=2, message_id=2),
+            )
+
+        assert all(r[0] is False for r in results)
+
+
+class TestLLMJudgeDecisionCache:
+    """LLM Judge の判定キャッシュのテスト"""
+
+    @pytest.fixture(autouse=True)
+    def cache_config(self):
+        with patch("memory.llm_judge.config.JUDGE_CACHE_ENABLED", True), \
+             patch("memory.llm_judge.config.JUDGE_CACHE_TTL_SECONDS", 60), \
+             patch("memory.llm_judge.config.JUDGE_BATCH_ENABLED", False):
+            yield
+
+    @pytest.fixture
+    def generate(self):
+        mock_response = MagicMock()
+        mock_response.text = json.dumps({
+            "respond": False, "response_type": "none", "react": True, "emojis": ["☀"]
+        })
+        with patch("memory.llm_judge.get_lite_model_name", return_value="gemini-2.5-flash"), \
+             patch("memory.llm_judge._get_genai_client") as mock_get_client:
+            generate = mock_get_client.return_value.models.generate_content
+            generate.return_value = mock_response
+            yield generate
+
+    @pytest.mark.asyncio
+    async def test_near_identical_situation_hits_cache(self, generate):
+        """発言者や表記の揺れだけが違う状況ではLLMを呼ばずに同じ判定を返すこと"""
+        judge = LLMJudge()
+        first = await judge.evaluate(
+            "おはよう", "A: おはよう\nB: おはよう", "スフェーン", channel_id=1, message_id=1
+        )
+        second = await judge.evaluate(
+            "おはよう！", "C: おはよう\nD: おはよう！", "スフェーン", channel_id=1, message_id=2
+        )
+
+        assert generate.call_count == 1
+        assert second == first == (False, "none", True, ["☀"])
+        assert judge.stats()["cache_hits"] == 1
+        assert judge.stats()["cache_hit_rate"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_failed_call_is_not_cached(self, generate):
+        """LLM呼び出しに失敗した判定はキャッシュせず、次の同じ状況で再びLLMを呼ぶこと"""
+        judge = LLMJudge()
+        with patch("memory.llm_judge._generate_content_with_retry", side_effect=Exception("429")):
+            failed = await judge.evaluate(
+                "おはよう", "A: おはよう", "スフェーン", channel_id=1, message_id=1
+            )
+        assert failed == (False, "none", False, [])
+
+        second = await judge.evaluate(
+            "おはよう", "A: おはよう", "スフェーン", channel_id=1, message_id=2
+        )
+        assert generate.call_count == 1
+        assert second == (False, "none", True, ["☀"])
+        assert judge.stats()["cache_hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_missing_batch_result_is_not_cached(self, generate):
+        """バッチ結果が欠落した依頼はキャッシュしないこと"""
+        generate.return_value.text = json.dumps({"decisions": [
+            {"id": "1:1", "respond": True, "response_type": "full"},
+        ]})
+        judge = LLMJudge()
+        with patch("memory.llm_judge.config.JUDGE_BATCH_ENABLED", True), \
+             patch("memory.llm_judge.config.JUDGE_BATCH_WINDOW_MS", 20), \
+             patch("memory.llm_judge.config.JUDGE_BATCH_MAX_ITEMS", 8):
+            results = await asyncio.gather(
+                judge.evaluate("a", "A: x", "スフェーン", channel_id=1, message_id=1),
+                judge.evaluate("b", "B: y", "スフェーン", channel_id=2, message_id=2),
+            )
+        assert results[1] == (False, "none", False, [])
+        assert judge._cache.get(1, "a", "A: x") is not None
+        assert judge._cache.get(2, "b", "B: y") is None
+
+    @pytest.mark.asyncio
+    async def test_cache_is_isolated_per_channel(self, generate):
+        """別チャンネルの判定は使い回さないこと"""
+        judge = LLMJudge()
+        await judge.evaluate("おはよう", "A: おはよう", "スフェーン", channel_id=1, message_id=1)
+        await judge.evaluate("おはよう", "A: おはよう", "スフェーン", channel_id=2, message_id=2)
+
+        assert generate.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_different_message_or_context_misses(self, generate):
+        """最新メッセージや会話の流れが違えばLLMを呼ぶこと"""
+        judge = LLMJudge()
+        await judge.evaluate("おはよう", "A: おはよう", "スフェーン", channel_id=1, message_id=1)
+        await judge.evaluate("おやすみ", "A: おやすみ", "スフェーン", channel_id=1, message_id=2)
+        await judge.evaluate(
+            "おはよう",
+            "A: 今日の零式どうする？\nB: ギミック難しすぎて全然クリアできなかった\nC: おはよう",
+            "スフェーン",
+            channel_id=1,
+            message_id=3,
+        )
+
+        assert generate.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_entries_expire_after_ttl(self, generate):
+        """TTL を過ぎた判定は使わないこと"""
+        now = [0.0]
+        judge = LLMJudge(clock=lambda: now[0])
+        await judge.evaluate("おはよう", "A: おはよう", "スフェーン", channel_id=1, message_id=1)
+        now[0] = 61.0
+        await judge.evaluate("おはよう", "A: おはよう", "スフェーン", channel_id=1, message_id=2)
+
+        assert generate.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_disabled_cache_always_calls_llm(self, generate):
+        """JUDGE_CACHE_ENABLED=false ならキャッシュを引かないこと"""
+        judge = LLMJudge()
+        with patch("memory.llm_judge.config.JUDGE_CACHE_ENABLED", False):
+            await judge.evaluate("おはよう", "A: おはよう", "スフェーン", channel_id=1, message_id=1)
+            await judge.evaluate("おはよう", "A: おはよう", "スフェーン", channel_id=1, message_id=2)
+
+        assert generate.call_count == 2
+        assert judge.stats()["cache_hits"] == judge.stats()["cache_misses"] == 0
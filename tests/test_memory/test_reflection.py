@@ -1,12 +1,12 @@
 """反省会エンジンのテスト"""
 
 import asyncio
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from memory.reflection import ReflectionEngine, get_reflection_engine
+from memory.reflection import ReflectionEngine, _substantive_length, get_reflection_engine
 from memory.short_term import ChannelMessage
 
 
@@ -16,6 +16,7 @@ def _make_message(
     author_id: int = 12345,
     content: str = "テストメッセージ",
     is_bot: bool = False,
+    timestamp: datetime | None = None,
 ) -> ChannelMessage:
     """テスト用ChannelMessageファクトリ"""
     return ChannelMessage(
@@ -24,7 +25,7 @@ def _make_message(
         author_id=author_id,
         author_name=author_name,
         content=content,
-        timestamp=datetime.now(timezone.utc),
+        timestamp=timestamp or datetime.now(timezone.utc),
         is_bot=is_bot,
     )
 
@@ -347,7 +348,7 @@ class TestUserProfileTags:
     def test_call_user_profile_llm_parses_and_updates(self):
         """_call_user_profile_llm が正常にパースし update_from_reflection を呼ぶこと"""
         engine = ReflectionEngine()
-        messages = [_make_message(author_id=12345)]
+        messages = [_make_message(author_id=12345, content="最近Pythonでボットを作っていて、東京から参加しています")]
 
         mock_response = MagicMock()
         mock_response.text = '[{"user_id": 12345, "tags": ["プログラマー"], "notable_facts": ["東京在住"], "personality_notes": "明るい", "last_conversation_summary": "テスト", "preferred_tone": null, "emotional_state_last": "楽しそう", "nickname": "ポチ"}]'
@@ -370,7 +371,7 @@ class TestUserProfileTags:
             "emotional_state_last": "楽しそう",
             "nickname": "ポチ",
         })
-        mock_store.persist_all.assert_called_once()
+        mock_store.persist_dirty.assert_called_once()
 
     def test_call_user_profile_llm_handles_invalid_json(self):
         """不正なJSONの場合、例外を発生させず警告ログを出すこと"""
@@ -394,3 +395,109 @@ class TestUserProfileTags:
             with patch("memory.reflection._generate_content_with_retry") as mock_api:
                 engine._call_user_profile_llm([])
                 mock_api.assert_not_called()
+
+
+class TestUserProfileReflectionFilter:
+    """プロファイル反省会の対象ユーザー絞り込みのテスト"""
+
+    LONG = "週末は零式の練習をしていて、来週クリアを目指しています"
+
+    @staticmethod
+    def _response(user_ids):
+        mock_response = MagicMock()
+        mock_response.text = "[" + ",".join(
+            f'{{"user_id": {uid}, "tags": ["t"]}}' for uid in user_ids
+        ) + "]"
+        return mock_response
+
+    def _run(self, engine, messages, response):
+        mock_store = MagicMock()
+        with patch("memory.reflection.get_genai_client"), \
+             patch("memory.reflection._generate_content_with_retry", return_value=response) as mock_api, \
+             patch("memory.reflection.get_model_name", return_value="test-model"), \
+             patch("memory.user_profile.get_user_profile_store", return_value=mock_store), \
+             patch("config.REFLECTION_PROFILE_MIN_CHARS", 20):
+            engine._call_user_profile_llm(messages)
+        return mock_api, mock_store
+
+    def test_substantive_length_ignores_emoji_mentions_urls(self):
+        """絵文字・メンション・URL・記号が文字数に数えられないこと"""
+        assert _substantive_length("<:pepe:1234> <@5678> https://example.com 👍！！") == 0
+        assert _substantive_length("零式 クリア!") == 5
+
+    def test_lurkers_and_bots_not_sent(self):
+        """発言の少ないユーザーとボットのメッセージが送られないこと"""
+        engine = ReflectionEngine()
+        messages = [
+            _make_message(author_id=1, author_name="Talker", content=self.LONG),
+            _make_message(author_id=2, author_name="Lurker", content="👍"),
+            _make_message(author_id=3, author_name="Bot", content=self.LONG, is_bot=True),
+        ]
+        mock_api, mock_store = self._run(engine, messages, self._response([1, 2]))
+
+        prompt = mock_api.call_args.kwargs["contents"][0].parts[0].text
+        assert 'id="1"' in prompt
+        assert 'id="2"' not in prompt
+        assert 'id="3"' not in prompt
+        mock_store.update_from_reflection.assert_called_once()
+        assert mock_store.update_from_reflection.call_args.args[0] == 1
+        stats = engine.profile_reflection_stats()
+        assert stats["users_sent"] == 1
+        assert stats["users_skipped"] == 1
+        assert stats["tokens_skipped"] > 0
+
+    def test_watermark_skips_already_reflected_messages(self):
+        """反映済みの発言は再送されず、新しい発言が十分なら再び対象になること"""
+        engine = ReflectionEngine()
+        t0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        first = [_make_message(author_id=1, content=self.LONG, timestamp=t0)]
+        self._run(engine, first, self._response([1]))
+
+        mock_api, _ = self._run(engine, first, self._response([1]))
+        mock_api.assert_not_called()
+        assert engine.profile_reflection_stats()["calls_skipped"] == 1
+
+        later = first + [
+            _make_message(author_id=1, content=self.LONG, timestamp=t0 + timedelta(minutes=5))
+        ]
+        mock_api, _ = self._run(engine, later, self._response([1]))
+        prompt = mock_api.call_args.kwargs["contents"][0].parts[0].text
+        assert prompt.count(self.LONG) == 1
+
+    def test_watermark_is_per_channel(self):
+        """別チャンネルでの反映後も、そのチャンネルの同じ時刻以前の発言は送られること"""
+        engine = ReflectionEngine()
+        t0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        channel_a = [
+            _make_message(channel_id=100, author_id=1, content=self.LONG,
+                          timestamp=t0 + timedelta(minutes=5))
+        ]
+        self._run(engine, channel_a, self._response([1]))
+
+        channel_b = [_make_message(channel_id=200, author_id=1, content=self.LONG, timestamp=t0)]
+        mock_api, mock_store = self._run(engine, channel_b, self._response([1]))
+        mock_api.assert_called_once()
+        mock_store.update_from_reflection.assert_called_once()
+
+    def test_stale_watermarks_pruned(self):
+        """バッファのTTLより古いウォーターマークが削除されること"""
+        engine = ReflectionEngine()
+        t0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        old = [_make_message(channel_id=100, author_id=1, content=self.LONG, timestamp=t0)]
+        self._run(engine, old, self._response([1]))
+        new = [
+            _make_message(channel_id=200, author_id=2, content=self.LONG,
+                          timestamp=t0 + timedelta(days=1))
+        ]
+        self._run(engine, new, self._response([2]))
+        assert list(engine._profile_watermarks) == [(200, 2)]
+
+    def test_watermark_not_advanced_on_failure(self):
+        """LLM呼び出しに失敗した場合は次回も対象に残ること"""
+        engine = ReflectionEngine()
+        messages = [_make_message(author_id=1, content=self.LONG)]
+        bad = MagicMock()
+        bad.text = "invalid json"
+        self._run(engine, messages, bad)
+        mock_api, _ = self._run(engine, messages, self._response([1]))
+        mock_api.assert_called_once()
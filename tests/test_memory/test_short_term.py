@@ -4,6 +4,7 @@
 # mypy: ignore-errors
 
 from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
 
 import pytest
 
@@ -214,6 +215,23 @@ class TestChannelMessageBuffer:
         assert last is not None
         assert last.tzinfo is not None
 
+    def test_get_context_string_reuses_rendered_window(self):
+        """同じ範囲は再利用され、追加・期限切れで範囲が変われば作り直されること"""
+        buf = ChannelMessageBuffer(max_size=10, ttl_minutes=30)
+        buf.add_message(_make_message(content="old", minutes_ago=29, message_id=1))
+        buf.add_message(_make_message(author_name="Bot", content="hi", message_id=2, is_bot=True))
+
+        first = buf.get_context_string(100, limit=10)
+        assert first == "TestUser: old\nBot[BOT]: hi"
+        assert buf.get_context_string(100, limit=10) is first
+        assert buf.get_context_string(100, limit=1) == "Bot[BOT]: hi"
+
+        buf.add_message(_make_message(content="new", message_id=3))
+        assert buf.get_context_string(100, limit=10).endswith("Bot[BOT]: hi\nTestUser: new")
+
+        buf._ttl_minutes = 10
+        assert buf.get_context_string(100, limit=10) == "Bot[BOT]: hi\nTestUser: new"
+
     def test_count_messages_since_reflection_all_when_not_marked(self):
         """mark_reflected が呼ばれていない場合、全件数を返すこと"""
         buf = ChannelMessageBuffer(max_size=10, ttl_minutes=30)
@@ -252,3 +270,162 @@ class TestChannelMessageBuffer:
         buf.mark_reflected(100)
         # 2回目の mark_reflected 後は新規メッセージなし
         assert buf.count_messages_since_reflection(100) == 0
+
+    def test_has_channel(self):
+        """バッファの存在有無を返すこと"""
+        buf = ChannelMessageBuffer(max_size=10, ttl_minutes=30)
+        assert buf.has_channel(100) is False
+        buf.add_message(_make_message())
+        assert buf.has_channel(100) is True
+
+    def test_get_author_ids(self):
+        """ボット以外の発言者IDを重複なく返すこと"""
+        buf = ChannelMessageBuffer(max_size=10, ttl_minutes=30)
+        buf.add_message(_make_message(message_id=1))
+        buf.add_message(_make_message(message_id=2))
+        buf.add_message(_make_message(message_id=3, is_bot=True, channel_id=200))
+        other = _make_message(message_id=4, channel_id=200)
+        other.author_id = 999
+        buf.add_message(other)
+        assert buf.get_author_ids(100) == [12345]
+        assert buf.get_author_ids(200) == [999]
+        assert buf.get_author_ids() == [12345, 999]
+        assert buf.get_author_ids(300) == []
+
+    def test_out_of_order_message_inserted_by_timestamp(self):
+        """遅れて届いたメッセージも時刻順に並び、TTL 境界が正しく求まること"""
+        buf = ChannelMessageBuffer(max_size=10, ttl_minutes=30)
+        buf.add_message(_make_message(content="new", minutes_ago=1, message_id=1))
+        buf.add_message(_make_message(content="expired", minutes_ago=60, message_id=2))
+        buf.add_message(_make_message(content="old", minutes_ago=5, message_id=3))
+
+        assert [m.content for m in buf.get_recent_messages(100)] == ["old", "new"]
+        assert buf.get_last_message_time(100) > datetime.now(timezone.utc) - timedelta(minutes=2)
+        assert buf.cleanup_expired() == 1
+
+    def test_ring_buffer_survives_compaction(self):
+        """先頭の詰め直しを何度跨いでも最新 max_size 件が時刻順に残ること"""
+        buf = ChannelMessageBuffer(max_size=3, ttl_minutes=30)
+        for i in range(20):
+            buf.add_message(_make_message(content=f"msg{i}", minutes_ago=20 - i, message_id=i))
+
+        assert [m.content for m in buf.get_recent_messages(100)] == ["msg17", "msg18", "msg19"]
+        assert buf.get_recent_messages(100, limit=2)[0].content == "msg18"
+        assert buf.count_messages_since_reflection(100) == 3
+
+
+class TestChannelMessageBufferBudget:
+    """全体メッセージ数上限と統計のテスト"""
+
+    def test_evicts_idle_channels_over_budget(self):
+        """上限を超えると最後の発言が最も古いチャンネルから解放されること"""
+        buf = ChannelMessageBuffer(max_size=10, ttl_minutes=30, max_total_messages=4)
+        buf.add_message(_make_message(channel_id=1))
+        buf.add_message(_make_message(channel_id=2))
+        buf.add_message(_make_message(channel_id=1))
+        buf.add_message(_make_message(channel_id=3))
+        buf.mark_reflected(2)
+
+        buf.add_message(_make_message(channel_id=3))
+
+        assert buf.get_active_channel_ids() == [1, 3]
+        assert buf.stats()["messages"] == 4
+        assert buf.stats()["evicted_channels"] == 1
+        # 反省会のチェックポイントは残る
+        assert 2 in buf._last_reflected
+
+    def test_active_channel_is_never_evicted(self):
+        """追加先のチャンネル自身は解放されないこと"""
+        buf = ChannelMessageBuffer(max_size=10, ttl_minutes=30, max_total_messages=2)
+        for i in range(5):
+            buf.add_message(_make_message(channel_id=1, message_id=i))
+        assert len(buf.get_recent_messages(1)) == 5
+
+    def test_stats_tracks_ring_overflow_and_expiry(self):
+        """リング溢れ・期限切れ削除後もメッセージ数が一致すること"""
+        buf = ChannelMessageBuffer(max_size=3, ttl_minutes=30)
+        for i in range(5):
+            buf.add_message(_make_message(channel_id=1, message_id=i))
+        buf.add_message(_make_message(channel_id=2, minutes_ago=60))
+        assert buf.stats()["messages"] == 4
+        assert buf.stats()["estimated_bytes"] > 0
+
+        buf.cleanup_expired()
+        stats = buf.stats()
+        assert stats["channels"] == 1
+        assert stats["messages"] == 3
+
+
+class TestChannelMessageBufferSnapshot:
+    """スナップショット保存・復元のテスト"""
+
+    @pytest.fixture(autouse=True)
+    def local_snapshot_dir(self, tmp_path):
+        with patch("config.STORAGE_TYPE", "local"), patch("config.SNAPSHOT_DIR", str(tmp_path)):
+            yield
+
+    def test_round_trip_applies_ttl_and_keeps_watermarks(self):
+        """TTL 内のメッセージとチェックポイントが順序を保って復元されること"""
+        buf = ChannelMessageBuffer(max_size=10, ttl_minutes=30)
+        buf.add_message(_make_message(channel_id=1, content="a", minutes_ago=20, message_id=1))
+        buf.add_message(_make_message(channel_id=2, content="b", minutes_ago=10, message_id=2))
+        buf.add_message(
+            ChannelMessage(3, 1, 99, "Bot", "c", datetime.now(timezone.utc), True, ["x.png"])
+        )
+        buf.mark_reflected(2)
+        assert buf.save_snapshot() == 3
+
+        restored = ChannelMessageBuffer(max_size=10, ttl_minutes=15)
+        assert restored.restore_snapshot() == 2
+        assert restored.get_active_channel_ids() == [2, 1]
+        assert restored.get_context_string(1) == "Bot[BOT]: c"
+        assert restored.get_recent_messages(1)[0].attachments == ("x.png",)
+        assert restored._last_reflected[2] == buf._last_reflected[2]
+
+    def test_merges_into_existing_channels(self):
+        """起動後に既にバッファを持つチャンネルには、無いメッセージだけが時刻順に合流すること"""
+        buf = ChannelMessageBuffer(max_size=10, ttl_minutes=30)
+        buf.add_message(_make_message(channel_id=1, content="old", minutes_ago=10, message_id=1))
+        buf.add_message(_make_message(channel_id=1, content="dup", minutes_ago=5, message_id=2))
+        buf.save_snapshot()
+
+        restored = ChannelMessageBuffer(max_size=10, ttl_minutes=30)
+        restored.add_message(_make_message(channel_id=1, content="dup", minutes_ago=5, message_id=2))
+        restored.add_message(_make_message(channel_id=1, content="new", message_id=3))
+        assert restored.restore_snapshot() == 1
+        assert [m.content for m in restored.get_recent_messages(1)] == ["old", "dup", "new"]
+        assert restored.stats()["messages"] == 3
+
+    def test_empty_buffer_keeps_previous_snapshot(self):
+        """空のバッファでは保存せず、スナップショットが無ければ何も復元しないこと"""
+        empty = ChannelMessageBuffer(max_size=10, ttl_minutes=30)
+        assert empty.restore_snapshot() == 0
+        assert empty.save_snapshot() == 0
+        assert ChannelMessageBuffer.load_snapshot_rows() == []
+
+
+class TestChannelMessage:
+    """ChannelMessage のテスト"""
+
+    def test_timestamp_normalized_to_epoch(self):
+        """aware/naive いずれも UTC エポック秒に正規化され、timestamp は UTC aware で返ること"""
+        jst = timezone(timedelta(hours=9))
+        aware = ChannelMessage(1, 100, 1, "A", "x", datetime(2025, 1, 1, 9, 0, tzinfo=jst))
+        naive = ChannelMessage(2, 100, 1, "A", "x", datetime(2025, 1, 1, 0, 0))
+        assert aware.ts == naive.ts == datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp()
+        assert aware.timestamp == datetime(2025, 1, 1, tzinfo=timezone.utc)
+        assert aware.timestamp.tzinfo is not None
+
+    def test_slots_and_interned_author_name(self):
+        """インスタンス辞書を持たず、同じ発言者名が共有されること"""
+        msg1 = ChannelMessage(1, 100, 1, "".join(["Use", "r"]), "x", 0.0)
+        msg2 = ChannelMessage(2, 100, 1, "".join(["Us", "er"]), "y", 0.0)
+        assert not hasattr(msg1, "__dict__")
+        assert msg1.author_name is msg2.author_name
+        assert msg1.attachments == ()
+
+    def test_equality(self):
+        """同じ内容のメッセージは等しいこと"""
+        ts = datetime.now(timezone.utc)
+        assert ChannelMessage(1, 100, 1, "A", "x", ts) == ChannelMessage(1, 100, 1, "A", "x", ts)
+        assert ChannelMessage(1, 100, 1, "A", "x", ts) != ChannelMessage(1, 100, 1, "A", "y", ts)
@@ -15,6 +15,7 @@ from memory.summarizer import (
     Summarizer,
     _extract_active_users,
     _format_messages_for_summary,
+    _parse_batch_result,
     get_summarizer,
 )
 
@@ -493,6 +494,167 @@ class TestSummarizerApplyResult:
         assert context.active_users == ["Alice", "Bob"]
 
 
+class TestParseBatchResult:
+    """_parse_batch_resultのテスト"""
+
+    def test_channels_key_format(self):
+        raw = {"channels": [{"channel_id": "100", "summary": "A"}, {"channel_id": 200, "summary": "B"}]}
+        result = _parse_batch_result(raw)
+        assert result[100]["summary"] == "A"
+        assert result[200]["summary"] == "B"
+
+    def test_list_format(self):
+        result = _parse_batch_result([{"channel_id": "100", "summary": "A"}])
+        assert result == {100: {"channel_id": "100", "summary": "A"}}
+
+    def test_keyed_object_format(self):
+        result = _parse_batch_result({"100": {"summary": "A"}})
+        assert result[100]["summary"] == "A"
+
+    def test_invalid_ids_skipped(self):
+        result = _parse_batch_result({"channels": [{"channel_id": "abc"}, "oops", {}]})
+        assert result == {}
+
+
+class TestSummarizeDueChannels:
+    """Summarizer.summarize_due_channelsのテスト"""
+
+    def _store_with(self, mock_get_store, should=True):
+        contexts = {}
+
+        def get_context(channel_id):
+            if channel_id not in contexts:
+                ctx = MagicMock()
+                ctx.should_summarize.return_value = should
+                ctx.message_count_since_update = 3
+                contexts[channel_id] = ctx
+            return contexts[channel_id]
+
+        mock_get_store.return_value.get_context.side_effect = get_context
+        return contexts
+
+    @patch("memory.summarizer.config")
+    @patch("memory.summarizer.get_channel_context_store")
+    def test_batch_disabled_falls_back_to_individual(self, mock_get_store, mock_config):
+        mock_config.SUMMARIZE_BATCH_ENABLED = False
+        summarizer = Summarizer()
+        with patch.object(summarizer, "maybe_summarize") as mock_maybe:
+            summarizer.summarize_due_channels({1: [], 2: []})
+        assert mock_maybe.call_count == 2
+
+    @patch("memory.summarizer.config")
+    @patch("memory.summarizer.get_channel_context_store")
+    def test_small_channels_batched_large_individual(self, mock_get_store, mock_config):
+        mock_config.SUMMARIZE_BATCH_ENABLED = True
+        mock_config.SUMMARIZE_ADAPTIVE_ENABLED = False
+        mock_config.SUMMARIZE_BATCH_SMALL_CHANNEL_MESSAGES = 2
+        mock_config.SUMMARIZE_BATCH_MAX_CHANNELS = 2
+        self._store_with(mock_get_store)
+
+        small = [_make_message()]
+        large = [_make_message() for _ in range(5)]
+        summarizer = Summarizer()
+        with patch.object(summarizer, "maybe_summarize") as mock_maybe, \
+             patch.object(summarizer, "_run_batch_summarize", new=MagicMock()) as mock_batch, \
+             patch.object(summarizer, "_run_summarize", new=MagicMock()) as mock_single, \
+             patch("memory.summarizer.asyncio.create_task") as mock_task:
+            summarizer.summarize_due_channels({1: small, 2: small, 3: small, 4: large})
+
+        mock_maybe.assert_called_once_with(4, large)
+        # 小規模3件 → バッチ(2件) + 単独(1件)
+        assert mock_task.call_count == 2
+        batch_arg = mock_batch.call_args[0][0]
+        assert [cid for cid, _, _ in batch_arg] == [1, 2]
+        assert mock_single.call_args[0][0] == 3
+        assert summarizer._running == {1, 2, 3}
+
+    @patch("memory.summarizer.config")
+    @patch("memory.summarizer.get_channel_context_store")
+    def test_channels_not_due_are_skipped(self, mock_get_store, mock_config):
+        mock_config.SUMMARIZE_BATCH_ENABLED = True
+        mock_config.SUMMARIZE_ADAPTIVE_ENABLED = False
+        mock_config.SUMMARIZE_BATCH_SMALL_CHANNEL_MESSAGES = 10
+        mock_config.SUMMARIZE_BATCH_MAX_CHANNELS = 8
+        self._store_with(mock_get_store, should=False)
+
+        summarizer = Summarizer()
+        with patch("memory.summarizer.asyncio.create_task") as mock_task:
+            summarizer.summarize_due_channels({1: [_make_message()]})
+        mock_task.assert_not_called()
+
+
+class TestRunBatchSummarize:
+    """Summarizer._run_batch_summarizeのテスト"""
+
+    @pytest.mark.asyncio
+    @patch("memory.summarizer.get_channel_context_store")
+    async def test_results_applied_per_channel(self, mock_get_store):
+        summarizer = Summarizer()
+        ctx1 = ChannelContext(channel_id=1, message_count_since_update=3)
+        ctx2 = ChannelContext(channel_id=2, message_count_since_update=4)
+        batch = [
+            (1, ctx1, [_make_message(author_name="Alice", channel_id=1)]),
+            (2, ctx2, [_make_message(author_name="Bob", channel_id=2)]),
+        ]
+        summarizer._running.update({1, 2})
+        results = {1: {"summary": "一", "mood": "静か", "topic_keywords": ["a"]}}
+
+        with patch.object(summarizer, "_call_batch_summarize_llm", return_value=results):
+            await summarizer._run_batch_summarize(batch)
+
+        assert ctx1.summary == "一"
+        assert ctx1.active_users == ["Alice"]
+        assert ctx1.message_count_since_update == 0
+        # 結果が欠落したチャンネルはカウンタを残して再試行対象にする
+        assert ctx2.summary == ""
+        assert ctx2.message_count_since_update == 4
+        mock_get_store.return_value.save_context.assert_called_once_with(ctx1)
+        assert summarizer._running == set()
+
+
+class TestCallBatchSummarizeLlm:
+    """Summarizer._call_batch_summarize_llmのテスト"""
+
+    @patch("memory.summarizer.get_model_name", return_value="gemini-2.5-flash")
+    @patch("memory.summarizer._get_genai_client")
+    def test_single_request_for_all_channels(self, mock_get_client, _mock_model):
+        response = MagicMock()
+        response.text = json.dumps({
+            "channels": [
+                {"channel_id": "1", "summary": "一", "mood": "", "topic_keywords": []},
+                {"channel_id": "2", "summary": "二", "mood": "", "topic_keywords": []},
+            ]
+        }, ensure_ascii=False)
+        mock_client = MagicMock()
+        mock_client.models.generate_content.return_value = response
+        mock_get_client.return_value = mock_client
+
+        summarizer = Summarizer()
+        batch = [
+            (1, ChannelContext(channel_id=1, summary="前回<要約>"), [_make_message(content="やあ")]),
+            (2, ChannelContext(channel_id=2), [_make_message(content="こんにちは")]),
+        ]
+        result = summarizer._call_batch_summarize_llm(batch)
+
+        assert set(result.keys()) == {1, 2}
+        mock_client.models.generate_content.assert_called_once()
+        prompt = mock_client.models.generate_content.call_args.kwargs["contents"][0].parts[0].text
+        assert '<channel id="1">' in prompt
+        assert '<channel id="2">' in prompt
+        assert "前回の要約: 前回&lt;要約&gt;" in prompt
+
+    @patch("memory.summarizer.get_model_name", return_value="gemini-2.5-flash")
+    @patch("memory.summarizer._get_genai_client")
+    def test_failure_returns_empty(self, mock_get_client, _mock_model):
+        mock_client = MagicMock()
+        mock_client.models.generate_content.side_effect = Exception("API error")
+        mock_get_client.return_value = mock_client
+
+        summarizer = Summarizer()
+        batch = [(1, ChannelContext(channel_id=1), [_make_message()])]
+        assert summarizer._call_batch_summarize_llm(batch) == {}
+
+
 class TestGetSummarizer:
     """get_summarizerシングルトンのテスト"""
 
@@ -0,0 +1,274 @@
+"""適応的要約ポリシーのテスト"""
+
+# type: ignore
+# mypy: ignore-errors
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from memory.channel_context import ChannelContext
+from memory.short_term import ChannelMessage
+from memory.summarizer import Summarizer
+from memory.summary_policy import (
+    AdaptiveSummaryPolicy,
+    get_summary_policy,
+    keyword_drift,
+)
+
+
+def _make_message(content: str = "テスト", is_bot: bool = False) -> ChannelMessage:
+    return ChannelMessage(
+        message_id=1,
+        channel_id=100,
+        author_id=1,
+        author_name="User",
+        content=content,
+        timestamp=datetime.now(timezone.utc),
+        is_bot=is_bot,
+    )
+
+
+@pytest.fixture()
+def mock_config():
+    with patch("memory.summary_policy.config") as cfg:
+        cfg.SUMMARIZE_EVERY_N_MESSAGES = 20
+        cfg.SUMMARIZE_EVERY_N_MINUTES = 15
+        cfg.SUMMARIZE_RATE_WINDOW_MINUTES = 10.0
+        cfg.SUMMARIZE_REFERENCE_RATE_PER_MINUTE = 2.0
+        cfg.SUMMARIZE_DRIFT_THRESHOLD = 0.6
+        cfg.SUMMARIZE_MIN_INTERVAL_SECONDS = 60
+        cfg.SUMMARIZE_GUILD_BUDGET_PER_HOUR = 2
+        yield cfg
+
+
+class TestMessageRate:
+    """EWMAレート推定のテスト"""
+
+    def test_unknown_channel_rate_zero(self, mock_config):
+        policy = AdaptiveSummaryPolicy()
+        assert policy.message_rate(100, now=0.0) == 0.0
+
+    def test_rate_converges_to_actual_rate(self, mock_config):
+        """一定間隔のメッセージでレートが実レートに収束すること"""
+        policy = AdaptiveSummaryPolicy()
+        # 6秒間隔 = 10件/分 を1時間分
+        for i in range(600):
+            policy.record_message(100, now=i * 6.0)
+        rate = policy.message_rate(100, now=599 * 6.0)
+        assert rate == pytest.approx(10.0, rel=0.1)
+
+    def test_rate_decays_when_silent(self, mock_config):
+        policy = AdaptiveSummaryPolicy()
+        for i in range(100):
+            policy.record_message(100, now=i * 6.0)
+        busy = policy.message_rate(100, now=600.0)
+        quiet = policy.message_rate(100, now=600.0 + 30 * 60)
+        assert quiet < busy * 0.1
+
+    def test_guild_id_recorded(self, mock_config):
+        policy = AdaptiveSummaryPolicy()
+        policy.record_message(100, guild_id=999, now=0.0)
+        assert policy.get_guild_id(100) == 999
+        assert policy.get_guild_id(200) is None
+
+    def test_idle_channels_pruned(self, mock_config):
+        """チャンネル数が閾値に達したら長くアイドルなチャンネルの推定値を捨てること"""
+        policy = AdaptiveSummaryPolicy()
+        with patch("memory.summary_policy._PRUNE_MIN_CHANNELS", 3):
+            policy._prune_at = 3
+            policy.record_message(1, now=0.0)
+            policy.record_message(2, now=0.0)
+            policy.record_message(3, now=5000.0)
+            # 10分 * 10 = 6000秒を超えてアイドルな 1, 2 が捨てられる
+            policy.record_message(4, now=6100.0)
+        assert sorted(policy._activity) == [3, 4]
+
+
+class TestCountThreshold:
+    """レート依存の件数閾値のテスト"""
+
+    def test_busy_channel_needs_more_messages(self, mock_config):
+        policy = AdaptiveSummaryPolicy()
+        for i in range(600):
+            policy.record_message(100, now=i * 1.0)  # 60件/分
+        assert policy.count_threshold(100, now=599.0) == 80  # 上限4倍
+
+    def test_quiet_channel_needs_fewer_messages(self, mock_config):
+        policy = AdaptiveSummaryPolicy()
+        policy.record_message(100, now=0.0)
+        assert policy.count_threshold(100, now=0.0) == 10  # 下限0.5倍
+
+    def test_reference_rate_zero_uses_base(self, mock_config):
+        mock_config.SUMMARIZE_REFERENCE_RATE_PER_MINUTE = 0
+        policy = AdaptiveSummaryPolicy()
+        assert policy.count_threshold(100, now=0.0) == 20
+
+
+class TestKeywordDrift:
+    """keyword_driftのテスト"""
+
+    def test_no_keywords_is_no_drift(self):
+        """キーワードがなければドリフトの判定材料にしない"""
+        assert keyword_drift([], [_make_message("何か")]) == 0.0
+
+    def test_all_keywords_present(self):
+        messages = [_make_message("Rustのasyncが難しい")]
+        assert keyword_drift(["Rust", "async"], messages) == 0.0
+
+    def test_partial_drift(self):
+        messages = [_make_message("Rustの話をしよう")]
+        assert keyword_drift(["Rust", "async"], messages) == 0.5
+
+    def test_bot_messages_ignored(self):
+        messages = [_make_message("Rust async", is_bot=True), _make_message("料理")]
+        assert keyword_drift(["Rust", "async"], messages) == 1.0
+
+    def test_no_messages_no_drift(self):
+        assert keyword_drift(["Rust"], []) == 0.0
+
+
+class TestShouldSummarize:
+    """AdaptiveSummaryPolicy.should_summarizeのテスト"""
+
+    def _ctx(self, count: int, minutes_ago: float, keywords=None) -> ChannelContext:
+        return ChannelContext(
+            channel_id=100,
+            topic_keywords=keywords or [],
+            message_count_since_update=count,
+            last_updated=datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+        )
+
+    def test_false_when_no_messages(self, mock_config):
+        policy = AdaptiveSummaryPolicy()
+        assert policy.should_summarize(self._ctx(0, 60), []) is False
+
+    def test_false_within_min_interval(self, mock_config):
+        policy = AdaptiveSummaryPolicy()
+        assert policy.should_summarize(self._ctx(500, 0.5), []) is False
+
+    def test_true_after_time_threshold(self, mock_config):
+        policy = AdaptiveSummaryPolicy()
+        assert policy.should_summarize(self._ctx(1, 16), []) is True
+
+    def test_quiet_channel_triggers_on_scaled_count(self, mock_config):
+        policy = AdaptiveSummaryPolicy()
+        ctx = self._ctx(10, 5, keywords=["Rust"])
+        messages = [_make_message("Rust")]
+        assert policy.should_summarize(ctx, messages) is True
+
+    def test_busy_channel_waits_for_more_messages(self, mock_config):
+        policy = AdaptiveSummaryPolicy()
+        import time
+
+        now = time.time()
+        for i in range(300):
+            policy.record_message(100, now=now - 300 + i)
+        ctx = self._ctx(30, 5, keywords=["Rust"])
+        messages = [_make_message("Rust")]
+        assert policy.should_summarize(ctx, messages, now=now) is False
+
+    def test_topic_drift_triggers_early(self, mock_config):
+        policy = AdaptiveSummaryPolicy()
+        import time
+
+        now = time.time()
+        for i in range(300):
+            policy.record_message(100, now=now - 300 + i)
+        ctx = self._ctx(6, 5, keywords=["Rust", "async"])
+        messages = [_make_message("今日の晩ごはんはカレー")]
+        assert policy.should_summarize(ctx, messages, now=now) is True
+
+    def test_no_keywords_does_not_trigger_drift(self, mock_config):
+        """キーワードのないチャンネルはドリフトで早期要約しないこと"""
+        policy = AdaptiveSummaryPolicy()
+        import time
+
+        now = time.time()
+        for i in range(300):
+            policy.record_message(100, now=now - 300 + i)
+        ctx = self._ctx(6, 5)
+        messages = [_make_message("今日の晩ごはんはカレー")]
+        assert policy.should_summarize(ctx, messages, now=now) is False
+
+
+class TestGuildBudget:
+    """ギルド予算のテスト"""
+
+    def test_budget_exhausted(self, mock_config):
+        policy = AdaptiveSummaryPolicy()
+        assert policy.try_consume_budget(1, now=0.0) is True
+        assert policy.try_consume_budget(1, now=0.0) is True
+        assert policy.try_consume_budget(1, now=0.0) is False
+
+    def test_budget_is_per_guild(self, mock_config):
+        policy = AdaptiveSummaryPolicy()
+        policy.try_consume_budget(1, now=0.0)
+        policy.try_consume_budget(1, now=0.0)
+        assert policy.try_consume_budget(2, now=0.0) is True
+
+    def test_budget_refills_over_time(self, mock_config):
+        policy = AdaptiveSummaryPolicy()
+        policy.try_consume_budget(1, now=0.0)
+        policy.try_consume_budget(1, now=0.0)
+        assert policy.try_consume_budget(1, now=1800.0) is True
+
+    def test_no_guild_or_unlimited(self, mock_config):
+        policy = AdaptiveSummaryPolicy()
+        assert policy.try_consume_budget(None) is True
+        mock_config.SUMMARIZE_GUILD_BUDGET_PER_HOUR = 0
+        for _ in range(10):
+            assert policy.try_consume_budget(1) is True
+
+
+class TestSummarizerAdaptiveMode:
+    """Summarizer.maybe_summarize の適応モード連携テスト"""
+
+    @patch("memory.summarizer.config")
+    @patch("memory.summarizer.get_channel_context_store")
+    def test_uses_policy_and_budget(self, mock_get_store, mock_summ_config):
+        mock_summ_config.SUMMARIZE_ADAPTIVE_ENABLED = True
+        mock_ctx = MagicMock()
+        mock_ctx.message_count_since_update = 5
+        mock_get_store.return_value.get_context.return_value = mock_ctx
+        policy = MagicMock()
+        policy.should_summarize.return_value = True
+        policy.get_guild_id.return_value = 42
+        policy.try_consume_budget.return_value = True
+
+        summarizer = Summarizer()
+        with patch("memory.summary_policy.get_summary_policy", return_value=policy), \
+             patch("memory.summarizer.asyncio.create_task") as mock_task:
+            summarizer.maybe_summarize(100, [])
+            mock_task.call_args[0][0].close()
+
+        mock_ctx.should_summarize.assert_not_called()
+        policy.try_consume_budget.assert_called_once_with(42)
+        mock_task.assert_called_once()
+
+    @patch("memory.summarizer.config")
+    @patch("memory.summarizer.get_channel_context_store")
+    def test_skips_when_budget_exhausted(self, mock_get_store, mock_summ_config):
+        mock_summ_config.SUMMARIZE_ADAPTIVE_ENABLED = True
+        mock_get_store.return_value.get_context.return_value = MagicMock()
+        policy = MagicMock()
+        policy.should_summarize.return_value = True
+        policy.try_consume_budget.return_value = False
+
+        summarizer = Summarizer()
+        with patch("memory.summary_policy.get_summary_policy", return_value=policy), \
+             patch("memory.summarizer.asyncio.create_task") as mock_task:
+            summarizer.maybe_summarize(100, [], guild_id=7)
+
+        policy.try_consume_budget.assert_called_once_with(7)
+        mock_task.assert_not_called()
+        assert 100 not in summarizer._running
+
+
+def test_get_summary_policy_singleton():
+    import memory.summary_policy as mod
+
+    mod._policy = None
+    assert get_summary_policy() is get_summary_policy()
+    mod._policy = None
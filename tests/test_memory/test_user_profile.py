@@ -3,6 +3,7 @@
 # type: ignore
 # mypy: ignore-errors
 
+import asyncio
 import json
 import os
 import tempfile
@@ -217,7 +218,7 @@ class TestUserProfileStoreRecordMessage:
         """存在しないユーザーIDで新規プロファイルが作成される"""
         store = UserProfileStore()
         store.record_message(user_id=111, channel_id=999, display_name="NewUser")
-        profile = store._profiles[111]
+        profile = store.get_profile(111)
         assert profile.user_id == 111
         assert profile.display_name == "NewUser"
         assert profile.interaction_count == 1
@@ -228,7 +229,7 @@ class TestUserProfileStoreRecordMessage:
         store.record_message(1, 100, "User")
         store.record_message(1, 100, "User")
         store.record_message(1, 100, "User")
-        assert store._profiles[1].interaction_count == 3
+        assert store.get_profile(1).interaction_count == 3
 
     def test_channels_active_dedup(self):
         """同じチャンネルは重複して追加されない"""
@@ -236,20 +237,20 @@ class TestUserProfileStoreRecordMessage:
         store.record_message(1, 100, "User")
         store.record_message(1, 100, "User")
         store.record_message(1, 200, "User")
-        assert store._profiles[1].channels_active == [100, 200]
+        assert store.get_profile(1).channels_active == [100, 200]
 
     def test_updates_display_name(self):
         """display_name が最新に更新される"""
         store = UserProfileStore()
         store.record_message(1, 100, "OldName")
         store.record_message(1, 100, "NewName")
-        assert store._profiles[1].display_name == "NewName"
+        assert store.get_profile(1).display_name == "NewName"
 
     def test_updates_last_interaction(self):
         """last_interaction が更新される"""
         store = UserProfileStore()
         store.record_message(1, 100, "User")
-        assert store._profiles[1].last_interaction is not None
+        assert store.get_profile(1).last_interaction is not None
 
 
 class TestUserProfileStoreRecordBotMention:
@@ -272,7 +273,7 @@ class TestUserProfileStoreRecordBotMention:
         store.record_message(1, 100, "User")  # まずプロファイルを作成
         store.record_bot_mention(1)
         store.record_bot_mention(1)
-        assert store._profiles[1].mentioned_bot_count == 2
+        assert store.get_profile(1).mentioned_bot_count == 2
 
     def test_no_error_for_unknown_user(self):
         """存在しないユーザーIDでエラーにならない（プロファイルなければno-op）"""
@@ -299,7 +300,7 @@ class TestUserProfileStoreUpdateLastTopic:
         store = UserProfileStore()
         store.record_message(1, 100, "User")
         store.update_last_topic(1, ["Rust", "async"])
-        assert store._profiles[1].last_topic == ["Rust", "async"]
+        assert store.get_profile(1).last_topic == ["Rust", "async"]
 
     def test_overwrites_previous_topic(self):
         """前の話題が上書きされる"""
@@ -307,21 +308,42 @@ class TestUserProfileStoreUpdateLastTopic:
         store.record_message(1, 100, "User")
         store.update_last_topic(1, ["Python"])
         store.update_last_topic(1, ["Go", "goroutine"])
-        assert store._profiles[1].last_topic == ["Go", "goroutine"]
+        assert store.get_profile(1).last_topic == ["Go", "goroutine"]
 
     def test_no_update_for_empty_keywords(self):
         """空リストのとき更新されない"""
         store = UserProfileStore()
         store.record_message(1, 100, "User")
-        store._profiles[1].last_topic = ["existing"]
+        store.get_profile(1).last_topic = ["existing"]
         store.update_last_topic(1, [])
-        assert store._profiles[1].last_topic == ["existing"]
+        assert store.get_profile(1).last_topic == ["existing"]
 
     def test_no_error_for_unknown_user(self):
         """存在しないユーザーIDでエラーにならない"""
         store = UserProfileStore()
         store.update_last_topic(9999, ["topic"])  # エラーが起きないこと
 
+    @pytest.mark.asyncio
+    async def test_async_loads_miss_in_thread(self):
+        """未キャッシュのユーザーは single-flight の非同期読み込みを経由して更新されること"""
+        store = UserProfileStore()
+        store.record_message(1, 100, "User")
+        with patch.object(store, "get_profile") as mock_sync, \
+             patch.object(store, "_load_profile", return_value=None) as mock_load:
+            await store.update_last_topic_async(1, ["零式"])
+        mock_sync.assert_not_called()
+        mock_load.assert_called_once_with(1)
+        assert store._profiles.peek(1).last_topic == ["零式"]
+        assert store._profiles.peek(1).interaction_count == 1
+
+    @pytest.mark.asyncio
+    async def test_async_ignores_inactive_user(self):
+        """キャッシュにもカウンタにもないユーザーは読み込まないこと"""
+        store = UserProfileStore()
+        with patch.object(store, "_load_profile") as mock_load:
+            await store.update_last_topic_async(9999, ["topic"])
+        mock_load.assert_not_called()
+
 
 class TestUserProfileStoreBasicStorage:
     """local ストレージ: 基本動作確認"""
@@ -363,6 +385,381 @@ class TestUserProfileStoreBasicStorage:
         assert p1 is p2
 
 
+class TestUserProfileStoreDirtyPersistence:
+    """ダーティセットによる差分永続化のテスト"""
+
+    @pytest.fixture(autouse=True)
+    def mock_config(self):
+        with patch("memory.user_profile.config") as mock_cfg:
+            mock_cfg.STORAGE_TYPE = "local"
+            mock_cfg.CHANNELS_ACTIVE_LIMIT = 20
+            mock_cfg.USER_PROFILE_TAGS_LIMIT = 10
+            mock_cfg.USER_PROFILE_FACTS_LIMIT = 10
+            mock_cfg.FIRESTORE_COLLECTION_USER_PROFILES = "user_profiles"
+            yield mock_cfg
+
+    def test_only_mutated_profiles_are_written(self):
+        """更新されたプロファイルだけが書き込まれること"""
+        store = UserProfileStore()
+        store.get_profile(1, "Reader")
+        store.record_message(2, 100, "Writer")
+        with patch.object(store, "_save_to_local", return_value=True) as mock_save:
+            assert store.persist_dirty() == 1
+            assert store.persist_dirty() == 0
+        mock_save.assert_called_once_with(store._profiles[2])
+
+    @pytest.mark.parametrize(
+        "mutate",
+        [
+            lambda s: s.record_bot_mention(1),
+            lambda s: s.update_last_topic(1, ["Python"]),
+            lambda s: s.update_from_reflection(1, {"tags": ["猫好き"]}),
+            lambda s: s.update_nickname(1, "ポチ"),
+        ],
+    )
+    def test_mutators_mark_dirty(self, mutate):
+        """各更新メソッドがプロファイルをダーティにすること"""
+        store = UserProfileStore()
+        store.get_profile(1, "User")
+        assert store.has_pending_writes() is False
+        mutate(store)
+        assert store.has_pending_writes() is True
+
+    def test_unknown_user_is_not_marked(self):
+        """未読み込みのユーザーへの更新はダーティにならないこと"""
+        store = UserProfileStore()
+        store.record_bot_mention(999)
+        store.update_nickname(999, "x")
+        assert store.has_pending_writes() is False
+
+    def test_failed_write_is_retried(self):
+        """書き込みに失敗したプロファイルが次回再試行されること"""
+        store = UserProfileStore()
+        store.record_message(1, 100, "User")
+        with patch.object(store, "_save_to_local", return_value=False):
+            assert store.persist_dirty() == 0
+        with patch.object(store, "_save_to_local", return_value=True) as mock_save:
+            assert store.persist_dirty() == 1
+            mock_save.assert_called_once()
+
+    def test_firestore_uses_batch_write(self, mock_config):
+        """Firestoreでは1回のバッチコミットでまとめて書き込まれること"""
+        mock_config.STORAGE_TYPE = "firestore"
+        store = UserProfileStore()
+        for uid in (1, 2, 3):
+            store._profiles.put(uid, UserProfile(user_id=uid, display_name=f"U{uid}"))
+            store.record_bot_mention(uid)
+        mock_db = MagicMock()
+        with patch("utils.firestore_client.get_firestore_client", return_value=mock_db):
+            assert store.persist_dirty() == 3
+        mock_db.collection.assert_called_once_with("user_profiles")
+        assert mock_db.batch.return_value.set.call_count == 3
+        mock_db.batch.return_value.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_persist_dirty_async(self):
+        """persist_dirty_async がスレッド経由で persist_dirty を実行すること"""
+        store = UserProfileStore()
+        store.record_message(1, 100, "User")
+        with patch.object(store, "_save_to_local", return_value=True):
+            assert await store.persist_dirty_async() == 1
+
+    @pytest.mark.asyncio
+    async def test_persist_dirty_async_merges_counters_on_loop(self):
+        """カウンタの反映とキャッシュ登録はループ上で行い、読み込み・書き込みだけをスレッドで行うこと"""
+        import threading
+
+        from memory import user_profile
+
+        store = UserProfileStore()
+        store.get_profile(1, "Cached")
+        store.record_message(1, 100, "Cached")
+        store.record_message(2, 100, "New")
+        loop_thread = threading.get_ident()
+        merge_threads: list[int] = []
+        io_threads: list[int] = []
+        original_merge = user_profile._merge_counter
+
+        def merge(profile, counter):
+            merge_threads.append(threading.get_ident())
+            original_merge(profile, counter)
+
+        def load(user_ids):
+            io_threads.append(threading.get_ident())
+            return []
+
+        def save(profile):
+            io_threads.append(threading.get_ident())
+            return True
+
+        with patch("memory.user_profile._merge_counter", side_effect=merge), \
+             patch.object(store, "_load_profiles", side_effect=load), \
+             patch.object(store, "_save_to_local", side_effect=save):
+            assert await store.persist_dirty_async() == 2
+
+        assert merge_threads == [loop_thread, loop_thread]
+        assert io_threads and loop_thread not in io_threads
+        assert store._profiles[2].interaction_count == 1
+
+
+class TestUserProfileStoreBounded:
+    """UserProfileStoreのLRU上限・TTLのテスト"""
+
+    @pytest.fixture(autouse=True)
+    def mock_config(self):
+        with patch("memory.user_profile.config") as mock_cfg:
+            mock_cfg.STORAGE_TYPE = "local"
+            mock_cfg.CHANNELS_ACTIVE_LIMIT = 20
+            yield mock_cfg
+
+    def test_dirty_profile_flushed_before_eviction(self):
+        """上限超過で追い出されるプロファイルにカウンタが反映され、永続化されること"""
+        store = UserProfileStore(max_entries=2)
+        with patch.object(store, "_load_profile", return_value=None), \
+             patch.object(store, "_save_to_local", return_value=True) as mock_save:
+            store.get_profile(1, "A")
+            store.record_message(1, 100, "A")
+            store.get_profile(2, "B")
+            store.get_profile(3, "C")
+            assert mock_save.call_count == 1
+            assert mock_save.call_args[0][0].user_id == 1
+            assert mock_save.call_args[0][0].interaction_count == 1
+        assert 1 not in store._profiles
+        assert store.has_pending_writes() is False
+
+    def test_clean_profile_evicted_without_write(self):
+        """未更新のプロファイルは書き込まずに追い出されること"""
+        store = UserProfileStore(max_entries=1)
+        with patch.object(store, "_load_profile", return_value=None), \
+             patch.object(store, "_save_to_local") as mock_save:
+            store.get_profile(1, "A")
+            store.get_profile(2, "B")
+            mock_save.assert_not_called()
+        assert len(store._profiles) == 1
+
+    def test_evicted_profile_reloaded_from_storage(self):
+        """追い出されたプロファイルが再アクセス時に永続化先から読み込まれること"""
+        store = UserProfileStore(max_entries=1)
+        saved = UserProfile(user_id=1, display_name="A", interaction_count=5)
+        with patch.object(store, "_load_profile", side_effect=[None, None, saved]):
+            store.get_profile(1, "A")
+            store.get_profile(2, "B")
+            assert store.get_profile(1, "A") is saved
+
+    def test_evict_expired_and_stats(self):
+        """アイドルTTL超過分が永続化のうえ解放され、統計に反映されること"""
+        store = UserProfileStore(ttl_minutes=60)
+        with patch("utils.lru_cache.time.monotonic", return_value=0.0), \
+             patch.object(store, "_load_profile", return_value=None):
+            store.get_profile(1, "A")
+            store.record_message(1, 100, "A")
+        with patch("utils.lru_cache.time.monotonic", return_value=3601.0), \
+             patch.object(store, "_save_to_local", return_value=True) as mock_save:
+            assert store.evict_expired() == 1
+            mock_save.assert_called_once()
+        stats = store.stats()
+        assert stats["entries"] == 0
+        assert stats["evictions"] == 1
+        assert stats["misses"] == 1
+        assert stats["dirty"] == 0
+
+
+class TestUserProfileStorePrefetch:
+    """prefetch による一括読み込みのテスト"""
+
+    @pytest.fixture(autouse=True)
+    def mock_config(self):
+        with patch("memory.user_profile.config") as mock_cfg:
+            mock_cfg.STORAGE_TYPE = "local"
+            mock_cfg.FIRESTORE_COLLECTION_USER_PROFILES = "user_profiles"
+            yield mock_cfg
+
+    def test_local_prefetch_loads_missing_only(self):
+        """キャッシュ済みのユーザーは読み込まず、存在するものだけキャッシュされること"""
+        store = UserProfileStore()
+        cached = store.get_profile(1, "Cached")
+
+        def load(uid):
+            return UserProfile(user_id=uid, display_name=f"U{uid}") if uid != 3 else None
+
+        with patch.object(store, "_load_from_local", side_effect=load) as mock_load:
+            assert store.prefetch([1, 2, 3, 2]) == 1
+        assert sorted(c.args[0] for c in mock_load.call_args_list) == [2, 3]
+        assert store._profiles[1] is cached
+        assert store._profiles[2].display_name == "U2"
+        assert 3 not in store._profiles
+
+    def test_firestore_prefetch_uses_get_all(self, mock_config):
+        """Firestoreでは get_all で一括取得されること"""
+        mock_config.STORAGE_TYPE = "firestore"
+        store = UserProfileStore()
+        snapshots = []
+        for uid in (10, 20):
+            snap = MagicMock()
+            snap.exists = True
+            snap.id = str(uid)
+            snap.to_dict.return_value = {"display_name": f"U{uid}", "interaction_count": uid}
+            snapshots.append(snap)
+        missing = MagicMock()
+        missing.exists = False
+        mock_db = MagicMock()
+        mock_db.get_all.return_value = snapshots + [missing]
+
+        with patch("utils.firestore_client.get_firestore_client", return_value=mock_db):
+            assert store.prefetch([10, 20, 30]) == 2
+
+        mock_db.get_all.assert_called_once()
+        assert store._profiles[20].interaction_count == 20
+
+    def test_prefetch_does_not_mark_dirty(self):
+        """プリフェッチしたプロファイルは未保存扱いにならないこと"""
+        store = UserProfileStore()
+        with patch.object(
+            store, "_load_from_local", return_value=UserProfile(user_id=1, display_name="A")
+        ):
+            store.prefetch([1])
+        assert store.has_pending_writes() is False
+
+    @pytest.mark.asyncio
+    async def test_prefetch_async(self):
+        """prefetch_async がスレッド経由で prefetch を実行すること"""
+        store = UserProfileStore()
+        with patch.object(store, "prefetch", return_value=2) as mock_prefetch:
+            assert await store.prefetch_async([1, 2]) == 2
+        mock_prefetch.assert_called_once_with([1, 2])
+
+
+class TestUserProfileStoreAsync:
+    """非同期アクセス（single-flight・カウンタ反映）のテスト"""
+
+    @pytest.fixture(autouse=True)
+    def mock_config(self):
+        with patch("memory.user_profile.config") as mock_cfg:
+            mock_cfg.STORAGE_TYPE = "local"
+            mock_cfg.CHANNELS_ACTIVE_LIMIT = 20
+            yield mock_cfg
+
+    @pytest.mark.asyncio
+    async def test_get_profile_async_single_flight(self):
+        """同一ユーザーへの同時要求で読み込みが1回だけ行われること"""
+        store = UserProfileStore()
+        saved = UserProfile(user_id=1, display_name="A", interaction_count=3)
+        with patch.object(store, "_load_profile", return_value=saved) as mock_load:
+            results = await asyncio.gather(
+                *(store.get_profile_async(1, "A") for _ in range(5))
+            )
+        mock_load.assert_called_once_with(1)
+        assert all(r is saved for r in results)
+        assert store._profiles._loading == {}
+
+    @pytest.mark.asyncio
+    async def test_get_profile_async_cache_hit(self):
+        """キャッシュヒット時は読み込みが発生しないこと"""
+        store = UserProfileStore()
+        with patch.object(store, "_load_profile", return_value=None):
+            profile = store.get_profile(1, "A")
+        with patch.object(store, "_load_profile") as mock_load:
+            assert await store.get_profile_async(1) is profile
+        mock_load.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_pending_counters_merged_into_loaded_profile(self):
+        """読み込み前に積まれたカウンタが読み込み結果に反映されること"""
+        store = UserProfileStore()
+        saved = UserProfile(
+            user_id=1, display_name="旧名", interaction_count=10, channels_active=[200, 100]
+        )
+        with patch.object(store, "_load_profile", return_value=saved):
+            store.record_message(1, 100, "新名")
+            store.record_message(1, 300, "新名")
+            store.record_bot_mention(1)
+            assert 1 not in store._profiles
+            profile = await store.get_profile_async(1)
+
+        assert profile is saved
+        assert profile.interaction_count == 12
+        assert profile.mentioned_bot_count == 1
+        assert profile.display_name == "新名"
+        assert profile.channels_active == [200, 100, 300]
+        assert store.has_pending_writes() is True
+        assert store.stats()["pending_counters"] == 0
+
+    @pytest.mark.asyncio
+    async def test_load_error_falls_back_to_new_profile(self):
+        """読み込みで例外が発生しても新規プロファイルで継続すること"""
+        store = UserProfileStore()
+        with patch.object(store, "_load_profile", side_effect=OSError("io")):
+            store.record_message(1, 100, "A")
+            profile = await store.get_profile_async(1)
+        assert profile.interaction_count == 1
+
+
+class TestUserProfileStoreCounterTable:
+    """メッセージ記録のカウンタテーブルのテスト"""
+
+    @pytest.fixture(autouse=True)
+    def mock_config(self):
+        with patch("memory.user_profile.config") as mock_cfg:
+            mock_cfg.STORAGE_TYPE = "local"
+            mock_cfg.CHANNELS_ACTIVE_LIMIT = 20
+            yield mock_cfg
+
+    def test_record_message_does_not_touch_profile_or_storage(self):
+        """記録はカウンタに積まれるだけで、読み込み・プロファイル更新・ダーティ化が起きないこと"""
+        store = UserProfileStore()
+        with patch.object(store, "_load_profile", return_value=None):
+            profile = store.get_profile(1, "A")
+        with patch.object(store, "_load_profile") as mock_load:
+            for _ in range(3):
+                store.record_message(1, 100, "A")
+            store.record_message(2, 100, "B")
+        mock_load.assert_not_called()
+        assert profile.interaction_count == 0
+        assert store.stats()["dirty"] == 0
+        assert store.stats()["pending_counters"] == 2
+        assert store.has_pending_writes() is True
+
+    def test_persist_dirty_merges_counters_in_one_write(self):
+        """永続化時にカウンタが反映され、ユーザーごとに1回だけ書き込まれること"""
+        store = UserProfileStore()
+        saved = UserProfile(user_id=2, display_name="B", interaction_count=5)
+        with patch.object(store, "_load_profile", return_value=None):
+            store.get_profile(1, "A")
+        for _ in range(10):
+            store.record_message(1, 100, "A")
+        store.record_message(2, 200, "B")
+        with patch.object(store, "_load_from_local", return_value=saved) as mock_load, \
+             patch.object(store, "_save_to_local", return_value=True) as mock_save:
+            assert store.persist_dirty() == 2
+        mock_load.assert_called_once_with(2)
+        written = {c.args[0].user_id: c.args[0] for c in mock_save.call_args_list}
+        assert written[1].interaction_count == 10
+        assert written[2] is saved
+        assert saved.interaction_count == 6
+        assert store._profiles[2] is saved
+        assert store.has_pending_writes() is False
+
+    def test_channel_recency_merged_in_order(self):
+        """チャンネル最近度が記録順にプロファイルへ反映されること"""
+        store = UserProfileStore()
+        with patch.object(store, "_load_profile", return_value=None):
+            profile = store.get_profile(1, "A")
+            profile.channels_active = [100, 200, 300]
+            store.record_message(1, 100, "A")
+            store.record_message(1, 400, "A")
+            store.record_message(1, 200, "A")
+            assert store.get_profile(1).channels_active == [300, 100, 400, 200]
+
+    def test_reflection_update_loads_active_user(self):
+        """カウンタだけがあるユーザーも反省会の更新対象になること"""
+        store = UserProfileStore()
+        store.record_message(1, 100, "A")
+        with patch.object(store, "_load_profile", return_value=None):
+            store.update_nickname(1, "ポチ")
+        assert store._profiles[1].nickname == "ポチ"
+        assert store._profiles[1].interaction_count == 1
+
+
 class TestUserProfileStoreLocalStorage:
     """local ストレージ: to_dict / from_dict のラウンドトリップ + 書き込み確認"""
 
@@ -536,7 +933,7 @@ class TestChannelsActiveLimit:
         store.record_message(1, 200, "User")
         store.record_message(1, 300, "User")
         store.record_message(1, 400, "User")
-        assert store._profiles[1].channels_active == [200, 300, 400]
+        assert store.get_profile(1).channels_active == [200, 300, 400]
 
     def test_channels_active_lru_order(self):
         """既存チャンネルへの再アクセスで末尾に移動すること"""
@@ -544,7 +941,7 @@ class TestChannelsActiveLimit:
         store.record_message(1, 100, "User")
         store.record_message(1, 200, "User")
         store.record_message(1, 100, "User")  # 100に再アクセス
-        assert store._profiles[1].channels_active[-1] == 100
+        assert store.get_profile(1).channels_active[-1] == 100
 
 
 class TestFormatMethods:
@@ -620,6 +1017,62 @@ class TestFormatMethods:
         assert "明るい性格" in result
 
 
+class TestRenderCache:
+    """format_for_* のメモ化とバイト数のテスト"""
+
+    @pytest.fixture(autouse=True)
+    def mock_config(self):
+        with patch("memory.user_profile.config") as mock_cfg:
+            mock_cfg.FAMILIARITY_THRESHOLD_ACQUAINTANCE = 6
+            mock_cfg.FAMILIARITY_THRESHOLD_REGULAR = 31
+            mock_cfg.FAMILIARITY_THRESHOLD_CLOSE = 101
+            mock_cfg.USER_PROFILE_TAGS_LIMIT = 10
+            mock_cfg.USER_PROFILE_FACTS_LIMIT = 10
+            mock_cfg.STORAGE_TYPE = "local"
+            yield mock_cfg
+
+    def test_sections_invalidated_independently(self):
+        """変更されたフィールドに依存するセクションだけが再生成されること"""
+        profile = UserProfile(
+            user_id=1, display_name="User", interaction_count=10, tags=["ゲーマー"]
+        )
+        persona = profile.format_for_persona()
+        profile.format_for_familiarity()
+        profile.interaction_count += 1
+        assert "11回" in profile.format_for_familiarity()
+        assert profile.format_for_persona() is persona
+
+    def test_reflection_update_invalidates_persona(self):
+        """update_from_reflection による変更が描画に反映されること"""
+        store = UserProfileStore()
+        profile = store.get_profile(1, "User")
+        assert profile.format_for_persona() == ""
+        store.update_from_reflection(1, {"tags": ["料理好き"], "notable_facts": ["猫を飼っている"]})
+        result = profile.format_for_persona()
+        assert "料理好き" in result
+        assert "猫を飼っている" in result
+
+    def test_threshold_change_rerenders_familiarity(self, mock_config):
+        """関係性レベルの閾値が変わるとキャッシュが使われないこと"""
+        profile = UserProfile(user_id=1, display_name="User", interaction_count=10)
+        assert "acquaintance" in profile.format_for_familiarity()
+        mock_config.FAMILIARITY_THRESHOLD_REGULAR = 5
+        assert "regular" in profile.format_for_familiarity()
+
+    def test_injection_byte_size_matches_rendering(self):
+        """injection_byte_size が format_for_injection のバイト数と一致すること"""
+        profile = UserProfile(
+            user_id=1,
+            display_name="ユーザー",
+            interaction_count=10,
+            last_topic=["Python"],
+            personality_notes="穏やか",
+        )
+        expected = len(profile.format_for_injection().encode("utf-8"))
+        assert profile.injection_byte_size() == expected
+        assert UserProfile(user_id=2, display_name="x").injection_byte_size() == 0
+
+
 class TestUpdateFromReflection:
     """UserProfileStore.update_from_reflection のテスト"""
 
@@ -641,47 +1094,47 @@ class TestUpdateFromReflection:
         store = UserProfileStore()
         store.record_message(1, 100, "User")
         store.update_from_reflection(1, {"tags": ["Python", "Python", "猫好き"]})
-        assert store._profiles[1].tags.count("Python") == 1
+        assert store.get_profile(1).tags.count("Python") == 1
 
     def test_update_tags_limit(self):
         """USER_PROFILE_TAGS_LIMIT を超えた場合、古いものが削除されること"""
         store = UserProfileStore()
         store.record_message(1, 100, "User")
-        store._profiles[1].tags = ["A", "B", "C"]
+        store.get_profile(1).tags = ["A", "B", "C"]
         store.update_from_reflection(1, {"tags": ["D"]})
-        assert len(store._profiles[1].tags) == 3
-        assert "A" not in store._profiles[1].tags
-        assert "D" in store._profiles[1].tags
+        assert len(store.get_profile(1).tags) == 3
+        assert "A" not in store.get_profile(1).tags
+        assert "D" in store.get_profile(1).tags
 
     def test_update_notable_facts_dedup(self):
         """重複ファクトは追加されないこと"""
         store = UserProfileStore()
         store.record_message(1, 100, "User")
         store.update_from_reflection(1, {"notable_facts": ["東京在住", "東京在住"]})
-        assert store._profiles[1].notable_facts.count("東京在住") == 1
+        assert store.get_profile(1).notable_facts.count("東京在住") == 1
 
     def test_update_notable_facts_limit(self):
         """USER_PROFILE_FACTS_LIMIT を超えた場合、古いものが削除されること"""
         store = UserProfileStore()
         store.record_message(1, 100, "User")
-        store._profiles[1].notable_facts = ["A", "B", "C"]
+        store.get_profile(1).notable_facts = ["A", "B", "C"]
         store.update_from_reflection(1, {"notable_facts": ["D"]})
-        assert len(store._profiles[1].notable_facts) == 3
-        assert "A" not in store._profiles[1].notable_facts
+        assert len(store.get_profile(1).notable_facts) == 3
+        assert "A" not in store.get_profile(1).notable_facts
 
     def test_update_personality_notes(self):
         """personality_notes が上書き更新されること"""
         store = UserProfileStore()
         store.record_message(1, 100, "User")
         store.update_from_reflection(1, {"personality_notes": "明るい性格"})
-        assert store._profiles[1].personality_notes == "明るい性格"
+        assert store.get_profile(1).personality_notes == "明るい性格"
 
     def test_update_conversation_summary(self):
         """last_conversation_summary が更新されること"""
         store = UserProfileStore()
         store.record_message(1, 100, "User")
         store.update_from_reflection(1, {"last_conversation_summary": "Pythonの話をした"})
-        assert store._profiles[1].last_conversation_summary == "Pythonの話をした"
+        assert store.get_profile(1).last_conversation_summary == "Pythonの話をした"
 
     def test_no_error_for_unknown_user(self):
         """存在しないユーザーIDでエラーにならないこと"""
@@ -737,3 +1190,75 @@ class TestUpdateNickname:
         store.update_nickname(1, "ポチ")
         store.update_from_reflection(1, {"nickname": None})
         assert store._profiles[1].nickname == "ポチ"
+
+
+class TestUserProfileStoreSnapshot:
+    """スナップショットによる一括復元のテスト"""
+
+    @pytest.fixture(autouse=True)
+    def snapshot_dir(self, tmp_path):
+        with patch("config.STORAGE_TYPE", "local"), \
+             patch("config.SNAPSHOT_DIR", str(tmp_path)), \
+             patch("config.CHANNELS_ACTIVE_LIMIT", 20):
+            yield tmp_path
+
+    def test_save_and_restore(self, snapshot_dir):
+        """保存したプロファイルが別ストアにLRU順を保って復元されること"""
+        store = UserProfileStore()
+        with patch.object(store, "_load_profile", return_value=None):
+            store.get_profile(1, "A").tags = ["零式"]
+            store.get_profile(2, "B")
+            store.record_message(1, 100, "A")
+        with patch.object(store, "_save_to_local", return_value=True):
+            store.persist_dirty()
+            assert store.save_snapshot() == 2
+
+        restored = UserProfileStore()
+        with patch.object(restored, "_load_profile") as mock_load:
+            assert restored.restore_snapshot() == 2
+            profile = restored.get_profile(1)
+        mock_load.assert_not_called()
+        assert profile.tags == ["零式"]
+        assert profile.interaction_count == 1
+        assert list(restored._profiles) == [2, 1]
+        assert restored.has_pending_writes() is False
+
+    def test_snapshot_does_not_merge_counters(self, snapshot_dir):
+        """スナップショットはキャッシュを読むだけで、カウンタの未反映分を反映しないこと"""
+        store = UserProfileStore()
+        store._profiles.put(1, UserProfile(user_id=1, display_name="A"))
+        store.record_message(1, 100, "A")
+        store.record_message(2, 100, "B")
+
+        with patch.object(store, "_load_profiles") as mock_load:
+            assert store.save_snapshot() == 1
+        mock_load.assert_not_called()
+        assert store._profiles.peek(1).interaction_count == 0
+        assert 2 not in store._profiles
+        assert store.stats()["pending_counters"] == 2
+
+    def test_restore_keeps_cached_profiles(self, snapshot_dir):
+        """既にキャッシュ済みのプロファイルは上書きされないこと"""
+        store = UserProfileStore()
+        store._profiles.put(1, UserProfile(user_id=1, display_name="Old"))
+        store.save_snapshot()
+
+        fresh = UserProfileStore()
+        current = UserProfile(user_id=1, display_name="New")
+        fresh._profiles.put(1, current)
+        assert fresh.restore_snapshot() == 0
+        assert fresh._profiles[1] is current
+
+    def test_empty_cache_does_not_overwrite(self, snapshot_dir):
+        """キャッシュが空のときは既存のスナップショットを残すこと"""
+        store = UserProfileStore()
+        store._profiles.put(1, UserProfile(user_id=1, display_name="A"))
+        store.save_snapshot()
+        assert UserProfileStore().save_snapshot() == 0
+        assert UserProfileStore().restore_snapshot() == 1
+
+    def test_missing_or_broken_snapshot(self, snapshot_dir):
+        """スナップショットがない・壊れている場合は何も復元しないこと"""
+        assert UserProfileStore().restore_snapshot() == 0
+        (snapshot_dir / "user_profiles.snapshot").write_bytes(b"broken")
+        assert UserProfileStore().restore_snapshot() == 0
@@ -0,0 +1,45 @@
+"""utils/aho_corasick.py の単体テスト"""
+
+import random
+from unittest.mock import patch
+
+import pytest
+
+from utils.aho_corasick import AhoCorasick
+
+
+class TestAhoCorasick:
+    """AhoCorasick のテスト"""
+
+    @pytest.fixture(autouse=True, params=[0, 64], ids=["automaton", "naive"])
+    def naive_threshold(self, request):
+        with patch.object(AhoCorasick, "NAIVE_MAX_PATTERNS", request.param):
+            yield
+
+    def test_overlapping_and_nested_patterns(self) -> None:
+        """重なり・包含関係にあるパターンもすべて検出される"""
+        matcher = AhoCorasick(["he", "she", "his", "hers"])
+        assert matcher.search("ushers") == {"he", "she", "hers"}
+        assert matcher.search("this") == {"his"}
+        assert matcher.search("xyz") == frozenset()
+
+    def test_japanese_keywords(self) -> None:
+        """日本語のキーワードとボット名を1回の走査で検出する"""
+        matcher = AhoCorasick(["零式", "絶", "スフェーン"])
+        assert matcher.search("スフェーン、今日は零式行く？") == {"スフェーン", "零式"}
+
+    def test_empty_and_duplicate_patterns_ignored(self) -> None:
+        """空文字列と重複は無視される"""
+        matcher = AhoCorasick(["", "a", "a"])
+        assert matcher.patterns == ("a",)
+        assert AhoCorasick([]).search("anything") == frozenset()
+
+    def test_matches_naive_search(self) -> None:
+        """ランダムな入力で単純な部分文字列検索と一致する"""
+        rng = random.Random(0)
+        alphabet = "abc"
+        for _ in range(200):
+            patterns = ["".join(rng.choices(alphabet, k=rng.randint(1, 4))) for _ in range(5)]
+            text = "".join(rng.choices(alphabet, k=30))
+            expected = {p for p in patterns if p in text}
+            assert AhoCorasick(patterns).search(text) == expected
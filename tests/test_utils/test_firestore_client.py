@@ -7,7 +7,7 @@ Firestoreクライアント（firestore_client）のテスト
 
 from unittest.mock import MagicMock, patch
 
-from utils.firestore_client import get_firestore_client
+from utils.firestore_client import batch_set_documents, get_documents, get_firestore_client
 
 
 class TestFirestoreClient:
@@ -38,3 +38,58 @@ class TestFirestoreClient:
             assert False, "RuntimeError should have been raised"
         except RuntimeError as e:
             assert "Failed to initialize Firestore client" in str(e)
+
+
+class TestBatchSetDocuments:
+    """batch_set_documents のテスト"""
+
+    @patch("utils.firestore_client.FIRESTORE_BATCH_LIMIT", 2)
+    @patch("utils.firestore_client.get_firestore_client")
+    def test_chunks_and_commits(self, mock_get_client):
+        """上限ごとにバッチを分割してコミットすること"""
+        mock_db = mock_get_client.return_value
+        docs = {str(i): {"n": i} for i in range(5)}
+
+        assert batch_set_documents("col", docs) == []
+        assert mock_db.batch.call_count == 3
+        assert mock_db.batch.return_value.set.call_count == 5
+        assert mock_db.batch.return_value.commit.call_count == 3
+
+    @patch("utils.firestore_client.get_firestore_client")
+    def test_returns_failed_ids(self, mock_get_client):
+        """コミットに失敗したチャンクのIDが返ること"""
+        mock_get_client.return_value.batch.return_value.commit.side_effect = Exception("err")
+
+        assert batch_set_documents("col", {"a": {}, "b": {}}) == ["a", "b"]
+
+    @patch("utils.firestore_client.get_firestore_client", side_effect=RuntimeError("init"))
+    def test_client_error_returns_all_ids(self, _mock_get_client):
+        """クライアント取得に失敗した場合は全IDが失敗扱いになること"""
+        assert batch_set_documents("col", {"a": {}}) == ["a"]
+
+
+class TestGetDocuments:
+    """get_documents のテスト"""
+
+    @patch("utils.firestore_client.get_firestore_client")
+    def test_returns_existing_documents(self, mock_get_client):
+        """存在するドキュメントのみ返すこと"""
+        found = MagicMock(exists=True, id="a")
+        found.to_dict.return_value = {"x": 1}
+        missing = MagicMock(exists=False, id="b")
+        mock_get_client.return_value.get_all.return_value = [found, missing]
+
+        assert get_documents("col", ["a", "b"]) == {"a": {"x": 1}}
+
+    @patch("utils.firestore_client.get_firestore_client")
+    def test_empty_ids(self, mock_get_client):
+        """空リストではFirestoreにアクセスしないこと"""
+        assert get_documents("col", []) == {}
+        mock_get_client.assert_not_called()
+
+    @patch("utils.firestore_client.get_firestore_client")
+    def test_error_returns_partial(self, mock_get_client):
+        """取得エラー時は例外を送出せず空の結果を返すこと"""
+        mock_get_client.return_value.get_all.side_effect = Exception("err")
+
+        assert get_documents("col", ["a"]) == {}
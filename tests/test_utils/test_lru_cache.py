@@ -0,0 +1,80 @@
+"""utils/lru_cache.py の単体テスト"""
+
+from unittest.mock import patch
+
+from utils.lru_cache import LRUCache
+
+
+class TestLRUCache:
+    """LRUCache のテスト"""
+
+    def test_get_and_put(self) -> None:
+        """登録した値が取得でき、ヒット・ミスが数えられる"""
+        cache: LRUCache[int, str] = LRUCache()
+        assert cache.get(1) is None
+        cache.put(1, "a")
+        assert cache.get(1) == "a"
+        assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1, "evictions": 0}
+
+    def test_evicts_least_recently_used(self) -> None:
+        """上限超過時に最も古くアクセスされたエントリが返される"""
+        cache: LRUCache[int, str] = LRUCache(max_entries=2)
+        cache.put(1, "a")
+        cache.put(2, "b")
+        cache.get(1)
+        evicted = cache.put(3, "c")
+        assert evicted == [(2, "b")]
+        assert 1 in cache
+        assert 2 not in cache
+        assert cache.stats()["evictions"] == 1
+
+    def test_unlimited_when_zero(self) -> None:
+        """max_entries=0 では追い出しが発生しない"""
+        cache: LRUCache[int, int] = LRUCache(max_entries=0)
+        for i in range(100):
+            assert cache.put(i, i) == []
+        assert len(cache) == 100
+
+    def test_expired_entries_evicted_by_sweep(self) -> None:
+        """アイドルTTLを超えたエントリが evict_expired で回収される"""
+        cache: LRUCache[int, str] = LRUCache(ttl_seconds=10)
+        with patch("utils.lru_cache.time.monotonic", return_value=0.0):
+            cache.put(1, "a")
+            cache.put(2, "b")
+        with patch("utils.lru_cache.time.monotonic", return_value=5.0):
+            cache.get(2)
+        with patch("utils.lru_cache.time.monotonic", return_value=11.0):
+            assert cache.evict_expired() == [(1, "a")]
+        assert 2 in cache
+
+    def test_get_returns_entry_past_ttl(self) -> None:
+        """期限を過ぎていても回収前のエントリは get で返され、期限が延長される"""
+        cache: LRUCache[int, str] = LRUCache(ttl_seconds=10)
+        with patch("utils.lru_cache.time.monotonic", return_value=0.0):
+            cache.put(1, "a")
+        with patch("utils.lru_cache.time.monotonic", return_value=11.0):
+            assert cache.get(1) == "a"
+            assert cache.evict_expired() == []
+
+    def test_access_extends_ttl(self) -> None:
+        """アクセスするたびにアイドル時間がリセットされる"""
+        cache: LRUCache[int, str] = LRUCache(ttl_seconds=10)
+        with patch("utils.lru_cache.time.monotonic", return_value=0.0):
+            cache.put(1, "a")
+        with patch("utils.lru_cache.time.monotonic", return_value=8.0):
+            assert cache.get(1) == "a"
+        with patch("utils.lru_cache.time.monotonic", return_value=16.0):
+            assert cache.evict_expired() == []
+
+    def test_pop_and_snapshots(self) -> None:
+        """pop・items・values がLRU順序を壊さずに動作する"""
+        cache: LRUCache[str, int] = LRUCache()
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.items() == [("a", 1), ("b", 2)]
+        assert cache.values() == [1, 2]
+        assert list(cache) == ["a", "b"]
+        assert cache.pop("a") == 1
+        assert cache.pop("missing") is None
+        assert cache["b"] == 2
+        assert cache.stats()["evictions"] == 0
@@ -0,0 +1,47 @@
+"""utils/simhash.py の単体テスト"""
+
+import pytest
+
+from utils.simhash import hamming_distance, normalize_text, simhash
+
+
+class TestNormalizeText:
+    """normalize_text のテスト"""
+
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("おはよーーーー", "おはよーー"),
+            ("ｗｗｗｗｗ", "ww"),
+            ("  Good   Morning \n", "good morning"),
+            ("ＡＢＣ", "abc"),
+            ("おはよう！！", "おはよう"),
+            ("了解。", "了解"),
+        ],
+    )
+    def test_absorbs_variations(self, text: str, expected: str) -> None:
+        """全角・大文字・句読点・空白・同一文字の連続の揺れを吸収する"""
+        assert normalize_text(text) == expected
+
+
+class TestSimHash:
+    """simhash / hamming_distance のテスト"""
+
+    def test_identical_text_has_same_fingerprint(self) -> None:
+        assert simhash("おはよう\nおはよう") == simhash("おはよう\nおはよう")
+
+    def test_similar_text_is_closer_than_different_text(self) -> None:
+        """似た文章ほどハミング距離が小さい"""
+        base = simhash("今日の零式どうする？\nギミック難しすぎて全然クリアできなかった")
+        similar = simhash("今日の零式どうする？\nギミック難しすぎて全然クリアできなかったな")
+        different = simhash("ハウジングの土地が当たった！\n明日は何時から？")
+        assert hamming_distance(base, similar) < hamming_distance(base, different)
+
+    def test_short_and_empty_text(self) -> None:
+        assert simhash("") == 0
+        assert simhash("w") != 0
+        assert 0 <= simhash("おはよう") < 1 << 64
+
+    def test_hamming_distance(self) -> None:
+        assert hamming_distance(0b1011, 0b0001) == 2
+        assert hamming_distance(5, 5) == 0
@@ -0,0 +1,83 @@
+"""utils/snapshot.py の単体テスト"""
+
+import zlib
+from unittest.mock import patch
+
+import pytest
+
+from utils import snapshot
+from utils.snapshot import decode_columnar, encode_columnar, load_snapshot, save_snapshot
+
+
+class TestColumnarEncoding:
+    """列指向エンコードのテスト"""
+
+    def test_round_trip(self) -> None:
+        """行の内容と順序が復元され、欠けたフィールドは None になる"""
+        rows: list[dict] = [{"id": 1, "name": "あ", "tags": ["a"]}, {"id": 2, "extra": True}]
+        assert decode_columnar(encode_columnar(rows)) == [
+            {"id": 1, "name": "あ", "tags": ["a"], "extra": None},
+            {"id": 2, "name": None, "tags": None, "extra": True},
+        ]
+
+    def test_empty(self) -> None:
+        """空リストも扱える"""
+        assert decode_columnar(encode_columnar([])) == []
+
+    def test_invalid_data_raises_value_error(self) -> None:
+        """壊れたデータや未対応バージョンは ValueError"""
+        with pytest.raises(ValueError):
+            decode_columnar(b"broken")
+        with pytest.raises(ValueError):
+            decode_columnar(zlib.compress(b'{"version": 999}'))
+
+
+class TestSnapshotStorage:
+    """スナップショットの保存・読み込みのテスト"""
+
+    def test_file_round_trip(self, tmp_path) -> None:
+        """ローカルではファイルに保存・読み込みされる"""
+        with patch("config.STORAGE_TYPE", "local"), patch("config.SNAPSHOT_DIR", str(tmp_path)):
+            assert load_snapshot("profiles") is None
+            assert save_snapshot("profiles", b"data") is True
+            assert load_snapshot("profiles") == b"data"
+        assert (tmp_path / "profiles.snapshot").read_bytes() == b"data"
+
+    def test_firestore_shards_round_trip(self) -> None:
+        """Firestoreではシャードに分割して1回の一括書き込みで保存される"""
+        stored: dict[str, dict] = {}
+
+        def fake_set(collection, documents):
+            stored.update(documents)
+            return []
+
+        def fake_get(collection, doc_ids):
+            return {doc_id: stored[doc_id] for doc_id in doc_ids if doc_id in stored}
+
+        data = bytes(range(256)) * 10
+        with (
+            patch("config.STORAGE_TYPE", "firestore"),
+            patch.object(snapshot, "_FIRESTORE_SHARD_BYTES", 1000),
+            patch("utils.firestore_client.batch_set_documents", side_effect=fake_set) as mock_set,
+            patch("utils.firestore_client.get_documents", side_effect=fake_get),
+        ):
+            assert save_snapshot("profiles", data) is True
+            assert load_snapshot("profiles") == data
+
+        mock_set.assert_called_once()
+        assert stored["profiles.manifest"]["shards"] == 3
+
+    def test_firestore_crc_mismatch_ignored(self) -> None:
+        """シャードの内容が壊れていれば None を返す"""
+        documents = {
+            "profiles.manifest": {"shards": 1, "crc32": zlib.crc32(b"good")},
+            "profiles.0": {"data": b"evil"},
+        }
+        with (
+            patch("config.STORAGE_TYPE", "firestore"),
+            patch(
+                "utils.firestore_client.get_documents",
+                side_effect=lambda c, ids: {i: documents[i] for i in ids if i in documents},
+            ),
+        ):
+            assert load_snapshot("profiles") is None
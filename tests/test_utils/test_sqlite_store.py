@@ -0,0 +1,167 @@
+"""utils/sqlite_store.py と SQLite 移行ツール（utils/sqlite_migration.py・scripts/sqlite_migration.py）の単体テスト"""
+
+import json
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from scripts.sqlite_migration import run_benchmark
+from utils.sqlite_migration import migrate_json_files
+from utils.sqlite_store import (
+    COLLECTION_CHANNEL_CONFIGS,
+    COLLECTION_FACTS,
+    COLLECTION_FACTS_ARCHIVE,
+    COLLECTION_USER_PROFILES,
+    SQLiteStore,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = SQLiteStore(str(tmp_path / "test.db"))
+    yield s
+    s.close()
+
+
+class TestSQLiteStore:
+    """SQLiteStore のテスト"""
+
+    def test_wal_mode_enabled(self, store) -> None:
+        """ファイルDBはWALモードで開かれる"""
+        mode = store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_set_and_get(self, store) -> None:
+        """保存したドキュメントが取得でき、上書きされる"""
+        store.set(COLLECTION_USER_PROFILES, "1", {"name": "あ"})
+        assert store.get(COLLECTION_USER_PROFILES, "1") == {"name": "あ"}
+        store.set(COLLECTION_USER_PROFILES, "1", {"name": "い"})
+        assert store.get(COLLECTION_USER_PROFILES, "1") == {"name": "い"}
+        assert store.get(COLLECTION_USER_PROFILES, "2") is None
+
+    def test_collections_are_isolated(self, store) -> None:
+        """同じIDでもコレクションが異なれば別ドキュメント"""
+        store.set(COLLECTION_USER_PROFILES, "1", {"a": 1})
+        store.set(COLLECTION_FACTS, "1", {"b": 2})
+        assert store.get(COLLECTION_USER_PROFILES, "1") == {"a": 1}
+        assert store.count(COLLECTION_FACTS) == 1
+
+    def test_get_many_spans_chunks(self, store) -> None:
+        """IN句の分割を跨いでも全件取得でき、存在しないIDは含まれない"""
+        store.set_many(COLLECTION_USER_PROFILES, {str(i): {"i": i} for i in range(1000)})
+        result = store.get_many(
+            COLLECTION_USER_PROFILES, [str(i) for i in range(0, 1200)]
+        )
+        assert len(result) == 1000
+        assert result["999"] == {"i": 999}
+
+    def test_set_many_is_atomic(self, store) -> None:
+        """一括保存の途中で失敗すると全件ロールバックされる"""
+        store.set(COLLECTION_USER_PROFILES, "1", {"v": "old"})
+        with pytest.raises(TypeError):
+            store.set_many(
+                COLLECTION_USER_PROFILES, {"1": {"v": "new"}, "2": {"v": object()}}
+            )
+        assert store.get(COLLECTION_USER_PROFILES, "1") == {"v": "old"}
+        assert store.get(COLLECTION_USER_PROFILES, "2") is None
+
+    def test_set_many_raises_on_db_error(self, store) -> None:
+        """DBエラーは呼び出し元に伝播する"""
+        store.close()
+        with pytest.raises(sqlite3.Error):
+            store.set_many(COLLECTION_USER_PROFILES, {"1": {}})
+
+    def test_delete_and_get_all(self, store) -> None:
+        """削除とコレクション全件取得"""
+        store.set_many(COLLECTION_CHANNEL_CONFIGS, {"g1": {"x": 1}, "g2": {"x": 2}})
+        assert store.delete(COLLECTION_CHANNEL_CONFIGS, "g1") is True
+        assert store.delete(COLLECTION_CHANNEL_CONFIGS, "g1") is False
+        assert store.get_all(COLLECTION_CHANNEL_CONFIGS) == {"g2": {"x": 2}}
+
+
+class TestSQLiteMigration:
+    """JSONファイルからの移行ツールのテスト"""
+
+    def test_migrate_json_files(self, store, tmp_path) -> None:
+        """プレフィックスごとに対応するコレクションへ移行される"""
+        storage = tmp_path / "storage"
+        storage.mkdir()
+        (storage / "user_profile.1.json").write_text(json.dumps({"user_id": 1}))
+        (storage / "channel_list.g1.json").write_text(json.dumps({"behavior": "deny"}))
+        (storage / "facts.10.json").write_text(json.dumps({"channel_id": 10, "facts": []}))
+        (storage / "facts_archive.10.json").write_text(
+            json.dumps({"channel_id": 10, "archived_facts": []})
+        )
+        (storage / "user_profile.2.json").write_text("{broken")
+
+        migrated = migrate_json_files(str(storage), store)
+
+        assert migrated[COLLECTION_USER_PROFILES] == 1
+        assert migrated[COLLECTION_FACTS] == 1
+        assert migrated[COLLECTION_FACTS_ARCHIVE] == 1
+        assert store.get(COLLECTION_USER_PROFILES, "1") == {"user_id": 1}
+        assert store.get(COLLECTION_CHANNEL_CONFIGS, "g1") == {"behavior": "deny"}
+        assert store.get(COLLECTION_FACTS, "archive.10") is None
+
+    def test_run_benchmark(self) -> None:
+        """ベンチマークが両レイアウトの計測結果を返す"""
+        results = run_benchmark(5)
+        assert {"json_write", "json_read", "sqlite_write", "sqlite_read"} <= results.keys()
+
+
+class TestSQLiteBackends:
+    """STORAGE_TYPE=sqlite 時の各ストアの永続化"""
+
+    @pytest.fixture(autouse=True)
+    def sqlite_backend(self, store):
+        with (
+            patch("utils.sqlite_store.get_sqlite_store", return_value=store),
+            patch("config.STORAGE_TYPE", "sqlite"),
+        ):
+            yield
+
+    def test_user_profiles_round_trip(self) -> None:
+        """プロファイルが一括保存・一括読み込みされる"""
+        from memory.user_profile import UserProfile, UserProfileStore
+
+        store = UserProfileStore()
+        assert store._write_profiles(
+            [UserProfile(user_id=1, display_name="A"), UserProfile(user_id=2, display_name="B")]
+        ) == []
+        loaded = {p.user_id: p for p in store._load_profiles([1, 2, 3])}
+        assert set(loaded) == {1, 2}
+        assert loaded[2].display_name == "B"
+
+    def test_channel_config_round_trip(self) -> None:
+        """ギルド設定が保存・読み込み・削除される"""
+        from utils.channel_config import ChannelConfig, ChannelConfigManager
+
+        cfg = ChannelConfig("g1", storage_type="sqlite")
+        cfg.set_behavior("allow")
+        reloaded = ChannelConfig("g1", storage_type="sqlite")
+        assert reloaded.get_behavior() == "allow"
+        manager = ChannelConfigManager()
+        assert manager.delete_guild_config("g1") is True
+
+    def test_fact_store_round_trip(self) -> None:
+        """ファクトが保存・遅延ロードされる"""
+        from datetime import datetime, timezone
+
+        from memory.fact_store import Fact, FactStore
+
+        fs = FactStore()
+        fs.add_fact(
+            Fact(
+                fact_id="f1",
+                channel_id=10,
+                content="零式の話",
+                keywords=["零式"],
+                source_user_ids=[1],
+                created_at=datetime.now(timezone.utc),
+            )
+        )
+        fs.persist_all()
+        fresh = FactStore()
+        fresh._load_channel(10)
+        assert [f.fact_id for f in fresh._facts[10]] == ["f1"]
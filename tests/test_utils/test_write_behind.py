@@ -0,0 +1,95 @@
+"""utils/write_behind.py の単体テスト"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from utils.write_behind import WriteBehindCache
+
+
+def _cache(failed: list[int] | None = None, **kwargs) -> tuple[WriteBehindCache[int, str], MagicMock]:
+    write = MagicMock(return_value=failed or [])
+    return WriteBehindCache(write, **kwargs), write
+
+
+class TestWriteBehindCache:
+    """WriteBehindCache のテスト"""
+
+    def test_flush_dirty_writes_only_dirty_entries(self) -> None:
+        """ダーティなエントリだけをまとめて書き込む"""
+        cache, write = _cache()
+        cache.put(1, "a")
+        cache.put(2, "b")
+        cache.mark_dirty(2)
+        cache.mark_dirty(2)
+
+        assert cache.flush_dirty() == (1, 0)
+        write.assert_called_once_with(["b"])
+        assert not cache.has_dirty()
+        assert cache.flush_dirty() == (0, 0)
+
+    def test_failed_writes_are_retried(self) -> None:
+        """書き込みに失敗したキーはダーティのまま残る"""
+        cache, write = _cache(failed=[1])
+        cache.put(1, "a")
+        cache.mark_dirty(1)
+
+        assert cache.flush_dirty() == (0, 1)
+        assert cache.stats()["dirty"] == 1
+
+    def test_evicted_dirty_entries_are_written_back(self) -> None:
+        """上限超過で追い出された未保存のエントリだけを書き戻す"""
+        hook = MagicMock()
+        cache, write = _cache(max_entries=1, on_evict=hook)
+        cache.add(1, "a")
+        cache.mark_dirty(1)
+        cache.add(2, "b")
+        cache.add(3, "c")
+
+        hook.assert_any_call([(1, "a")])
+        write.assert_called_once_with(["a"])
+        assert 1 not in cache
+
+    def test_flush_all(self) -> None:
+        cache, write = _cache()
+        cache.put(1, "a")
+        cache.put(2, "b")
+        cache.mark_dirty(1)
+
+        assert cache.flush_all() == (2, 0)
+        write.assert_called_once_with(["a", "b"])
+        assert not cache.has_dirty()
+
+    def test_peek_does_not_touch_stats(self) -> None:
+        cache, _ = _cache()
+        cache.put(1, "a")
+        assert cache.peek(1) == "a"
+        assert cache.peek(2) is None
+        assert cache.stats()["hits"] == cache.stats()["misses"] == 0
+
+    @pytest.mark.asyncio
+    async def test_get_or_load_single_flight(self) -> None:
+        """同一キーへの同時要求は1回の読み込みにまとめられる"""
+        cache, _ = _cache()
+        load = MagicMock(return_value="loaded")
+
+        results = await asyncio.gather(
+            *(cache.get_or_load(1, load, lambda: "new", name="load") for _ in range(5))
+        )
+
+        load.assert_called_once()
+        assert results == ["loaded"] * 5
+        assert cache._loading == {}
+
+    @pytest.mark.asyncio
+    async def test_get_or_load_creates_when_missing_or_failed(self) -> None:
+        """永続化先になければ（読み込みに失敗しても）create で作る"""
+        cache, _ = _cache()
+        assert await cache.get_or_load(1, lambda: None, lambda: "new", name="load") == "new"
+
+        def fail() -> str:
+            raise OSError("boom")
+
+        assert await cache.get_or_load(2, fail, lambda: "fallback", name="load") == "fallback"
+        assert cache[2] == "fallback"
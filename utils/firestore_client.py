@@ -30,3 +30,82 @@ def get_firestore_client() -> FirestoreClient:
                         f"Failed to initialize Firestore client: {str(e)}"
                     ) from e
     return _firestore_client
+
+
+# Firestoreの1バッチあたりの最大書き込み数
+FIRESTORE_BATCH_LIMIT = 500
+
+
+def batch_set_documents(collection_name: str, documents: dict[str, dict]) -> list[str]:
+    """複数ドキュメントをバッチ書き込みでまとめて保存する
+
+    上限を超える件数は複数バッチに分割してコミットする。
+
+    Args:
+        collection_name: コレクション名
+        documents: ドキュメントID → 保存するデータ
+
+    Returns:
+        list[str]: 書き込みに失敗したドキュメントIDのリスト
+    """
+    doc_ids = list(documents)
+    try:
+        db = get_firestore_client()
+        collection = db.collection(collection_name)
+    except Exception as e:
+        logger.error(f"Firestoreクライアント取得エラー: {str(e)}", exc_info=True)
+        return doc_ids
+
+    failed: list[str] = []
+    for i in range(0, len(doc_ids), FIRESTORE_BATCH_LIMIT):
+        chunk = doc_ids[i : i + FIRESTORE_BATCH_LIMIT]
+        try:
+            batch = db.batch()
+            for doc_id in chunk:
+                batch.set(collection.document(doc_id), documents[doc_id])
+            batch.commit()
+        except Exception as e:
+            logger.error(
+                f"Firestoreへのバッチ書き込みに失敗: {collection_name}, {str(e)}",
+                exc_info=True,
+            )
+            failed.extend(chunk)
+    return failed
+
+
+def get_documents(collection_name: str, doc_ids: list[str]) -> dict[str, dict]:
+    """複数ドキュメントを get_all でまとめて取得する
+
+    Args:
+        collection_name: コレクション名
+        doc_ids: 取得するドキュメントIDのリスト
+
+    Returns:
+        dict[str, dict]: 存在したドキュメントのID → データ（取得失敗分は含まない）
+    """
+    if not doc_ids:
+        return {}
+    try:
+        db = get_firestore_client()
+        collection = db.collection(collection_name)
+    except Exception as e:
+        logger.error(f"Firestoreクライアント取得エラー: {str(e)}", exc_info=True)
+        return {}
+
+    results: dict[str, dict] = {}
+    for i in range(0, len(doc_ids), FIRESTORE_BATCH_LIMIT):
+        chunk = doc_ids[i : i + FIRESTORE_BATCH_LIMIT]
+        try:
+            refs = [collection.document(doc_id) for doc_id in chunk]
+            for snapshot in db.get_all(refs):
+                if not snapshot.exists:
+                    continue
+                data = snapshot.to_dict()
+                if data is not None:
+                    results[snapshot.id] = data
+        except Exception as e:
+            logger.error(
+                f"Firestoreからの一括取得に失敗: {collection_name}, {str(e)}",
+                exc_info=True,
+            )
+    return results
@@ -0,0 +1,122 @@
+"""件数上限・アイドルTTL付きのLRUキャッシュ"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from typing import Generic, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """OrderedDict ベースのスレッドセーフなLRUキャッシュ
+
+    追い出し時に値を破棄せず呼び出し元へ返すため、ダーティなエントリを
+    永続化してから手放す、といった処理を呼び出し側で行える。
+
+    Args:
+        max_entries: 最大エントリ数（0以下で無制限）
+        ttl_seconds: 最終アクセスからの保持秒数（0以下で無期限）
+    """
+
+    def __init__(self, max_entries: int = 0, ttl_seconds: float = 0) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._accessed_at: dict[K, float] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: K) -> V | None:
+        """値を取得してLRU順序とアクセス時刻を更新する（未登録なら None）
+
+        アイドルTTLの判定は evict_expired() でのみ行う。アクセスされた
+        エントリはアイドルではないため、期限を過ぎていても値を返す
+        （未保存の値を永続化先の古い値で上書きしないため）。
+        """
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._accessed_at[key] = time.monotonic()
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key: K, value: V) -> list[tuple[K, V]]:
+        """値を登録し、上限超過で追い出されたエントリを返す"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._accessed_at[key] = time.monotonic()
+            evicted: list[tuple[K, V]] = []
+            if self._max_entries > 0:
+                while len(self._data) > self._max_entries:
+                    old_key, old_value = self._data.popitem(last=False)
+                    self._accessed_at.pop(old_key, None)
+                    evicted.append((old_key, old_value))
+            self.evictions += len(evicted)
+            return evicted
+
+    def pop(self, key: K) -> V | None:
+        """エントリを削除して値を返す（追い出しとしては数えない）"""
+        with self._lock:
+            self._accessed_at.pop(key, None)
+            return self._data.pop(key, None)
+
+    def evict_expired(self) -> list[tuple[K, V]]:
+        """アイドルTTLを超えたエントリを削除して返す"""
+        if self._ttl_seconds <= 0:
+            return []
+        with self._lock:
+            now = time.monotonic()
+            expired = [key for key in self._data if self._is_expired(key, now)]
+            evicted = [(key, self._data.pop(key)) for key in expired]
+            for key in expired:
+                self._accessed_at.pop(key, None)
+            self.evictions += len(evicted)
+            return evicted
+
+    def stats(self) -> dict[str, int]:
+        """ヒット・ミス・追い出し回数と現在のエントリ数を返す"""
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def items(self) -> list[tuple[K, V]]:
+        """エントリのスナップショットを返す（LRU順序は更新しない）"""
+        with self._lock:
+            return list(self._data.items())
+
+    def values(self) -> list[V]:
+        """値のスナップショットを返す（LRU順序は更新しない）"""
+        with self._lock:
+            return list(self._data.values())
+
+    def _is_expired(self, key: K, now: float) -> bool:
+        if self._ttl_seconds <= 0:
+            return False
+        return now - self._accessed_at.get(key, now) > self._ttl_seconds
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __getitem__(self, key: K) -> V:
+        with self._lock:
+            return self._data[key]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[K]:
+        with self._lock:
+            return iter(list(self._data))
@@ -0,0 +1,53 @@
+"""SimHash による近似重複テキストの指紋"""
+
+import hashlib
+import re
+import unicodedata
+from collections import Counter
+
+SIMHASH_BITS = 64
+
+_WHITESPACE = re.compile(r"\s+")
+# 3文字以上の同一文字の連続（「wwwww」「おはよーーー」）
+_REPEATED = re.compile(r"(.)\1{2,}")
+
+
+def normalize_text(text: str) -> str:
+    """表記揺れを吸収する（NFKC・小文字化・句読点の除去・空白の圧縮・同一文字の連続を2文字に）"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = "".join(c for c in text if not unicodedata.category(c).startswith("P"))
+    text = _WHITESPACE.sub(" ", text).strip()
+    return _REPEATED.sub(r"\1\1", text)
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str, ngram: int = 2) -> int:
+    """文字 n-gram の出現回数で重み付けした 64bit の SimHash を返す
+
+    日本語は単語の区切りがないため文字 n-gram を特徴量にする。似た文章ほど
+    ハミング距離が小さくなる。空文字列は 0。
+    """
+    if not text:
+        return 0
+    if len(text) <= ngram:
+        features = Counter([text])
+    else:
+        features = Counter(text[i : i + ngram] for i in range(len(text) - ngram + 1))
+    weights = [0] * SIMHASH_BITS
+    for feature, count in features.items():
+        value = _feature_hash(feature)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if value >> bit & 1 else -count
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """2つの指紋の異なるビット数"""
+    return (a ^ b).bit_count()
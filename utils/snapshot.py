@@ -0,0 +1,142 @@
+"""インメモリ状態のコンパクトなスナップショット（列指向 JSON + zlib 圧縮）
+
+同じ形の辞書の列をフィールドごとの列にまとめて圧縮し、1つのバイト列にする。
+保存先は STORAGE_TYPE に応じて、Firestore ではシャード分割したドキュメント群、
+それ以外では storage/ 配下の単一ファイルになる。
+"""
+
+import json
+import os
+import tempfile
+import zlib
+from datetime import datetime, timezone
+
+import config
+from log_utils.logger import logger
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Firestore ドキュメント上限（1MiB）に収まるシャードサイズ
+_FIRESTORE_SHARD_BYTES = 900 * 1024
+
+
+def encode_columnar(rows: list[dict]) -> bytes:
+    """辞書のリストを列指向に並べ替えて圧縮する
+
+    フィールドはすべての行の和集合で、欠けている値は None になる。
+    """
+    fields: dict[str, None] = {}
+    for row in rows:
+        fields.update(dict.fromkeys(row))
+    payload = {
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "count": len(rows),
+        "columns": {name: [row.get(name) for row in rows] for name in fields},
+    }
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return zlib.compress(raw.encode("utf-8"))
+
+
+def decode_columnar(data: bytes) -> list[dict]:
+    """encode_columnar の逆変換
+
+    Raises:
+        ValueError: 形式・バージョンが不正な場合
+    """
+    try:
+        payload = json.loads(zlib.decompress(data).decode("utf-8"))
+    except (zlib.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"スナップショットの展開に失敗: {e}") from e
+    if payload.get("version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"未対応のスナップショット形式: {payload.get('version')}")
+    columns: dict[str, list] = payload["columns"]
+    return [
+        {name: values[i] for name, values in columns.items()}
+        for i in range(payload["count"])
+    ]
+
+
+def save_snapshot(name: str, data: bytes) -> bool:
+    """スナップショットを保存する（成功時 True）"""
+    try:
+        if config.STORAGE_TYPE == "firestore":
+            return _save_to_firestore(name, data)
+        _save_to_file(_snapshot_path(name), data)
+        return True
+    except Exception as e:
+        logger.error(f"スナップショット保存エラー: {name}: {e}", exc_info=True)
+        return False
+
+
+def load_snapshot(name: str) -> bytes | None:
+    """スナップショットを読み込む（存在しない・破損している場合は None）"""
+    try:
+        if config.STORAGE_TYPE == "firestore":
+            return _load_from_firestore(name)
+        path = _snapshot_path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+    except Exception as e:
+        logger.error(f"スナップショット読み込みエラー: {name}: {e}", exc_info=True)
+        return None
+
+
+def _snapshot_path(name: str) -> str:
+    return os.path.join(config.SNAPSHOT_DIR, f"{name}.snapshot")
+
+
+def _save_to_file(path: str, data: bytes) -> None:
+    """一時ファイルに書いてから置き換える（途中で落ちても旧版が残る）"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _save_to_firestore(name: str, data: bytes) -> bool:
+    """シャードとマニフェストを同じバッチで書き込む"""
+    from utils.firestore_client import batch_set_documents
+
+    shards = [
+        data[i : i + _FIRESTORE_SHARD_BYTES]
+        for i in range(0, len(data), _FIRESTORE_SHARD_BYTES)
+    ]
+    documents: dict[str, dict] = {
+        f"{name}.{i}": {"data": shard} for i, shard in enumerate(shards)
+    }
+    documents[f"{name}.manifest"] = {
+        "shards": len(shards),
+        "crc32": zlib.crc32(data),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    return not batch_set_documents(config.FIRESTORE_COLLECTION_SNAPSHOTS, documents)
+
+
+def _load_from_firestore(name: str) -> bytes | None:
+    """マニフェストに従ってシャードを連結し、CRC を検証する"""
+    from utils.firestore_client import get_documents
+
+    collection = config.FIRESTORE_COLLECTION_SNAPSHOTS
+    manifest = get_documents(collection, [f"{name}.manifest"]).get(f"{name}.manifest")
+    if manifest is None:
+        return None
+    shard_ids = [f"{name}.{i}" for i in range(manifest["shards"])]
+    shards = get_documents(collection, shard_ids)
+    if len(shards) != len(shard_ids):
+        logger.warning(f"スナップショットのシャードが欠けています: {name}")
+        return None
+    data = b"".join(bytes(shards[doc_id]["data"]) for doc_id in shard_ids)
+    if zlib.crc32(data) != manifest["crc32"]:
+        logger.warning(f"スナップショットのCRCが一致しません: {name}")
+        return None
+    return data
@@ -0,0 +1,57 @@
+"""ローカルJSONファイルから SQLite への一括移行
+
+コマンドラインからは scripts/sqlite_migration.py で実行する。
+"""
+
+import glob
+import json
+import os
+import re
+
+from log_utils.logger import logger
+from utils.sqlite_store import (
+    COLLECTION_CHANNEL_CONFIGS,
+    COLLECTION_CHANNEL_CONTEXTS,
+    COLLECTION_FACTS,
+    COLLECTION_FACTS_ARCHIVE,
+    COLLECTION_USER_PROFILES,
+    SQLiteStore,
+)
+
+# ファイル名プレフィックス（storage/{prefix}.{id}.json）とコレクションの対応
+JSON_FILE_COLLECTIONS: dict[str, str] = {
+    "channel_list": COLLECTION_CHANNEL_CONFIGS,
+    "user_profile": COLLECTION_USER_PROFILES,
+    "channel_context": COLLECTION_CHANNEL_CONTEXTS,
+    "facts": COLLECTION_FACTS,
+    "facts_archive": COLLECTION_FACTS_ARCHIVE,
+}
+
+_DOC_ID_PATTERN = re.compile(r"^[a-zA-Z0-9_\-]+$")
+
+
+def migrate_json_files(storage_dir: str, store: SQLiteStore) -> dict[str, int]:
+    """storage_dir 内のJSONファイルをコレクションごとに1トランザクションで移行する
+
+    読み込めないファイルはログに残してスキップする。元のファイルは削除しない。
+
+    Returns:
+        コレクション名 → 移行したドキュメント数
+    """
+    migrated: dict[str, int] = {}
+    for prefix, collection in JSON_FILE_COLLECTIONS.items():
+        documents: dict[str, dict] = {}
+        for path in glob.glob(os.path.join(storage_dir, f"{prefix}.*.json")):
+            doc_id = os.path.basename(path)[len(prefix) + 1 : -len(".json")]
+            # "facts.*" が "facts_archive.*" に誤マッチしないよう ID の形式を確認する
+            if not _DOC_ID_PATTERN.match(doc_id):
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    documents[doc_id] = json.load(f)
+            except Exception as e:
+                logger.error(f"移行元ファイルの読み込みエラー: {path}: {e}")
+        store.set_many(collection, documents)
+        migrated[collection] = len(documents)
+        logger.info(f"SQLite移行: {collection} に {len(documents)} 件")
+    return migrated
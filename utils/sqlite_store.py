@@ -0,0 +1,155 @@
+"""SQLite（WALモード）によるローカル永続化バックエンド
+
+Firestore のコレクション/ドキュメントと同じ形で JSON ドキュメントを保存する。
+STORAGE_TYPE=sqlite のとき、ローカルの storage/*.json の代わりに使われる。
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+
+import config
+from log_utils.logger import logger
+
+# コレクション名（Firestore のコレクションに対応）
+COLLECTION_CHANNEL_CONFIGS = "channel_configs"
+COLLECTION_USER_PROFILES = "user_profiles"
+COLLECTION_CHANNEL_CONTEXTS = "channel_contexts"
+COLLECTION_FACTS = "facts"
+COLLECTION_FACTS_ARCHIVE = "facts_archive"
+
+# SQLite のバインド変数上限（古いビルドの 999）を超えないよう IN 句を分割する
+_MAX_VARIABLES = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    collection TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (collection, doc_id)
+) WITHOUT ROWID
+"""
+
+
+class SQLiteStore:
+    """コレクション単位で JSON ドキュメントを保存する SQLite ストア
+
+    1つの接続をロックで直列化して共有する。書き込みはトランザクション単位で
+    まとめて行い、(collection, doc_id) の主キーで検索する。
+
+    Args:
+        db_path: データベースファイルのパス（":memory:" も可）
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL では NORMAL でもコミット済みデータの整合性は保たれる
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def get(self, collection: str, doc_id: str) -> dict | None:
+        """ドキュメントを1件取得する（存在しなければ None）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM documents WHERE collection = ? AND doc_id = ?",
+                (collection, doc_id),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, collection: str, doc_ids: Iterable[str]) -> dict[str, dict]:
+        """複数ドキュメントをまとめて取得する（存在したもののみ返す）"""
+        ids = list(doc_ids)
+        results: dict[str, dict] = {}
+        with self._lock:
+            for i in range(0, len(ids), _MAX_VARIABLES):
+                chunk = ids[i : i + _MAX_VARIABLES]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT doc_id, data FROM documents "
+                    f"WHERE collection = ? AND doc_id IN ({placeholders})",
+                    (collection, *chunk),
+                ).fetchall()
+                for doc_id, data in rows:
+                    results[doc_id] = json.loads(data)
+        return results
+
+    def get_all(self, collection: str) -> dict[str, dict]:
+        """コレクション内の全ドキュメントを取得する"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT doc_id, data FROM documents WHERE collection = ?",
+                (collection,),
+            ).fetchall()
+        return {doc_id: json.loads(data) for doc_id, data in rows}
+
+    def set(self, collection: str, doc_id: str, data: dict) -> None:
+        """ドキュメントを保存する（既存なら上書き）"""
+        self.set_many(collection, {doc_id: data})
+
+    def set_many(self, collection: str, documents: dict[str, dict]) -> None:
+        """複数ドキュメントを1トランザクションで保存する
+
+        Raises:
+            sqlite3.Error: 書き込みに失敗した場合（全件ロールバックされる）
+        """
+        if not documents:
+            return
+        now = time.time()
+        rows = [
+            (collection, doc_id, json.dumps(data, ensure_ascii=False), now)
+            for doc_id, data in documents.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO documents (collection, doc_id, data, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def delete(self, collection: str, doc_id: str) -> bool:
+        """ドキュメントを削除する（存在した場合 True）"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM documents WHERE collection = ? AND doc_id = ?",
+                (collection, doc_id),
+            )
+        return cursor.rowcount > 0
+
+    def count(self, collection: str) -> int:
+        """コレクション内のドキュメント数を返す"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM documents WHERE collection = ?", (collection,)
+            ).fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        """接続を閉じる"""
+        with self._lock:
+            self._conn.close()
+
+
+# シングルトン
+_sqlite_store: SQLiteStore | None = None
+_sqlite_store_lock = threading.Lock()
+
+
+def get_sqlite_store() -> SQLiteStore:
+    """シングルトンな SQLiteStore インスタンスを取得する"""
+    global _sqlite_store
+    if _sqlite_store is None:
+        with _sqlite_store_lock:
+            if _sqlite_store is None:
+                _sqlite_store = SQLiteStore(config.SQLITE_DB_PATH)
+                logger.info(f"SQLiteStore初期化: path={config.SQLITE_DB_PATH}")
+    return _sqlite_store
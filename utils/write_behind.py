@@ -0,0 +1,176 @@
+"""追い出し前に書き戻す write-behind キャッシュ"""
+
+import asyncio
+import threading
+from collections.abc import Callable
+from typing import TypeVar
+
+from log_utils.logger import logger
+from utils.lru_cache import LRUCache
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class WriteBehindCache(LRUCache[K, V]):
+    """未保存の変更をまとめて書き込む LRU キャッシュ
+
+    LRUCache に以下を加える:
+    - 変更のあったキーのダーティセットと、まとめ書き（flush_dirty）
+    - 追い出し・期限切れで手放すエントリのうち未保存のものの書き戻し
+    - キャッシュミス時のスレッドでの読み込み（同一キーへの同時要求は1回にまとめる single-flight）
+
+    Args:
+        write: 値をまとめて書き込み、失敗したキーを返す関数
+        max_entries: 最大エントリ数（0以下で無制限）
+        ttl_seconds: 最終アクセスからの保持秒数（0以下で無期限）
+        on_evict: 追い出されたエントリを書き戻しの判定前に受け取るフック
+            （未反映の変更を値に取り込んで mark_dirty する等）
+    """
+
+    def __init__(
+        self,
+        write: Callable[[list[V]], list[K]],
+        max_entries: int = 0,
+        ttl_seconds: float = 0,
+        on_evict: Callable[[list[tuple[K, V]]], None] | None = None,
+    ) -> None:
+        super().__init__(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._write = write
+        self._on_evict = on_evict
+        self._dirty: set[K] = set()
+        self._dirty_lock = threading.Lock()
+        self._loading: dict[K, asyncio.Task[V]] = {}
+
+    def add(self, key: K, value: V) -> None:
+        """値を登録し、上限超過で追い出されたエントリを書き戻す"""
+        self.write_back(self.put(key, value))
+
+    def peek(self, key: K) -> V | None:
+        """LRU順序・統計を変えずに値を返す（未登録なら None）"""
+        try:
+            return self[key]
+        except KeyError:
+            return None
+
+    def mark_dirty(self, key: K) -> None:
+        """未保存の変更があることを記録する（複数回の変更は1回の書き込みにまとめられる）"""
+        with self._dirty_lock:
+            self._dirty.add(key)
+
+    def has_dirty(self) -> bool:
+        """未保存のエントリがあるかを返す"""
+        with self._dirty_lock:
+            return bool(self._dirty)
+
+    def flush_dirty(self) -> tuple[int, int]:
+        """未保存のエントリをまとめて書き込む（失敗したものは次回再試行する）
+
+        Returns:
+            (書き込んだ件数, 失敗した件数)
+        """
+        with self._dirty_lock:
+            keys = list(self._dirty)
+            self._dirty.clear()
+        values = [value for key in keys if (value := self.peek(key)) is not None]
+        return self._write_retrying(values)
+
+    def flush_all(self) -> tuple[int, int]:
+        """キャッシュ上の全エントリを書き込む（失敗したものは次回再試行する）
+
+        Returns:
+            (書き込んだ件数, 失敗した件数)
+        """
+        with self._dirty_lock:
+            self._dirty.clear()
+        return self._write_retrying(self.values())
+
+    def write_back(self, evicted: list[tuple[K, V]]) -> None:
+        """キャッシュから外れたエントリのうち未保存のものを書き込む"""
+        dirty = self.take_dirty(evicted)
+        if dirty:
+            # キャッシュから外れた後は再試行できないため、失敗はログのみ
+            self._write(dirty)
+
+    def take_dirty(self, evicted: list[tuple[K, V]]) -> list[V]:
+        """キャッシュから外れたエントリのうち未保存のものを取り出す（書き込みは呼び出し側）
+
+        on_evict フックはここで呼ぶため、値を読む側と同じスレッド（イベントループ）で
+        呼び、書き込みだけをスレッドに回せる。
+        """
+        if not evicted:
+            return []
+        if self._on_evict is not None:
+            self._on_evict(evicted)
+        with self._dirty_lock:
+            dirty = [(key, value) for key, value in evicted if key in self._dirty]
+            self._dirty.difference_update(key for key, _ in dirty)
+        return [value for _, value in dirty]
+
+    def write_back_expired(self) -> int:
+        """アイドルTTLを超えたエントリを書き戻してから削除する
+
+        Returns:
+            削除したエントリ数
+        """
+        evicted = self.evict_expired()
+        self.write_back(evicted)
+        return len(evicted)
+
+    async def get_or_load(
+        self,
+        key: K,
+        load: Callable[[], V | None],
+        create: Callable[[], V],
+        name: str,
+    ) -> V:
+        """値を返す（キャッシュミス時は load をスレッドで実行し、なければ create で作る）
+
+        同一キーへの同時要求は1回の読み込みにまとめる。
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load_and_cache(key, load, create), name=name)
+            self._loading[key] = task
+            task.add_done_callback(lambda _: self._loading.pop(key, None))
+        # 呼び出し元がキャンセルされても他の待機者の読み込みは継続させる
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, int]:
+        """エントリ数・ヒット・ミス・追い出し回数と未保存数を返す"""
+        stats = super().stats()
+        with self._dirty_lock:
+            stats["dirty"] = len(self._dirty)
+        return stats
+
+    async def _load_and_cache(
+        self, key: K, load: Callable[[], V | None], create: Callable[[], V]
+    ) -> V:
+        """スレッドで読み込み、キャッシュ登録と追い出し分の書き戻しを行う"""
+        try:
+            loaded = await asyncio.to_thread(load)
+        except Exception as e:
+            logger.error(f"キャッシュへの非同期読み込みエラー: key={key}, {e}", exc_info=True)
+            loaded = None
+        # 読み込み中に同期パスで登録済みならそちらを優先する
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = loaded if loaded is not None else create()
+        dirty = self.take_dirty(self.put(key, value))
+        if dirty:
+            await asyncio.to_thread(self._write, dirty)
+        return value
+
+    def _write_retrying(self, values: list[V]) -> tuple[int, int]:
+        """値を書き込み、失敗したキーをダーティセットに戻す"""
+        if not values:
+            return 0, 0
+        failed = self._write(values)
+        if failed:
+            with self._dirty_lock:
+                self._dirty.update(failed)
+        return len(values) - len(failed), len(failed)